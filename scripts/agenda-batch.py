@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Batch Agenda Generator for Unicorn Dynamics
+
+Generates session agendas for many teams from a CSV or JSONL file of
+requests (``id``/``team``, ``objective``, ``duration_hours``, ``team_size``,
+optional ``focus_cycle``, ``include_startup`` and ``solver``).
+
+The objective is the only per-team input that does not change the plan, so
+requests are deduplicated on the remaining parameters: each unique tuple is
+planned once (in a process pool, in chunks) and kept in an LRU cache, and
+every matching request is rendered from it with its own objective. Rendered
+Markdown or JSON files are written to the output directory as chunks finish.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import script_loader  # noqa: F401  (makes session_planner importable)
+from session_planner import CYCLES, format_agenda_markdown, generate_session_agenda
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+SOLVERS = ("greedy", "optimal")
+
+
+@dataclass
+class AgendaRequest:
+    id: str
+    objective: str
+    duration_hours: float
+    team_size: int
+    focus_cycle: Optional[str] = None
+    include_startup: bool = True
+    solver: str = "greedy"
+
+    @property
+    def key(self) -> Tuple:
+        """Planning parameters, i.e. everything except ``id`` and ``objective``."""
+        return (self.duration_hours, self.team_size, self.focus_cycle, self.include_startup, self.solver)
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_request(record: dict, number: int) -> AgendaRequest:
+    """Build an ``AgendaRequest`` from a CSV row or JSON object.
+
+    Raises ``ValueError`` for an unknown ``solver`` or ``focus_cycle``, a
+    non-finite or non-positive ``duration_hours`` or a ``team_size`` below 1,
+    so the row is skipped rather than failing its whole chunk at planning time.
+    """
+    blank = (None, "")
+    solver = record.get("solver") or "greedy"
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver!r} (expected one of {', '.join(SOLVERS)})")
+    focus_cycle = record.get("focus_cycle") or None
+    if focus_cycle is not None and focus_cycle not in CYCLES:
+        raise ValueError(f"unknown focus_cycle {focus_cycle!r} (expected one of {', '.join(CYCLES)})")
+    duration_hours = float(record["duration_hours"]) if record.get("duration_hours") not in blank else 4.0
+    if not math.isfinite(duration_hours) or duration_hours <= 0:
+        raise ValueError(f"duration_hours must be a positive number, not {duration_hours!r}")
+    team_size = int(record["team_size"]) if record.get("team_size") not in blank else 10
+    if team_size < 1:
+        raise ValueError(f"team_size must be at least 1, not {team_size!r}")
+    return AgendaRequest(
+        id=str(record.get("id") or record.get("team") or f"request-{number}"),
+        objective=str(record["objective"]),
+        duration_hours=duration_hours,
+        team_size=team_size,
+        focus_cycle=focus_cycle,
+        include_startup=_parse_bool(record["include_startup"])
+        if record.get("include_startup") not in blank else True,
+        solver=solver,
+    )
+
+
+class RequestReader:
+    """Lazily parse agenda requests from CSV or JSONL.
+
+    Malformed rows are counted in ``skipped`` (and reported on stderr)
+    instead of aborting the batch.
+    """
+
+    def __init__(self, stream: IO[str], format: str):
+        self.stream = stream
+        self.format = format
+        self.rows = 0
+        self.skipped = 0
+
+    def __iter__(self) -> Iterator[AgendaRequest]:
+        records = csv.DictReader(self.stream) if self.format == "csv" else self._json_records()
+        for record in records:
+            self.rows += 1
+            try:
+                yield parse_request(record, self.rows)
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                self.skipped += 1
+                print(f"Skipping request {self.rows}: {error}", file=sys.stderr)
+
+    def _json_records(self) -> Iterator[dict]:
+        for line in self.stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {}
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Tuple, dict]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[dict]:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple, value: dict) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+def plan_templates(keys: List[Tuple]) -> List[Tuple[Tuple, dict]]:
+    """Plan one agenda per parameter tuple, with a blank objective."""
+    return [(key, generate_session_agenda("", *key[:3], include_startup=key[3], solver=key[4])) for key in keys]
+
+
+def render(request: AgendaRequest, template: dict, format: str) -> str:
+    agenda = dict(template, objective=request.objective)
+    if format == "json":
+        return json.dumps(agenda, indent=2) + "\n"
+    return format_agenda_markdown(agenda) + "\n"
+
+
+class DirectoryWriter:
+    """Write each rendered agenda to ``<out_dir>/<id>.<md|json>``.
+
+    Ids that sanitize to the same file name (case-insensitively) get a
+    numeric suffix (``Sales_Team-2.md``) instead of overwriting each other.
+    """
+
+    def __init__(self, out_dir: str, format: str):
+        self.out_dir = out_dir
+        self.format = format
+        self.written = 0
+        self.names: set = set()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _file_name(self, request_id: str) -> str:
+        base = re.sub(r"[^\w.-]+", "_", request_id).strip(".") or "request"
+        name, suffix = base, 1
+        while name.lower() in self.names:
+            suffix += 1
+            name = f"{base}-{suffix}"
+        self.names.add(name.lower())
+        return name
+
+    def __call__(self, request: AgendaRequest, template: dict) -> None:
+        name = self._file_name(request.id)
+        path = os.path.join(self.out_dir, f"{name}.{'json' if self.format == 'json' else 'md'}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render(request, template, self.format))
+        self.written += 1
+
+
+def run_batch(requests: Iterator[AgendaRequest], sink: Callable[[AgendaRequest, dict], None],
+              workers: Optional[int] = None, cache_size: int = 4096, chunk_size: int = 64) -> dict:
+    """Plan and emit every request, deduplicating on ``AgendaRequest.key``.
+
+    ``sink(request, template)`` is called as soon as a request's plan is
+    available: immediately on a cache hit, otherwise when the chunk holding
+    its parameter tuple completes. ``workers=1`` plans in-process.
+    """
+    cache = LRUCache(cache_size)
+    waiting: Dict[Tuple, List[AgendaRequest]] = {}
+    chunk: List[Tuple] = []
+    running: List[Future] = []
+    stats = {"requests": 0, "unique": 0, "cache_hits": 0}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+
+    def complete(results: List[Tuple[Tuple, dict]]) -> None:
+        for key, template in results:
+            cache.put(key, template)
+            for request in waiting.pop(key):
+                sink(request, template)
+
+    def submit() -> None:
+        keys = chunk[:]
+        chunk.clear()
+        if pool is None:
+            complete(plan_templates(keys))
+        else:
+            running.append(pool.submit(plan_templates, keys))
+
+    def drain(block: bool) -> None:
+        done, pending = wait(running, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        running[:] = pending
+        for future in done:
+            complete(future.result())
+
+    try:
+        for request in requests:
+            stats["requests"] += 1
+            key = request.key
+            template = cache.get(key)
+            if template is not None:
+                stats["cache_hits"] += 1
+                sink(request, template)
+            elif key in waiting:
+                stats["cache_hits"] += 1
+                waiting[key].append(request)
+            else:
+                stats["unique"] += 1
+                waiting[key] = [request]
+                chunk.append(key)
+                if len(chunk) >= chunk_size:
+                    submit()
+            if running:
+                drain(block=False)
+        if chunk:
+            submit()
+        while running:
+            drain(block=True)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate session agendas for many teams")
+    parser.add_argument("requests", help="CSV or JSONL of team requests ('-' for JSONL on stdin)")
+    parser.add_argument("--out-dir", default="agendas", help="Directory for rendered agendas")
+    parser.add_argument("--format", choices=("md", "json"), default="md")
+    parser.add_argument("--workers", type=int, help="Planner processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Planned parameter tuples kept in the LRU")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Unique parameter tuples per pool task")
+    args = parser.parse_args()
+
+    input_format = "csv" if args.requests.lower().endswith(".csv") else "jsonl"
+    stream = sys.stdin if args.requests == "-" else open(args.requests, encoding="utf-8", newline="")
+    reader = RequestReader(stream, input_format)
+    writer = DirectoryWriter(args.out_dir, args.format)
+    start = time.perf_counter()
+    try:
+        stats = run_batch(iter(reader), writer, args.workers, args.cache_size, args.chunk_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Wrote {writer.written} agendas to {args.out_dir} in {elapsed:.2f}s "
+          f"({stats['unique']} unique plans, {stats['cache_hits']} deduplicated, "
+          f"{reader.skipped} skipped)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Unicorn Dynamics
+
+Seeded synthetic workloads for the core entry points:
+``evaluate_metric``, ``generate_telemetry_report``,
+``format_report_markdown``, ``generate_session_agenda`` (greedy and
+optimal) and ``format_agenda_markdown``.
+
+Reading streams (1k to 10M readings) have a configurable status mix and
+timestamp spread and are generated chunk by chunk, so large streams never
+sit in memory at once. Agenda requests run against the stock guide library
+extended with seeded synthetic guides. Each benchmark runs in a fresh
+worker process and reports throughput, latency percentiles and peak RSS.
+Results can be saved as a JSON baseline; comparing against a baseline
+exits non-zero when any benchmark regresses beyond the tolerance.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import random
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+import script_loader  # noqa: F401  (makes sibling scripts importable)
+import session_planner
+from session_planner import Guide, format_agenda_markdown, generate_session_agenda
+from telemetry_mapper import (
+    LOWER_IS_WORSE,
+    METRIC_KEYS,
+    METRICS,
+    ReportState,
+    TelemetryReading,
+    evaluate_metric,
+    format_report_markdown,
+    generate_telemetry_report,
+)
+
+DEFAULT_STATUS_MIX = {"normal": 0.8, "warning": 0.15, "critical": 0.05}
+DEFAULT_START = "2026-01-01T00:00:00Z"
+CHUNK_SIZE = 100_000  # readings per generated chunk
+
+# Signed thresholds: "toward critical" is always increasing
+_SIGNS = np.array([-1.0 if key in LOWER_IS_WORSE else 1.0 for key in METRIC_KEYS])
+_WARNING = np.array([METRICS[key].thresholds["warning"] for key in METRIC_KEYS]) * _SIGNS
+_CRITICAL = np.array([METRICS[key].thresholds["critical"] for key in METRIC_KEYS]) * _SIGNS
+
+
+# ---- synthetic workloads ----------------------------------------------------
+
+def parse_status_mix(text: str) -> Dict[str, float]:
+    """Parse ``normal=0.8,warning=0.15,critical=0.05`` into normalized weights."""
+    mix = {}
+    for part in text.split(","):
+        status, _, weight = part.partition("=")
+        if status.strip() not in DEFAULT_STATUS_MIX:
+            raise ValueError(f"unknown status '{status.strip()}' in status mix")
+        mix[status.strip()] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("status mix weights must sum to more than zero")
+    return {status: weight / total for status, weight in mix.items()}
+
+
+def generate_reading_chunks(count: int, seed: int = 0, status_mix: Dict[str, float] = DEFAULT_STATUS_MIX,
+                            spread_seconds: int = 3600, start: str = DEFAULT_START,
+                            chunk_size: int = CHUNK_SIZE) -> Iterator[List[TelemetryReading]]:
+    """Yield ``count`` seeded readings in chunks.
+
+    Each reading's status is drawn from ``status_mix`` and its value is
+    drawn from that status's threshold band, so evaluation reproduces the
+    mix. Timestamps are uniform over ``spread_seconds`` from ``start``.
+    """
+    rng = np.random.default_rng(seed)
+    statuses = list(status_mix)
+    weights = np.array([status_mix[status] for status in statuses])
+    band_of = {"normal": 0, "warning": 1, "critical": 2}
+    base = datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp()
+    stamps: Dict[int, str] = {}
+
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        ids = rng.integers(0, len(METRIC_KEYS), size)
+        bands = np.array([band_of[s] for s in statuses])[rng.choice(len(statuses), size, p=weights)]
+        warning, critical = _WARNING[ids], _CRITICAL[ids]
+        width = critical - warning
+        low = np.select([bands == 0, bands == 1], [warning - 2 * width, warning], critical)
+        high = np.select([bands == 0, bands == 1], [warning, critical], critical + width)
+        values = rng.uniform(low, high) * _SIGNS[ids]
+        offsets = np.sort(rng.integers(0, max(1, spread_seconds), size))
+
+        chunk = []
+        for metric_id, value, offset in zip(ids.tolist(), values.tolist(), offsets.tolist()):
+            stamp = stamps.get(offset)
+            if stamp is None:
+                stamp = stamps[offset] = datetime.fromtimestamp(base + offset, timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ")
+            chunk.append(TelemetryReading(METRIC_KEYS[metric_id], value, stamp, ""))
+        yield chunk
+
+
+@contextlib.contextmanager
+def extended_guide_library(extra_guides: int, seed: int = 0):
+    """Temporarily add seeded synthetic guides, spread over the cycles."""
+    rng = random.Random(seed)
+    saved_guides = dict(session_planner.GUIDES)
+    saved_cycles = {key: list(cycle["guides"]) for key, cycle in session_planner.CYCLES.items()}
+    cycle_keys = list(session_planner.CYCLES)
+    for number in range(extra_guides):
+        key = f"synthetic_{number}"
+        codes = sorted({f"T{rng.randint(1, 9)}" for _ in range(rng.randint(1, 3))}, key=lambda c: int(c[1:]))
+        session_planner.GUIDES[key] = Guide(
+            f"Synthetic Guide {number}", rng.choice(["Structure", "Process"]),
+            rng.choice(session_planner.DIMENSIONS), rng.choice([30, 45, 60, 90]), codes, "Synthetic benchmark guide",
+        )
+        session_planner.CYCLES[cycle_keys[number % len(cycle_keys)]]["guides"].append(key)
+    session_planner.solve_guide_selection.cache_clear()
+    try:
+        yield
+    finally:
+        session_planner.GUIDES.clear()
+        session_planner.GUIDES.update(saved_guides)
+        for key, guides in saved_cycles.items():
+            session_planner.CYCLES[key]["guides"] = guides
+        session_planner.solve_guide_selection.cache_clear()
+
+
+def generate_agenda_requests(count: int, seed: int = 0) -> List[dict]:
+    """Seeded ``generate_session_agenda`` keyword arguments."""
+    rng = random.Random(seed)
+    cycles = [None] + list(session_planner.CYCLES)
+    return [
+        {
+            "objective": f"Synthetic objective {number}",
+            "duration_hours": rng.choice([1.5, 2, 3, 4, 6, 8]),
+            "team_size": rng.randint(3, 25),
+            "focus_cycle": rng.choice(cycles),
+        }
+        for number in range(count)
+    ]
+
+
+# ---- benchmarks -------------------------------------------------------------
+
+# A benchmark returns (unit, [(operations, seconds), ...]) with one sample per timed group
+Samples = List[Tuple[int, float]]
+
+
+def _timed_groups(action: Callable[[object], None], items: List, group: int) -> Samples:
+    samples = []
+    for start in range(0, len(items), group):
+        batch = items[start:start + group]
+        begin = time.perf_counter()
+        for item in batch:
+            action(item)
+        samples.append((len(batch), time.perf_counter() - begin))
+    return samples
+
+
+def bench_evaluate_metric(config: dict) -> Tuple[str, Samples]:
+    samples = []
+    for chunk in generate_reading_chunks(config["readings"], config["seed"], config["status_mix"],
+                                         config["spread_seconds"]):
+        pairs = [(reading.metric_key, reading.value) for reading in chunk]
+        samples += _timed_groups(lambda pair: evaluate_metric(*pair), pairs, 1000)
+    return "readings/s", samples
+
+
+def bench_generate_telemetry_report(config: dict) -> Tuple[str, Samples]:
+    # One report over the whole stream (what generate_telemetry_report does,
+    # fed chunk by chunk), timed in sub-batches so there are enough samples
+    # for the percentiles; rendering the report is a sample of no readings
+    group = max(1, min(1000, config["readings"] // 100))
+    state, samples = ReportState(), []
+    for chunk in generate_reading_chunks(config["readings"], config["seed"], config["status_mix"],
+                                         config["spread_seconds"]):
+        for start in range(0, len(chunk), group):
+            batch = chunk[start:start + group]
+            begin = time.perf_counter()
+            state.add(batch)
+            samples.append((len(batch), time.perf_counter() - begin))
+    begin = time.perf_counter()
+    state.to_report()
+    samples.append((0, time.perf_counter() - begin))
+    return "readings/s", samples
+
+
+def bench_format_report_markdown(config: dict) -> Tuple[str, Samples]:
+    reports = [
+        generate_telemetry_report(chunk)
+        for chunk in generate_reading_chunks(min(config["readings"], 20 * 1000), config["seed"],
+                                             config["status_mix"], config["spread_seconds"], chunk_size=1000)
+    ]
+    return "reports/s", _timed_groups(format_report_markdown, reports * 5, 1)
+
+
+def _bench_agendas(config: dict, solver: str) -> Tuple[str, Samples]:
+    requests = generate_agenda_requests(config["agenda_requests"], config["seed"])
+    with extended_guide_library(config["extra_guides"], config["seed"]):
+        return "agendas/s", _timed_groups(lambda r: generate_session_agenda(**r, solver=solver), requests, 1)
+
+
+def bench_generate_session_agenda(config: dict) -> Tuple[str, Samples]:
+    return _bench_agendas(config, "greedy")
+
+
+def bench_generate_session_agenda_optimal(config: dict) -> Tuple[str, Samples]:
+    return _bench_agendas(config, "optimal")
+
+
+def bench_format_agenda_markdown(config: dict) -> Tuple[str, Samples]:
+    requests = generate_agenda_requests(config["agenda_requests"], config["seed"])
+    with extended_guide_library(config["extra_guides"], config["seed"]):
+        agendas = [generate_session_agenda(**request) for request in requests]
+    return "agendas/s", _timed_groups(format_agenda_markdown, agendas, 1)
+
+
+BENCHMARKS: Dict[str, Callable[[dict], Tuple[str, Samples]]] = {
+    "evaluate_metric": bench_evaluate_metric,
+    "generate_telemetry_report": bench_generate_telemetry_report,
+    "format_report_markdown": bench_format_report_markdown,
+    "generate_session_agenda": bench_generate_session_agenda,
+    "generate_session_agenda_optimal": bench_generate_session_agenda_optimal,
+    "format_agenda_markdown": bench_format_agenda_markdown,
+}
+READING_BENCHMARKS = {"evaluate_metric", "generate_telemetry_report", "format_report_markdown"}
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(name: str, config: dict) -> dict:
+    """Run one benchmark ``config["repeat"]`` times in this process; summarize the fastest run."""
+    runs = []
+    for _ in range(config["repeat"]):
+        gc.collect()
+        session_planner.solve_guide_selection.cache_clear()
+        runs.append(BENCHMARKS[name](config))
+    unit, samples = max(runs, key=lambda run: sum(c for c, _ in run[1]) / (sum(e for _, e in run[1]) or 1))
+    operations = sum(count for count, _ in samples)
+    seconds = sum(elapsed for _, elapsed in samples)
+    # Latency per operation, from each timed group
+    latencies = sorted(elapsed / count * 1000 for count, elapsed in samples if count)
+    return {
+        "unit": unit,
+        "operations": operations,
+        "seconds": seconds,
+        "throughput": operations / seconds if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_suite(config: dict, names: List[str]) -> dict:
+    """Run ``names`` each in a fresh worker process (so peak RSS is per benchmark)."""
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            label = f"{name}[{config['readings']}]" if name in READING_BENCHMARKS else name
+            results[label] = pool.submit(run_benchmark, name, config).result()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "config": config,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, rss_tolerance: float) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond the tolerances."""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']:.0f} < "
+                               f"{previous['throughput']:.0f} {current['unit']} (-{tolerance:.0%} allowed)")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.3f} ms > {previous['p95_ms']:.3f} ms "
+                               f"(+{tolerance:.0%} allowed)")
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + rss_tolerance):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']:.1f} MB > "
+                               f"{previous['peak_rss_mb']:.1f} MB (+{rss_tolerance:.0%} allowed)")
+    return regressions
+
+
+def format_results(results: dict, baseline: dict = None) -> str:
+    lines = [
+        f"{'benchmark':<40} {'throughput':>18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8}",
+    ]
+    for name, result in results["benchmarks"].items():
+        line = (f"{name:<40} {result['throughput']:>10.0f} {result['unit']:<7} {result['p50_ms']:>9.4f} "
+                f"{result['p95_ms']:>9.4f} {result['p99_ms']:>9.4f} {result['peak_rss_mb']:>8.1f}")
+        previous = (baseline or {}).get("benchmarks", {}).get(name)
+        if previous and previous["throughput"]:
+            line += f"  ({result['throughput'] / previous['throughput'] - 1:+.1%} vs baseline)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Unicorn Dynamics scripts")
+    parser.add_argument("--readings", type=int, default=100_000, help="Readings per stream (1k to 10M)")
+    parser.add_argument("--status-mix", type=parse_status_mix, default=DEFAULT_STATUS_MIX,
+                        help="e.g. normal=0.8,warning=0.15,critical=0.05")
+    parser.add_argument("--spread-seconds", type=int, default=3600, help="Timestamp spread of each stream")
+    parser.add_argument("--agenda-requests", type=int, default=2000)
+    parser.add_argument("--extra-guides", type=int, default=300, help="Synthetic guides added to the library")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is reported")
+    parser.add_argument("--only", help="Regex selecting benchmarks to run")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to --baseline instead")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed throughput/p95 regression")
+    parser.add_argument("--rss-tolerance", type=float, default=0.25, help="Allowed peak RSS growth")
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline PATH")
+
+    config = {
+        "readings": args.readings,
+        "status_mix": args.status_mix,
+        "spread_seconds": args.spread_seconds,
+        "agenda_requests": args.agenda_requests,
+        "extra_guides": args.extra_guides,
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    names = [name for name in BENCHMARKS if not args.only or re.search(args.only, name)]
+    results = run_suite(config, names)
+
+    baseline = None
+    if args.baseline and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["config"] != config:
+            print("warning: baseline was recorded with a different workload config", file=sys.stderr)
+    print(format_results(results, baseline))
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance, args.rss_tolerance)
+        if regressions:
+            print("\nRegressions:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Compiled Guide Index for Unicorn Dynamics
+
+Builds the guide library from the "Guide Library" and "Planning Cycles"
+tables in ``references/grove-guides.md``. Each guide's T-codes are stored as
+an integer bitmask, and guide sets (per T-code, type, dimension, cycle and
+duration bound) are bitsets over guide ids, so filters are a few integer
+ANDs and results cost O(answer)::
+
+    index = load_index()
+    index.query(t_codes=["T3", "T6"], max_minutes=45)
+
+The compiled index is cached to disk as JSON and rebuilt only when the
+reference's size and mtime change and its SHA-256 no longer matches.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SOURCE = os.path.join(SCRIPTS_DIR, os.pardir, "references", "grove-guides.md")
+
+DEFAULT_CACHE = os.environ.get(
+    "UNICORN_DYNAMICS_GUIDE_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                 "unicorn-dynamics", "guide-index.json"),
+)
+
+CACHE_VERSION = 1
+
+GUIDE_TABLE = "Guide Library"
+CYCLE_TABLE = "Planning Cycles"
+
+
+def t_code_bit(code: str) -> int:
+    """Bit position of a T-code (T1 -> 0 ... T9 -> 8); ``ValueError`` otherwise."""
+    if len(code) != 2 or code[0] != "T" or not "1" <= code[1] <= "9":
+        raise ValueError(f"Unknown T-code '{code}' (expected T1-T9)")
+    return int(code[1]) - 1
+
+
+def t_code_mask(t_codes: List[str]) -> int:
+    """Encode T-codes as a bitmask (T1 -> bit 0 ... T9 -> bit 8)."""
+    mask = 0
+    for code in t_codes:
+        mask |= 1 << t_code_bit(code)
+    return mask
+
+
+def mask_to_t_codes(mask: int) -> List[str]:
+    """Decode a T-code bitmask into a sorted list of T-codes."""
+    return [f"T{bit + 1}" for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the positions of set bits, lowest first, in O(set bits)."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+@dataclass(frozen=True)
+class GuideRecord:
+    key: str
+    name: str
+    type: str
+    dimension: str
+    duration_minutes: int
+    t_mask: int
+    description: str
+
+    @property
+    def t_codes(self) -> List[str]:
+        return mask_to_t_codes(self.t_mask)
+
+
+class GuideIndex:
+    """Guide records plus bitset secondary indexes over guide ids."""
+
+    def __init__(self, guides: List[GuideRecord], cycles: Dict[str, dict]):
+        self.guides = guides
+        self.ids = {guide.key: guide_id for guide_id, guide in enumerate(guides)}
+        self.cycles = cycles
+
+        self.by_t_code = [0] * 9
+        self.by_type: Dict[str, int] = {}
+        self.by_dimension: Dict[str, int] = {}
+        for guide_id, guide in enumerate(guides):
+            bit = 1 << guide_id
+            for code in iter_bits(guide.t_mask):
+                self.by_t_code[code] |= bit
+            self.by_type[guide.type] = self.by_type.get(guide.type, 0) | bit
+            self.by_dimension[guide.dimension] = self.by_dimension.get(guide.dimension, 0) | bit
+
+        self.by_cycle: Dict[str, int] = {}
+        for cycle_key, cycle in cycles.items():
+            bits = 0
+            for guide_key in cycle["guides"]:
+                bits |= 1 << self.ids[guide_key]
+            self.by_cycle[cycle_key] = bits
+
+        # Ascending durations with the bitset of guides at or under each
+        self.durations = sorted({guide.duration_minutes for guide in guides})
+        self.within_minutes = []
+        bits = 0
+        for duration in self.durations:
+            for guide_id, guide in enumerate(guides):
+                if guide.duration_minutes == duration:
+                    bits |= 1 << guide_id
+            self.within_minutes.append(bits)
+
+    @property
+    def all_bits(self) -> int:
+        return (1 << len(self.guides)) - 1
+
+    def select(self, t_codes: Optional[List[str]] = None, all_codes: bool = False,
+               max_minutes: Optional[int] = None, type: Optional[str] = None,
+               dimension: Optional[str] = None, cycle: Optional[str] = None) -> int:
+        """Bitset of guide ids matching every given filter.
+
+        ``t_codes`` matches guides covering any of the codes (``T3|T6``), or
+        all of them when ``all_codes`` is set (``T3&T6``).
+        """
+        bits = self.all_bits
+        if t_codes:
+            postings = [self.by_t_code[t_code_bit(code)] for code in t_codes]
+            covering = postings[0]
+            for posting in postings[1:]:
+                covering = covering & posting if all_codes else covering | posting
+            bits &= covering
+        if max_minutes is not None:
+            position = bisect.bisect_right(self.durations, max_minutes)
+            bits &= self.within_minutes[position - 1] if position else 0
+        if type is not None:
+            bits &= self.by_type.get(type, 0)
+        if dimension is not None:
+            bits &= self.by_dimension.get(dimension, 0)
+        if cycle is not None:
+            bits &= self.by_cycle.get(cycle, 0)
+        return bits
+
+    def query(self, **filters) -> List[GuideRecord]:
+        """Guides matching ``select(**filters)``, in library order."""
+        return [self.guides[guide_id] for guide_id in iter_bits(self.select(**filters))]
+
+    def to_dict(self) -> dict:
+        return {
+            "guides": [
+                [g.key, g.name, g.type, g.dimension, g.duration_minutes, g.t_mask, g.description]
+                for g in self.guides
+            ],
+            "cycles": self.cycles,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GuideIndex":
+        return cls([GuideRecord(*row) for row in data["guides"]], data["cycles"])
+
+
+def _parse_table(lines: List[str], heading: str, source: str) -> List[dict]:
+    """Rows of the first Markdown table under ``## heading`` as dicts."""
+    try:
+        start = lines.index(f"## {heading}")
+    except ValueError:
+        raise ValueError(f"{source}: missing '## {heading}' section") from None
+
+    header, rows = None, []
+    for number, line in enumerate(lines[start + 1:], start + 2):
+        if line.startswith("## "):
+            break
+        if not line.startswith("|"):
+            if rows:
+                break
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if header is None:
+            header = cells
+        elif set(cells[0]) <= set("-: "):
+            continue
+        elif len(cells) != len(header):
+            raise ValueError(f"{source}:{number}: expected {len(header)} columns, got {len(cells)}")
+        else:
+            rows.append(dict(zip(header, cells)))
+    if not rows:
+        raise ValueError(f"{source}: no table rows under '## {heading}'")
+    return rows
+
+
+def _split_list(cell: str) -> List[str]:
+    return [item.strip() for item in cell.split(",") if item.strip()]
+
+
+def compile_index(path: str = DEFAULT_SOURCE) -> GuideIndex:
+    """Parse the reference tables into a ``GuideIndex``."""
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    guides = [
+        GuideRecord(row["Key"], row["Guide"], row["Type"], row["Dimension"], int(row["Minutes"]),
+                    t_code_mask(_split_list(row["T-Codes"])), row["Description"])
+        for row in _parse_table(lines, GUIDE_TABLE, path)
+    ]
+    known = {guide.key for guide in guides}
+    cycles = {}
+    for row in _parse_table(lines, CYCLE_TABLE, path):
+        guide_keys = _split_list(row["Guides"])
+        unknown = [key for key in guide_keys if key not in known]
+        if unknown:
+            raise ValueError(f"{path}: cycle '{row['Key']}' lists unknown guides {unknown}")
+        cycles[row["Key"]] = {
+            "name": row["Cycle"],
+            "guides": guide_keys,
+            "t_codes": _split_list(row["T-Codes"]),
+            "description": row["Description"],
+        }
+    return GuideIndex(guides, cycles)
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_index(path: str = DEFAULT_SOURCE, cache_path: Optional[str] = DEFAULT_CACHE) -> GuideIndex:
+    """Load the compiled index, rebuilding the disk cache when the source changed.
+
+    The cache is trusted while the source's size and mtime are unchanged;
+    otherwise the source is hashed and only re-parsed if its content differs.
+    An unwritable cache location just means compiling on every load.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = None
+    if cache_path:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        if not cached or cached.get("version") != CACHE_VERSION or cached.get("source") != path:
+            cached = None
+
+    if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+        return GuideIndex.from_dict(cached)
+
+    digest = _file_sha256(path)
+    index = GuideIndex.from_dict(cached) if cached and cached["sha256"] == digest else compile_index(path)
+    if cache_path:
+        entry = {"version": CACHE_VERSION, "source": path, "mtime_ns": stat.st_mtime_ns,
+                 "size": stat.st_size, "sha256": digest, **index.to_dict()}
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temporary, cache_path)
+        except OSError:
+            pass
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the compiled Grove guide index")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Reference Markdown with the guide tables")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Compiled index cache path ('' disables)")
+    parser.add_argument("--t-codes", help="T-codes to cover: 'T3|T6' (any) or 'T3&T6' (all)")
+    parser.add_argument("--max-minutes", type=int, help="Only guides at or under this duration")
+    parser.add_argument("--type", help="Structure or Process")
+    parser.add_argument("--dimension", help="Performance, Potential, Commitment or General")
+    parser.add_argument("--cycle", help="Planning cycle key, e.g. future_planning")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    all_codes = bool(args.t_codes) and "&" in args.t_codes
+    t_codes = [code.strip() for code in args.t_codes.replace("&", "|").split("|")] if args.t_codes else None
+    index = load_index(args.source, args.cache or None)
+    try:
+        matches = index.query(t_codes=t_codes, all_codes=all_codes, max_minutes=args.max_minutes,
+                              type=args.type, dimension=args.dimension, cycle=args.cycle)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.json:
+        print(json.dumps([
+            {"key": g.key, "name": g.name, "type": g.type, "dimension": g.dimension,
+             "duration_minutes": g.duration_minutes, "t_codes": g.t_codes}
+            for g in matches
+        ], indent=2))
+        return
+    for guide in matches:
+        print(f"{guide.key:<26} {guide.duration_minutes:>3} min  {guide.type:<9} {guide.dimension:<11} "
+              f"{', '.join(guide.t_codes)}")
+    print(f"{len(matches)} of {len(index.guides)} guides", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
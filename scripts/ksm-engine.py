@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+KSM Engine for Unicorn Dynamics
+
+Runs the KSM 12-step process from SKILL.md as a state machine: the outer
+solution loop (steps 1-3 and 10-12) chooses the weakest latent centre and
+the inner iteration loop (steps 4-9) strengthens it and the centres around
+it until its iteration vision is met.
+
+The problem is a JSON document of nested, related centres::
+
+    {
+      "problem": "Fragmented onboarding",
+      "solution_vision": 0.75,
+      "centres": [
+        {"key": "onboarding", "name": "Onboarding", "strength": 0.4},
+        {"key": "buddy", "name": "Buddy system", "parent": "onboarding",
+         "strength": 0.2, "relations": ["docs"]},
+        {"key": "docs", "name": "Docs", "parent": "onboarding", "strength": 0.6}
+      ]
+    }
+
+A centre's life depends on its own strength, the life of the centres
+nested in it and the strength of the centres it relates to. Lives are
+memoized; a strength change marks only the centre, the centres related to
+it and (while the value keeps changing) its ancestors dirty, and only dirty
+centres are re-assessed, deepest first. The whole engine state, including
+the memoized lives, checkpoints to JSON and resumes from it.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import List, Optional
+
+# Weights of a centre's own strength, its nested centres' life and its
+# related centres' strength in its life
+OWN_WEIGHT = 0.5
+NESTED_WEIGHT = 0.35
+RELATED_WEIGHT = 0.15
+
+CHECKPOINT_VERSION = 1
+
+
+class Step(IntEnum):
+    ANALYZE_PROBLEM = 1
+    DIFFERENTIATE_TASKS = 2
+    CHOOSE_CRITICAL_CENTRE = 3
+    IDENTIFY_CONSTRAINTS = 4
+    DIFFERENTIATE_SUB_TASKS = 5
+    STRENGTHEN_CENTRES = 6
+    INTEGRATE_ITERATION_VISION = 7
+    EVALUATE_ITERATION = 8
+    ASSESS_ITERATION_VISION = 9
+    INTEGRATE_SOLUTION_VISION = 10
+    EVALUATE_SOLUTION = 11
+    ASSESS_SOLUTION_VISION = 12
+    DONE = 13
+
+
+@dataclass
+class Centre:
+    key: str
+    name: str
+    parent: Optional[str] = None
+    strength: float = 0.0
+    relations: List[str] = field(default_factory=list)
+
+
+class CentreGraph:
+    """Centres as index arrays, with memoized lives and dirty tracking."""
+
+    def __init__(self, centres: List[Centre]):
+        self.keys = [centre.key for centre in centres]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        if len(self.index) != len(self.keys):
+            raise ValueError("centre keys must be unique")
+        self.names = [centre.name for centre in centres]
+        self.strength = [float(centre.strength) for centre in centres]
+        self.parent = [self._lookup(centre.parent, centre.key) if centre.parent else -1 for centre in centres]
+        self.related = [[self._lookup(key, centre.key) for key in centre.relations] for centre in centres]
+        self.related_by: List[List[int]] = [[] for _ in centres]
+        self.children: List[List[int]] = [[] for _ in centres]
+        for i, related in enumerate(self.related):
+            for j in related:
+                self.related_by[j].append(i)
+        for i, parent in enumerate(self.parent):
+            if parent >= 0:
+                self.children[parent].append(i)
+        self.depth = self._depths()
+        self.roots = [i for i, parent in enumerate(self.parent) if parent < 0]
+
+        self.life = [0.0] * len(centres)
+        self.nested_sum = [0.0] * len(centres)
+        self.dirty = set(range(len(centres)))
+        self.assessments = 0
+
+    def _lookup(self, key: str, referrer: str) -> int:
+        if key not in self.index:
+            raise ValueError(f"centre '{referrer}' refers to unknown centre '{key}'")
+        return self.index[key]
+
+    def _depths(self) -> List[int]:
+        depth = [-1] * len(self.keys)
+        for i in range(len(self.keys)):
+            path = []
+            j = i
+            while j >= 0 and depth[j] < 0:
+                if j in path:
+                    raise ValueError(f"centre '{self.keys[j]}' is nested in itself")
+                path.append(j)
+                j = self.parent[j]
+            base = depth[j] if j >= 0 else -1
+            for k in reversed(path):
+                base += 1
+                depth[k] = base
+        return depth
+
+    def centres(self) -> List[Centre]:
+        return [
+            Centre(key, self.names[i], self.keys[self.parent[i]] if self.parent[i] >= 0 else None,
+                   self.strength[i], [self.keys[j] for j in self.related[i]])
+            for i, key in enumerate(self.keys)
+        ]
+
+    def set_strength(self, i: int, strength: float) -> None:
+        """Change a centre's strength, dirtying it and the centres related to it."""
+        self.strength[i] = min(1.0, max(0.0, strength))
+        self.dirty.add(i)
+        self.dirty.update(self.related_by[i])
+
+    def _assess(self, i: int) -> float:
+        own = self.strength[i]
+        children = self.children[i]
+        nested = self.nested_sum[i] / len(children) if children else own
+        related = self.related[i]
+        linked = sum(self.strength[j] for j in related) / len(related) if related else own
+        return OWN_WEIGHT * own + NESTED_WEIGHT * nested + RELATED_WEIGHT * linked
+
+    def assess(self, changed: Optional[list] = None) -> int:
+        """Re-assess dirty centres, deepest first; return how many were assessed.
+
+        A parent is only dirtied when its child's life actually changed.
+        Indexes whose life changed are appended to ``changed``.
+        """
+        heap = [(-self.depth[i], i) for i in self.dirty]
+        heapq.heapify(heap)
+        queued = self.dirty
+        self.dirty = set()
+        assessed = 0
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            life = self._assess(i)
+            assessed += 1
+            previous = self.life[i]
+            if life == previous:
+                continue
+            self.life[i] = life
+            if changed is not None:
+                changed.append(i)
+            parent = self.parent[i]
+            if parent >= 0:
+                self.nested_sum[parent] += life - previous
+                if parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(heap, (-self.depth[parent], parent))
+        self.assessments += assessed
+        return assessed
+
+    def wholeness(self) -> float:
+        """Life of the structure as a whole (mean life of the root centres)."""
+        return sum(self.life[i] for i in self.roots) / len(self.roots) if self.roots else 0.0
+
+
+class KsmEngine:
+    """The KSM nested loops over a ``CentreGraph``.
+
+    ``gain`` is the share of a centre's missing strength one strengthening
+    adds; an outer iteration whose critical centre gains less than
+    ``min_gain`` life marks it exhausted so it is not chosen again.
+    """
+
+    def __init__(self, problem: str, centres: List[Centre], solution_vision: float = 0.75,
+                 gain: float = 0.3, max_inner: int = 8, min_gain: float = 1e-3):
+        self.problem = problem
+        self.graph = CentreGraph(centres)
+        self.solution_vision = solution_vision
+        self.gain = gain
+        self.max_inner = max_inner
+        self.min_gain = min_gain
+
+        self.step = Step.ANALYZE_PROBLEM
+        self.outer = 0
+        self.inner = 0
+        self.critical: Optional[int] = None
+        self.critical_life = 0.0
+        self.iteration_vision = 0.0
+        self.iteration_centres: List[int] = []
+        self.exhausted = set()
+        self.solved = False
+        self.history: List[dict] = []
+        self._latent: List[tuple] = []  # lazy min-heap of (life, index)
+
+    # ---- graph updates ------------------------------------------------------
+
+    def update_centre(self, key: str, strength: float) -> None:
+        """Record an outside change to a centre; it becomes choosable again."""
+        i = self.graph.index[key]
+        self.graph.set_strength(i, strength)
+        self.exhausted.discard(i)
+        if self.step == Step.DONE:
+            self.step = Step.CHOOSE_CRITICAL_CENTRE
+            self.solved = False
+
+    def _assess(self) -> int:
+        changed: List[int] = []
+        assessed = self.graph.assess(changed)
+        life = self.graph.life
+        for i in changed:
+            heapq.heappush(self._latent, (life[i], i))
+        return assessed
+
+    def _weakest_latent(self) -> Optional[int]:
+        """The weakest centre below the solution vision that is not exhausted."""
+        life = self.graph.life
+        while self._latent:
+            value, i = self._latent[0]
+            if value != life[i] or i in self.exhausted or value >= self.solution_vision:
+                heapq.heappop(self._latent)
+                continue
+            return i
+        # Entries were dropped as exhausted or met; rebuild once from the memoized lives
+        self._latent = [(value, i) for i, value in enumerate(life)
+                        if value < self.solution_vision and i not in self.exhausted]
+        heapq.heapify(self._latent)
+        return self._latent[0][1] if self._latent else None
+
+    # ---- steps --------------------------------------------------------------
+
+    def advance(self) -> Step:
+        """Run the current step and move to the next; return the new step."""
+        graph = self.graph
+        step = self.step
+        if step == Step.ANALYZE_PROBLEM:
+            self._assess()
+            self.history.append({"event": "analyzed", "centres": len(graph.keys), "wholeness": graph.wholeness()})
+            self.step = Step.DIFFERENTIATE_TASKS
+        elif step == Step.DIFFERENTIATE_TASKS:
+            self._latent = [(value, i) for i, value in enumerate(graph.life)]
+            heapq.heapify(self._latent)
+            self.step = Step.CHOOSE_CRITICAL_CENTRE
+        elif step == Step.CHOOSE_CRITICAL_CENTRE:
+            self.critical = self._weakest_latent()
+            self.step = Step.DONE if self.critical is None else Step.IDENTIFY_CONSTRAINTS
+        elif step == Step.IDENTIFY_CONSTRAINTS:
+            self.critical_life = graph.life[self.critical]
+            self.iteration_vision = self.solution_vision
+            self.inner = 0
+            self.step = Step.DIFFERENTIATE_SUB_TASKS
+        elif step == Step.DIFFERENTIATE_SUB_TASKS:
+            i = self.critical
+            candidates = dict.fromkeys([i] + graph.children[i] + graph.related[i])
+            self.iteration_centres = [j for j in candidates if graph.strength[j] < self.iteration_vision]
+            self.step = Step.STRENGTHEN_CENTRES
+        elif step == Step.STRENGTHEN_CENTRES:
+            for j in self.iteration_centres:
+                graph.set_strength(j, graph.strength[j] + self.gain * (1.0 - graph.strength[j]))
+            self.step = Step.INTEGRATE_ITERATION_VISION
+        elif step == Step.INTEGRATE_ITERATION_VISION:
+            self._assess()
+            self.step = Step.EVALUATE_ITERATION
+        elif step == Step.EVALUATE_ITERATION:
+            # The simplest differentiation: stop strengthening what already meets the vision
+            self.iteration_centres = [j for j in self.iteration_centres
+                                      if graph.strength[j] < self.iteration_vision]
+            self.step = Step.ASSESS_ITERATION_VISION
+        elif step == Step.ASSESS_ITERATION_VISION:
+            self.inner += 1
+            met = graph.life[self.critical] >= self.iteration_vision
+            self.step = (Step.INTEGRATE_SOLUTION_VISION
+                         if met or not self.iteration_centres or self.inner >= self.max_inner
+                         else Step.STRENGTHEN_CENTRES)
+        elif step == Step.INTEGRATE_SOLUTION_VISION:
+            improvement = graph.life[self.critical] - self.critical_life
+            if improvement < self.min_gain:
+                self.exhausted.add(self.critical)
+            self.history.append({
+                "event": "iteration", "outer": self.outer + 1, "centre": graph.keys[self.critical],
+                "inner_iterations": self.inner, "life_before": self.critical_life,
+                "life_after": graph.life[self.critical], "wholeness": graph.wholeness(),
+            })
+            self.step = Step.EVALUATE_SOLUTION
+        elif step == Step.EVALUATE_SOLUTION:
+            self.solved = graph.wholeness() >= self.solution_vision
+            self.step = Step.ASSESS_SOLUTION_VISION
+        elif step == Step.ASSESS_SOLUTION_VISION:
+            self.outer += 1
+            self.critical = None
+            self.step = Step.DONE if self.solved else Step.CHOOSE_CRITICAL_CENTRE
+        return self.step
+
+    def run(self, max_outer: Optional[int] = None, checkpoint_path: Optional[str] = None,
+            checkpoint_every: int = 1) -> "KsmEngine":
+        """Advance until done or ``max_outer`` more outer iterations have run.
+
+        With ``checkpoint_path`` the state is saved every ``checkpoint_every``
+        outer iterations and when the run stops.
+        """
+        stop_at = self.outer + max_outer if max_outer is not None else None
+        while self.step != Step.DONE and (stop_at is None or self.outer < stop_at):
+            if self.advance() == Step.CHOOSE_CRITICAL_CENTRE and checkpoint_path and \
+                    self.outer % checkpoint_every == 0:
+                self.save(checkpoint_path)
+        if self.step == Step.DONE and (not self.history or self.history[-1]["event"] != "done"):
+            self.history.append({"event": "done", "solved": self.solved, "outer": self.outer,
+                                 "wholeness": self.graph.wholeness()})
+        if checkpoint_path:
+            self.save(checkpoint_path)
+        return self
+
+    # ---- checkpoints --------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        graph = self.graph
+        return {
+            "version": CHECKPOINT_VERSION,
+            "problem": self.problem,
+            "solution_vision": self.solution_vision,
+            "gain": self.gain,
+            "max_inner": self.max_inner,
+            "min_gain": self.min_gain,
+            "centres": [
+                {"key": c.key, "name": c.name, "parent": c.parent, "strength": c.strength, "relations": c.relations}
+                for c in graph.centres()
+            ],
+            "life": graph.life,
+            "nested_sum": graph.nested_sum,
+            "dirty": sorted(graph.keys[i] for i in graph.dirty),
+            "assessments": graph.assessments,
+            "state": {
+                "step": self.step.name,
+                "outer": self.outer,
+                "inner": self.inner,
+                "critical": graph.keys[self.critical] if self.critical is not None else None,
+                "critical_life": self.critical_life,
+                "iteration_vision": self.iteration_vision,
+                "iteration_centres": [graph.keys[i] for i in self.iteration_centres],
+                "exhausted": sorted(graph.keys[i] for i in self.exhausted),
+                "solved": self.solved,
+                "history": self.history,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KsmEngine":
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"unsupported checkpoint version {data.get('version')!r}")
+        engine = cls(data["problem"], [Centre(**centre) for centre in data["centres"]],
+                     data["solution_vision"], data["gain"], data["max_inner"], data["min_gain"])
+        graph = engine.graph
+        graph.life = [float(value) for value in data["life"]]
+        graph.nested_sum = [float(value) for value in data["nested_sum"]]
+        graph.dirty = {graph.index[key] for key in data["dirty"]}
+        graph.assessments = data["assessments"]
+
+        state = data["state"]
+        engine.step = Step[state["step"]]
+        engine.outer, engine.inner = state["outer"], state["inner"]
+        engine.critical = graph.index[state["critical"]] if state["critical"] is not None else None
+        engine.critical_life = state["critical_life"]
+        engine.iteration_vision = state["iteration_vision"]
+        engine.iteration_centres = [graph.index[key] for key in state["iteration_centres"]]
+        engine.exhausted = {graph.index[key] for key in state["exhausted"]}
+        engine.solved = state["solved"]
+        engine.history = state["history"]
+        engine._latent = [(value, i) for i, value in enumerate(graph.life)]
+        heapq.heapify(engine._latent)
+        return engine
+
+    def save(self, path: str) -> None:
+        """Write a checkpoint atomically (a crash leaves the previous one)."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "KsmEngine":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_problem(data: dict, **options) -> KsmEngine:
+    """Build an engine from a problem document (see module docstring)."""
+    centres = [
+        Centre(c["key"], c.get("name", c["key"]), c.get("parent"), c.get("strength", 0.0), c.get("relations", []))
+        for c in data["centres"]
+    ]
+    return KsmEngine(data.get("problem", ""), centres, data.get("solution_vision", 0.75), **options)
+
+
+def synthetic_problem(count: int, seed: int = 0, branching: int = 6) -> dict:
+    """A seeded centre hierarchy of ``count`` centres with sparse relations."""
+    rng = random.Random(seed)
+    centres = []
+    for i in range(count):
+        parent = None if i == 0 else f"c{rng.randint(max(0, (i - 1) // branching - 2), (i - 1) // branching)}"
+        relations = sorted({f"c{rng.randrange(count)}" for _ in range(rng.randint(0, 2))} - {f"c{i}"})
+        centres.append({"key": f"c{i}", "name": f"Centre {i}", "parent": parent,
+                        "strength": round(rng.uniform(0.1, 0.9), 3), "relations": relations})
+    return {"problem": f"Synthetic problem with {count} centres", "solution_vision": 0.75, "centres": centres}
+
+
+def format_run_markdown(engine: KsmEngine, limit: int = 20) -> str:
+    graph = engine.graph
+    iterations = [event for event in engine.history if event["event"] == "iteration"]
+    lines = [
+        f"# KSM Run: {engine.problem}",
+        "",
+        f"**Solution Vision:** wholeness {engine.solution_vision}",
+        f"**Wholeness:** {graph.wholeness():.3f} ({'met' if engine.solved else 'not met'})",
+        f"**Outer Iterations:** {engine.outer} | **Step:** {engine.step.value} ({engine.step.name})",
+        f"**Centres:** {len(graph.keys)} | **Assessments:** {graph.assessments}",
+        "",
+    ]
+    if iterations:
+        lines.append("| # | Critical Centre | Inner | Life Before | Life After | Wholeness |")
+        lines.append("|---|-----------------|-------|-------------|------------|-----------|")
+        for event in iterations[-limit:]:
+            name = graph.names[graph.index[event["centre"]]]
+            lines.append(f"| {event['outer']} | {name} | {event['inner_iterations']} | "
+                         f"{event['life_before']:.3f} | {event['life_after']:.3f} | {event['wholeness']:.3f} |")
+        if len(iterations) > limit:
+            lines.append(f"\n*{len(iterations) - limit} earlier iterations omitted*")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the KSM nested loops over a centre hierarchy")
+    parser.add_argument("problem", nargs="?", help="JSON problem document (see module docstring)")
+    parser.add_argument("--synthetic", type=int, metavar="CENTRES", help="Run a generated hierarchy instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", metavar="PATH", help="Save state here as the run progresses")
+    parser.add_argument("--checkpoint-every", type=int, default=500, metavar="N",
+                        help="Outer iterations between checkpoints (default: 500; always saved at the end)")
+    parser.add_argument("--resume", action="store_true", help="Continue from --checkpoint")
+    parser.add_argument("--max-outer", type=int, help="Stop after this many more outer iterations")
+    parser.add_argument("--gain", type=float, default=0.3, help="Share of missing strength one strengthening adds")
+    parser.add_argument("--max-inner", type=int, default=8, help="Inner iterations per critical centre")
+    parser.add_argument("--json", action="store_true", help="Print the engine state as JSON")
+    args = parser.parse_args()
+
+    if args.resume:
+        if not args.checkpoint or not os.path.exists(args.checkpoint):
+            parser.error("--resume needs an existing --checkpoint PATH")
+        engine = KsmEngine.load(args.checkpoint)
+    elif args.problem or args.synthetic:
+        if args.synthetic:
+            data = synthetic_problem(args.synthetic, args.seed)
+        else:
+            with open(args.problem, encoding="utf-8") as f:
+                data = json.load(f)
+        engine = load_problem(data, gain=args.gain, max_inner=args.max_inner)
+    else:
+        parser.error("a problem file, --synthetic CENTRES or --resume is required")
+
+    start, outer_before, assessed_before = time.perf_counter(), engine.outer, engine.graph.assessments
+    engine.run(args.max_outer, args.checkpoint, args.checkpoint_every)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(engine.to_dict(), indent=2))
+    else:
+        print(format_run_markdown(engine))
+    outer = engine.outer - outer_before
+    print(f"Ran {outer} outer iterations over {len(engine.graph.keys)} centres in {elapsed:.3f}s "
+          f"({engine.graph.assessments - assessed_before} assessments)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
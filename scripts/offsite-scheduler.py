@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Off-site Scheduler for Unicorn Dynamics
+
+Schedules the guide sessions of many teams' agendas (from
+``generate_session_agenda``) across shared rooms and facilitators. The
+input is a JSON document; times are minutes from the start of the day::
+
+    {
+      "horizon_minutes": 600,
+      "rooms": [{"id": "Oak", "capacity": 12}],
+      "facilitators": [{"id": "Ana", "skills": ["Process", "Structure"],
+                        "available": [[0, 300], [360, 600]]}],
+      "teams": [{"id": "Sales", "objective": "...", "duration_hours": 4,
+                 "team_size": 9, "focus_cycle": null, "available": [[0, 600]]}]
+    }
+
+Each team's sessions keep their agenda order (and so the phase order of
+``CYCLES``), with at least the agenda's break time between phases. Rooms
+must seat the team and facilitators must list the guide's type (or name)
+in ``skills``. Per-resource bookings are kept in interval trees; a list
+scheduler places each team's next session at the earliest slot found via
+per-pool queues of free-slot hints (smallest fitting room first), and an
+optional ruin-and-recreate local search improves the makespan.
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import script_loader  # noqa: F401  (makes session_planner importable)
+from session_planner import generate_session_agenda
+
+
+class _Node:
+    __slots__ = ("key", "start", "end", "item", "priority", "max_end", "left", "right")
+
+    def __init__(self, key: tuple, item, priority: float):
+        self.key = key
+        self.start, self.end = key[0], key[1]
+        self.item = item
+        self.priority = priority
+        self.max_end = self.end
+        self.left = None
+        self.right = None
+
+    def update(self) -> None:
+        self.max_end = max(self.end,
+                           self.left.max_end if self.left else self.end,
+                           self.right.max_end if self.right else self.end)
+
+
+class IntervalTree:
+    """Half-open intervals in a treap ordered by start, augmented with max end.
+
+    Insert, remove and "first interval overlapping [start, end)" are
+    O(log n) expected.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.root: Optional[_Node] = None
+        self.size = 0
+        self._counter = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, start: int, end: int, item=None) -> tuple:
+        """Add ``[start, end)`` and return its key (needed for ``remove``)."""
+        self._counter += 1
+        key = (start, end, self._counter)
+        self.root = self._insert(self.root, _Node(key, item, self._rng.random()))
+        self.size += 1
+        return key
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = self._rotate_left(node)
+        node.update()
+        return node
+
+    def remove(self, key: tuple) -> None:
+        self.root = self._remove(self.root, key)
+        self.size -= 1
+
+    def _remove(self, node: Optional[_Node], key: tuple) -> Optional[_Node]:
+        if node is None:
+            raise KeyError(key)
+        if key < node.key:
+            node.left = self._remove(node.left, key)
+        elif key > node.key:
+            node.right = self._remove(node.right, key)
+        elif node.left is None or node.right is None:
+            return node.left or node.right
+        elif node.left.priority > node.right.priority:
+            node = self._rotate_right(node)
+            node.right = self._remove(node.right, key)
+        else:
+            node = self._rotate_left(node)
+            node.left = self._remove(node.left, key)
+        node.update()
+        return node
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left, pivot.right = pivot.right, node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right, pivot.left = pivot.left, node
+        node.update()
+        pivot.update()
+        return pivot
+
+    def first_overlap(self, start: int, end: int) -> Optional[_Node]:
+        """The earliest-starting interval overlapping ``[start, end)``, if any."""
+        node, found = self.root, None
+        while node is not None and node.max_end > start:
+            if node.left is not None and node.left.max_end > start:
+                # Any overlap on the left starts earlier than this node
+                node = node.left
+                continue
+            if node.start >= end:
+                break
+            if node.end > start:
+                found = node
+                break
+            node = node.right
+        return found
+
+    def overlaps(self, start: int, end: int) -> List[_Node]:
+        """All intervals overlapping ``[start, end)``, by start."""
+        result, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.right if node.start < end else None)
+            if node.start < end and node.end > start:
+                result.append(node)
+            stack.append(node.left)
+        return sorted(result, key=lambda node: node.key)
+
+
+def _fit_window(windows: List[Tuple[int, int]], window_ends: List[int], start: int, duration: int) -> Optional[int]:
+    """Earliest time >= ``start`` where ``duration`` fits inside one window."""
+    for window_start, window_end in windows[bisect.bisect_right(window_ends, start):]:
+        begin = max(start, window_start)
+        if begin + duration <= window_end:
+            return begin
+    return None
+
+
+def _earliest_among(resources: List["Resource"], start: int, duration: int) -> Tuple[Optional[int], "Resource"]:
+    """The resource that frees up first (earlier in the list on ties)."""
+    best_slot, best = None, None
+    for resource in resources:
+        slot = resource.earliest(start, duration, best_slot)
+        if slot is not None:
+            best_slot, best = slot, resource
+            if slot == start:
+                break
+    return best_slot, best
+
+
+class ResourceQueue:
+    """Resources of one pool ordered by when each was last seen free.
+
+    Each resource has a hint: a lower bound on its next free slot (for one
+    session duration) that holds for queries starting at or after the start
+    it was computed for. A query re-checks only the head of the heap, so
+    resources busy since their hint sink without being probed. Hints from
+    later queries could hide an earlier gap, so a query first re-probes
+    those resources from its own start.
+    """
+
+    def __init__(self, resources: List["Resource"], duration: int):
+        self.duration = duration
+        self.resources = resources
+        self.hints = [0] * len(resources)
+        self.since = [0] * len(resources)
+        self.heap = [(0, order) for order in range(len(resources))]
+        self.recent: List[Tuple[int, int]] = []  # (since, order) for hints computed after 0, sorted
+
+    def _hint(self, order: int, hint, since: int) -> None:
+        if self.since[order]:
+            del self.recent[bisect.bisect_left(self.recent, (self.since[order], order))]
+        if since:
+            bisect.insort(self.recent, (since, order))
+        self.hints[order], self.since[order] = hint, since
+        heapq.heappush(self.heap, (hint, order))
+
+    def first_free(self, start: int) -> Tuple[Optional[int], "Resource"]:
+        best_slot, best_order = None, None
+        stale = sorted(order for _, order in self.recent[bisect.bisect_right(self.recent, (start, math.inf)):])
+        for order in stale:
+            slot = self.resources[order].earliest(start, self.duration, best_slot)
+            if slot is not None:
+                best_slot, best_order = slot, order
+                self._hint(order, slot, start)
+            else:
+                # No slot before best_slot (or at all): a bound either way
+                self._hint(order, math.inf if best_slot is None else best_slot, start)
+
+        while self.heap:
+            hint, order = self.heap[0]
+            if hint != self.hints[order]:
+                heapq.heappop(self.heap)  # superseded
+                continue
+            if hint == math.inf or (best_slot is not None and (hint, order) > (best_slot, best_order)):
+                break
+            probe = max(hint, start)
+            slot = self.resources[order].earliest(probe, self.duration)
+            if slot == probe:
+                return slot, self.resources[order]
+            heapq.heappop(self.heap)
+            self._hint(order, math.inf if slot is None else slot, start)
+        return (best_slot, self.resources[best_order]) if best_slot is not None else (None, None)
+
+
+class Resource:
+    """A room or facilitator: availability windows plus booked intervals."""
+
+    def __init__(self, id: str, windows: List[Tuple[int, int]], capacity: int = 0, skills=()):
+        self.id = id
+        self.windows = sorted((int(start), int(end)) for start, end in windows)
+        self.window_ends = [end for _, end in self.windows]
+        self.capacity = capacity
+        self.skills = frozenset(skills)
+        self.bookings = IntervalTree()
+
+    def earliest(self, start: int, duration: int, before: Optional[int] = None) -> Optional[int]:
+        """Earliest free, available start >= ``start`` (and < ``before``), or None."""
+        while True:
+            start = _fit_window(self.windows, self.window_ends, start, duration)
+            if start is None or (before is not None and start >= before):
+                return None
+            conflict = self.bookings.first_overlap(start, start + duration)
+            if conflict is None:
+                return start
+            start = conflict.end
+
+    def book(self, start: int, end: int, item=None) -> tuple:
+        return self.bookings.insert(start, end, item)
+
+    def release(self, key: tuple) -> None:
+        self.bookings.remove(key)
+
+
+@dataclass
+class Session:
+    team: str
+    index: int
+    name: str
+    type: str
+    duration: int
+    gap_before: int  # minimum minutes after the previous session (breaks)
+
+
+@dataclass
+class Team:
+    id: str
+    size: int
+    windows: List[Tuple[int, int]]
+    sessions: List[Session] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.windows = sorted((int(start), int(end)) for start, end in self.windows)
+        self.window_ends = [end for _, end in self.windows]
+
+
+@dataclass
+class Assignment:
+    team: str
+    session: str
+    type: str
+    room: str
+    facilitator: str
+    start: int
+    end: int
+
+
+def team_sessions(team_id: str, agenda: dict) -> List[Session]:
+    """Guide sessions of an agenda in order, with break time as minimum gaps."""
+    sessions, gap = [], 0
+    for entry in agenda["sessions"]:
+        if entry["type"] == "Break":
+            gap += entry["duration"]
+        elif entry["type"] != "Phase":
+            sessions.append(Session(team_id, len(sessions), entry["name"], entry["type"], entry["duration"], gap))
+            gap = 0
+    return sessions
+
+
+class OffsiteScheduler:
+    """List scheduler with ruin-and-recreate improvement."""
+
+    def __init__(self, config: dict):
+        horizon = int(config.get("horizon_minutes", 24 * 60))
+        everything = [(0, horizon)]
+        self.rooms = sorted(
+            (Resource(room["id"], room.get("available", everything), capacity=int(room.get("capacity", 0)))
+             for room in config["rooms"]),
+            key=lambda room: room.capacity,
+        )
+        self.facilitators = [
+            Resource(person["id"], person.get("available", everything), skills=person.get("skills", ()))
+            for person in config["facilitators"]
+        ]
+        self.teams: List[Team] = []
+        for spec in config["teams"]:
+            agenda = generate_session_agenda(
+                spec.get("objective", ""), float(spec.get("duration_hours", 4)), int(spec.get("team_size", 10)),
+                spec.get("focus_cycle"), spec.get("include_startup", True), spec.get("solver", "greedy"),
+            )
+            team = Team(str(spec["id"]), int(spec.get("team_size", 10)), spec.get("available", everything))
+            team.sessions = team_sessions(team.id, agenda)
+            self.teams.append(team)
+
+        self._room_choices: Dict[int, List[Resource]] = {}
+        self._facilitator_choices: Dict[Tuple[str, str], List[Resource]] = {}
+        self._queues: Dict[tuple, ResourceQueue] = {}
+        # team index -> [(assignment, room, room key, facilitator, facilitator key)] in session order
+        self.placed: List[List[tuple]] = [[] for _ in self.teams]
+
+    # ---- candidate resources ------------------------------------------------
+
+    def rooms_for(self, size: int) -> List[Resource]:
+        if size not in self._room_choices:
+            self._room_choices[size] = [room for room in self.rooms if room.capacity >= size]
+        return self._room_choices[size]
+
+    def facilitators_for(self, session: Session) -> List[Resource]:
+        key = (session.type, session.name)
+        if key not in self._facilitator_choices:
+            self._facilitator_choices[key] = [
+                person for person in self.facilitators
+                if session.type in person.skills or session.name in person.skills
+            ]
+        return self._facilitator_choices[key]
+
+    # ---- placement --------------------------------------------------------------
+
+    def _first_free(self, pool: tuple, resources: List[Resource], start: int, duration: int,
+                    exact: bool) -> Tuple[Optional[int], Resource]:
+        if exact:
+            return _earliest_among(resources, start, duration)
+        key = (pool, duration)
+        if key not in self._queues:
+            self._queues[key] = ResourceQueue(resources, duration)
+        return self._queues[key].first_free(start)
+
+    def _place(self, team_index: int, ready: int, exact: bool = False) -> Optional[int]:
+        """Book the team's next session at its earliest feasible slot; return its end.
+
+        Alternates between the team's windows, the rooms and the
+        facilitators, each pushing the start later, until all three agree.
+        ``exact`` scans every candidate resource instead of the queues.
+        """
+        team = self.teams[team_index]
+        session = team.sessions[len(self.placed[team_index])]
+        rooms, people = self.rooms_for(team.size), self.facilitators_for(session)
+        room_pool, people_pool = ("room", team.size), ("facilitator", session.type, session.name)
+        duration = session.duration
+        slot = ready + session.gap_before
+        while True:
+            slot = _fit_window(team.windows, team.window_ends, slot, duration)
+            if slot is None:
+                return None
+            room_slot, room = self._first_free(room_pool, rooms, slot, duration, exact)
+            if room_slot is None:
+                return None
+            if room_slot > slot:
+                slot = room_slot
+                continue
+            person_slot, person = self._first_free(people_pool, people, slot, duration, exact)
+            if person_slot is None:
+                return None
+            if person_slot == slot:
+                break
+            slot = person_slot
+
+        assignment = Assignment(team.id, session.name, session.type, room.id, person.id, slot, slot + duration)
+        self.placed[team_index].append((assignment, room, room.book(slot, slot + duration, assignment),
+                                        person, person.book(slot, slot + duration, assignment)))
+        return slot + duration
+
+    def _schedule_teams(self, team_indexes: List[int], exact: bool = False) -> None:
+        """Place the remaining sessions of ``team_indexes``, earliest-ready first."""
+        heap = []
+        for index in team_indexes:
+            team = self.teams[index]
+            if len(self.placed[index]) < len(team.sessions):
+                ready = self.placed[index][-1][0].end if self.placed[index] else 0
+                remaining = sum(session.duration for session in team.sessions[len(self.placed[index]):])
+                heapq.heappush(heap, (ready, -remaining, index))
+        while heap:
+            ready, remaining, index = heapq.heappop(heap)
+            end = self._place(index, ready, exact)
+            if end is None:
+                continue  # later sessions cannot run before this one
+            remaining += self.teams[index].sessions[len(self.placed[index]) - 1].duration
+            if len(self.placed[index]) < len(self.teams[index].sessions):
+                heapq.heappush(heap, (end, remaining, index))
+
+    def _unplace(self, team_index: int) -> List[tuple]:
+        removed = self.placed[team_index]
+        for _, room, room_key, person, person_key in removed:
+            room.release(room_key)
+            person.release(person_key)
+        self.placed[team_index] = []
+        return removed
+
+    def _restore(self, team_index: int, placements: List[tuple]) -> None:
+        self.placed[team_index] = [
+            (assignment, room, room.book(assignment.start, assignment.end, assignment),
+             person, person.book(assignment.start, assignment.end, assignment))
+            for assignment, room, _, person, _ in placements
+        ]
+
+    # ---- objective and search ------------------------------------------------
+
+    def team_finish(self, team_index: int) -> int:
+        return self.placed[team_index][-1][0].end if self.placed[team_index] else 0
+
+    def cost(self) -> Tuple[int, int, int]:
+        """(unscheduled sessions, makespan, sum of team finish times)."""
+        unscheduled = sum(len(team.sessions) - len(placed) for team, placed in zip(self.teams, self.placed))
+        finishes = [self.team_finish(index) for index in range(len(self.teams))]
+        return unscheduled, max(finishes, default=0), sum(finishes)
+
+    def schedule(self) -> "OffsiteScheduler":
+        self._schedule_teams(list(range(len(self.teams))))
+        return self
+
+    def improve(self, iterations: int = 200, ruin: int = 3, seed: int = 0) -> int:
+        """Ruin-and-recreate: re-plan a few teams (always including the
+        latest-finishing one) in random order, keeping non-worse results.
+        Returns the number of accepted moves."""
+        rng = random.Random(seed)
+        current = self.cost()
+        accepted = 0
+        for _ in range(iterations):
+            if len(self.teams) < 2:
+                break
+            latest = max(range(len(self.teams)), key=self.team_finish)
+            chosen = [latest] + rng.sample([i for i in range(len(self.teams)) if i != latest],
+                                           min(ruin, len(self.teams)) - 1)
+            saved = {index: self._unplace(index) for index in chosen}
+            rng.shuffle(chosen)
+            for index in chosen:
+                # Releases invalidate the queues' hints, so probe every resource
+                self._schedule_teams([index], exact=True)
+            candidate = self.cost()
+            if candidate <= current:
+                accepted += candidate < current
+                current = candidate
+            else:
+                for index in chosen:
+                    self._unplace(index)
+                for index in chosen:
+                    self._restore(index, saved[index])
+        return accepted
+
+    def assignments(self) -> Iterator[Assignment]:
+        for placed in self.placed:
+            for assignment, *_ in placed:
+                yield assignment
+
+    def unscheduled(self) -> List[dict]:
+        return [
+            {"team": team.id, "session": session.name}
+            for team, placed in zip(self.teams, self.placed)
+            for session in team.sessions[len(placed):]
+        ]
+
+
+def find_conflicts(assignments: List[Assignment]) -> List[Tuple[Assignment, Assignment]]:
+    """Pairs of assignments double-booking a team, room or facilitator."""
+    trees: Dict[tuple, IntervalTree] = {}
+    conflicts = []
+    for assignment in assignments:
+        for owner in (("team", assignment.team), ("room", assignment.room), ("facilitator", assignment.facilitator)):
+            tree = trees.setdefault(owner, IntervalTree())
+            conflicts.extend((node.item, assignment) for node in tree.overlaps(assignment.start, assignment.end))
+            tree.insert(assignment.start, assignment.end, assignment)
+    return conflicts
+
+
+def synthetic_config(teams: int, seed: int = 0) -> dict:
+    """An off-site with ``teams`` teams, one room and one facilitator per 2."""
+    rng = random.Random(seed)
+    return {
+        "horizon_minutes": 16 * 60,
+        "rooms": [{"id": f"room-{i}", "capacity": rng.choice([12, 16, 24])} for i in range(max(1, teams // 2))],
+        "facilitators": [
+            {"id": f"facilitator-{i}", "skills": rng.choice([["Process"], ["Structure"], ["Process", "Structure"]])}
+            for i in range(max(2, teams // 2))
+        ],
+        "teams": [
+            {"id": f"team-{i}", "duration_hours": rng.choice([2, 3, 4, 6, 8]), "team_size": rng.randint(4, 16),
+             "focus_cycle": rng.choice([None, "current_environment", "future_planning", "action_planning"])}
+            for i in range(teams)
+        ],
+    }
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def format_schedule_markdown(scheduler: OffsiteScheduler) -> str:
+    unscheduled, makespan, _ = scheduler.cost()
+    lines = [
+        "# Off-site Schedule",
+        "",
+        f"**Teams:** {len(scheduler.teams)} | **Rooms:** {len(scheduler.rooms)} | "
+        f"**Facilitators:** {len(scheduler.facilitators)}",
+        f"**Makespan:** {_clock(makespan)} | **Unscheduled sessions:** {unscheduled}",
+        "",
+    ]
+    for team, placed in zip(scheduler.teams, scheduler.placed):
+        lines.append(f"## {team.id} ({team.size} participants)")
+        for assignment, *_ in placed:
+            lines.append(f"- [{_clock(assignment.start)}-{_clock(assignment.end)}] {assignment.session} "
+                         f"— {assignment.room}, {assignment.facilitator}")
+        for session in team.sessions[len(placed):]:
+            lines.append(f"- [unscheduled] {session.name}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule many teams' sessions across rooms and facilitators")
+    parser.add_argument("config", nargs="?", help="JSON off-site description (see module docstring)")
+    parser.add_argument("--synthetic", type=int, metavar="TEAMS", help="Schedule a generated off-site instead")
+    parser.add_argument("--improve", type=int, default=0, metavar="ITERATIONS", help="Local-search iterations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of Markdown")
+    args = parser.parse_args()
+    if not args.config and not args.synthetic:
+        parser.error("a config file or --synthetic TEAMS is required")
+
+    if args.synthetic:
+        config = synthetic_config(args.synthetic, args.seed)
+    else:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+
+    start = time.perf_counter()
+    scheduler = OffsiteScheduler(config).schedule()
+    greedy_cost = scheduler.cost()
+    accepted = scheduler.improve(args.improve, seed=args.seed) if args.improve else 0
+    elapsed = time.perf_counter() - start
+
+    assignments = list(scheduler.assignments())
+    conflicts = find_conflicts(assignments)
+    if conflicts:
+        raise SystemExit(f"internal error: {len(conflicts)} conflicting bookings")
+
+    if args.json:
+        unscheduled, makespan, _ = scheduler.cost()
+        print(json.dumps({
+            "makespan_minutes": makespan,
+            "assignments": [asdict(assignment) for assignment in assignments],
+            "unscheduled": scheduler.unscheduled(),
+        }, indent=2))
+    else:
+        print(format_schedule_markdown(scheduler))
+    print(f"Scheduled {len(assignments)} sessions for {len(scheduler.teams)} teams in {elapsed:.2f}s "
+          f"(greedy cost {greedy_cost}, final {scheduler.cost()}, {accepted} improving moves)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Sibling Script Loader for Unicorn Dynamics
+
+The integration scripts use hyphenated file names so they read naturally on
+the command line (``telemetry-mapper.py``). Importing this module installs a
+finder that makes them importable under their underscored names::
+
+    import script_loader  # noqa: F401
+    import telemetry_mapper
+"""
+
+import importlib.abc
+import importlib.util
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class HyphenatedScriptFinder(importlib.abc.MetaPathFinder):
+    """Resolve ``foo_bar`` imports to ``scripts/foo-bar.py``."""
+
+    def find_spec(self, fullname, path, target=None):
+        if "." in fullname or "_" not in fullname:
+            return None
+        candidate = os.path.join(SCRIPTS_DIR, fullname.replace("_", "-") + ".py")
+        if not os.path.isfile(candidate):
+            return None
+        return importlib.util.spec_from_file_location(fullname, candidate)
+
+
+def register_main(module_name: str) -> None:
+    """Alias a script running as ``__main__`` under its importable name.
+
+    Without this, a sibling importing the script would load a second copy
+    with distinct classes and enums.
+    """
+    sys.modules.setdefault(module_name, sys.modules["__main__"])
+
+
+if not any(isinstance(finder, HyphenatedScriptFinder) for finder in sys.meta_path):
+    sys.meta_path.append(HyphenatedScriptFinder())
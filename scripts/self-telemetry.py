@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Self-Telemetry for Unicorn Dynamics
+
+Opt-in instrumentation of the scripts' own hot paths. The report pipeline
+(evaluation, aggregation, recommendations, rendering) and the agenda
+generator (planning, guide selection) are wrapped in named stages; while a
+``SelfTelemetry`` is enabled each stage records its call count and wall
+time, optionally with tracemalloc sampling, a cProfile per stage and
+flame-graph-compatible collapsed stacks.
+
+The measurements come back as ``TelemetryReading``s on the b9/p9 layers
+(``connection_latency`` per stage, ``memory_allocation`` and
+``scope_nesting``), so the tool reports on itself with its own thresholds,
+in a ``self_telemetry`` report section kept apart from the user's readings.
+Disabled, a stage is a shared no-op context manager.
+"""
+
+import argparse
+import cProfile
+import contextlib
+import functools
+import json
+import math
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+WARMUP_CALLS = 16  # calls of a stage timed before its sampling stride adapts
+TIMING_BUDGET = 0.005  # share of a stage's own time its timing may cost
+
+_DISABLED = contextlib.nullcontext()
+_ACTIVE: Optional["SelfTelemetry"] = None
+
+
+class StageStats:
+    """Accumulated measurements for one named stage.
+
+    Every call is counted but only ``timed`` of them were timed; each timed
+    call stands in for the untimed calls before it in ``total_ns``.
+    """
+
+    __slots__ = ("calls", "timed", "total_ns", "max_ns", "peak_bytes", "memory_samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.timed = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.peak_bytes = 0
+        self.memory_samples = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def merge(self, other: "StageStats") -> "StageStats":
+        self.calls += other.calls
+        self.timed += other.timed
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.peak_bytes = max(self.peak_bytes, other.peak_bytes)
+        self.memory_samples += other.memory_samples
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "timed": self.timed,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.mean_ns / 1e6,
+            "max_ms": self.max_ns / 1e6,
+            "peak_kb": self.peak_bytes / 1024 if self.memory_samples else None,
+        }
+
+
+class _ThreadState:
+    """A thread's open stages and its own (lock-free) stage totals."""
+
+    __slots__ = ("stack", "stages")
+
+    def __init__(self):
+        # Untimed entries are the ``_Stage`` itself, timed ones
+        # (stage, stats, calls represented, traced, profiler, start_ns)
+        self.stack: list = []
+        self.stages: Dict[str, StageStats] = {}
+
+
+class _Stage:
+    """Reusable context manager for one stage name.
+
+    Once the stage's duration is known only one call in ``stride`` is
+    timed; the calls skipped in between are counted in ``untimed``.
+    """
+
+    __slots__ = ("telemetry", "name", "stride", "countdown", "untimed")
+
+    def __init__(self, telemetry: "SelfTelemetry", name: str):
+        self.telemetry = telemetry
+        self.name = name
+        self.stride = 1
+        self.countdown = 1
+        self.untimed = 0
+
+    def __enter__(self):
+        telemetry = self.telemetry
+        try:
+            state = telemetry._local.state
+        except AttributeError:
+            state = telemetry._thread_state()
+        stack = state.stack
+        if len(stack) >= telemetry.max_depth:
+            telemetry.max_depth = len(stack) + 1
+        if self.countdown > 1:
+            self.countdown -= 1
+            self.untimed += 1
+            stack.append(self)
+            return self
+        self.countdown = self.stride
+
+        stats = state.stages.get(self.name)
+        if stats is None:
+            stats = state.stages[self.name] = StageStats()
+        weight, self.untimed = 1 + self.untimed, 0
+        stats.calls += weight
+        traced = telemetry._sample_memory(stats) if telemetry.memory_sample_every else None
+        profiler = telemetry._resume_profile(self.name, stack) if telemetry.profile else None
+        stack.append((self, stats, weight, traced, profiler, time.perf_counter_ns()))
+        return self
+
+    def __exit__(self, *exc_info):
+        stack = self.telemetry._local.state.stack
+        entry = stack.pop()
+        if entry is self:
+            return False
+        elapsed = time.perf_counter_ns() - entry[5]
+        _, stats, weight, traced, profiler, _ = entry
+        stats.timed += 1
+        stats.total_ns += elapsed * weight
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+        if profiler is not None:
+            self.telemetry._pause_profile(profiler, stack)
+        if traced:
+            stats.memory_samples += 1
+            stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if traced == "started":
+                tracemalloc.stop()
+        elif stats.timed >= WARMUP_CALLS and self.telemetry.adaptive:
+            # Time few enough calls that timing costs at most TIMING_BUDGET of the stage
+            self.stride = max(1, math.ceil(self.telemetry.timing_cost_ns / (TIMING_BUDGET * stats.mean_ns)))
+        return False
+
+
+def _timing_cost_ns(count: int = 2000) -> float:
+    """Calibrate what timing one stage entry costs on this machine."""
+    probe = SelfTelemetry(profile=True)  # not adaptive, so every entry is timed
+    probe.profile = False
+    manager = probe.stage("calibration")
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        with manager:
+            pass
+    return (time.perf_counter_ns() - start) / count
+
+
+class SelfTelemetry:
+    """Stage timings, with optional memory sampling and profiles.
+
+    ``memory_sample_every=N`` traces allocations (tracemalloc) for every
+    Nth call of each stage; ``profile`` keeps a cProfile per stage (a nested
+    stage pauses its parent's); ``flame_interval`` samples collapsed stacks
+    every so many seconds of CPU time (main thread, POSIX only). These are
+    diagnostics and time every call; plain timing instead samples each
+    stage's calls so timing costs at most ``TIMING_BUDGET`` of its time.
+    """
+
+    def __init__(self, memory_sample_every: int = 0, profile: bool = False,
+                 flame_interval: Optional[float] = None):
+        self.memory_sample_every = memory_sample_every
+        self.profile = profile
+        self.flame_interval = flame_interval
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.stacks: Counter = Counter()
+        self.max_depth = 0
+        self._stage_managers: Dict[str, _Stage] = {}
+        self._threads: List[_ThreadState] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._previous_handler = None
+        # Diagnostics want every call; plain timing samples the frequent, short stages
+        self.adaptive = not (memory_sample_every or profile or flame_interval)
+        self.timing_cost_ns = _timing_cost_ns() if self.adaptive else 0.0
+
+    # ---- stages -------------------------------------------------------------
+
+    def stage(self, name: str) -> _Stage:
+        manager = self._stage_managers.get(name)
+        if manager is None:
+            manager = self._stage_managers[name] = _Stage(self, name)
+        return manager
+
+    def _thread_state(self) -> _ThreadState:
+        state = self._local.state = _ThreadState()
+        with self._lock:
+            self._threads.append(state)
+        return state
+
+    @property
+    def stages(self) -> Dict[str, StageStats]:
+        """Stage totals merged across threads."""
+        merged: Dict[str, StageStats] = {}
+        with self._lock:
+            threads = list(self._threads)
+        for state in threads:
+            for name, stats in list(state.stages.items()):
+                merged.setdefault(name, StageStats()).merge(stats)
+        for name, manager in list(self._stage_managers.items()):
+            stats = merged.get(name)
+            if manager.untimed and stats is not None:  # calls since the last timed one
+                stats.total_ns += manager.untimed * stats.mean_ns
+                stats.calls += manager.untimed
+        return merged
+
+    def _sample_memory(self, stats: StageStats):
+        """Start tracing for this call if it is a sampled one."""
+        if (stats.calls - 1) % self.memory_sample_every:
+            return None
+        if tracemalloc.is_tracing():  # an enclosing stage is tracing: report its running peak
+            return "shared"
+        tracemalloc.start()
+        return "started"
+
+    def _resume_profile(self, name: str, stack: List[tuple]) -> cProfile.Profile:
+        if stack:
+            stack[-1][4].disable()
+        profiler = self.profiles.get(name)
+        if profiler is None:
+            profiler = self.profiles[name] = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _pause_profile(self, profiler: cProfile.Profile, stack: List[tuple]) -> None:
+        profiler.disable()
+        if stack:
+            stack[-1][4].enable()
+
+    # ---- stack sampling -----------------------------------------------------
+
+    def _sample_stack(self, signum, frame) -> None:
+        state = getattr(self._local, "state", None)
+        if state is None or not state.stack or frame is None:
+            return
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        top = state.stack[-1]
+        name = top.name if isinstance(top, _Stage) else top[0].name
+        self.stacks[";".join([f"stage:{name}"] + frames[::-1])] += 1
+
+    def start(self) -> "SelfTelemetry":
+        if self.flame_interval:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._sample_stack)
+            signal.setitimer(signal.ITIMER_PROF, self.flame_interval, self.flame_interval)
+        return self
+
+    def stop(self) -> "SelfTelemetry":
+        if self.flame_interval and self._previous_handler is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self._previous_handler = None
+        return self
+
+    # ---- results ------------------------------------------------------------
+
+    def summary(self) -> dict:
+        return {
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "max_depth": self.max_depth,
+        }
+
+    def labelled_readings(self, timestamp: Optional[str] = None) -> List[tuple]:
+        """The measurements as ``(source, TelemetryReading)`` pairs on the b9/p9 layers.
+
+        One ``connection_latency`` (mean ms) per stage, with the stage name as
+        its source, ``memory_allocation`` (GB) for the largest sampled peak and
+        ``scope_nesting`` for the deepest stage nesting seen.
+        """
+        from telemetry_mapper import TelemetryReading, evaluate_metric
+
+        timestamp = timestamp or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        stages = self.stages
+        values = [(name, "connection_latency", stats.mean_ns / 1e6) for name, stats in stages.items() if stats.timed]
+        sampled = [stats.peak_bytes for stats in stages.values() if stats.memory_samples]
+        if sampled:
+            values.append(("memory peak", "memory_allocation", max(sampled) / 1e9))
+        if self.max_depth:
+            values.append(("stage nesting", "scope_nesting", self.max_depth))
+        return [(source, TelemetryReading(key, value, timestamp, evaluate_metric(key, value)))
+                for source, key, value in values]
+
+    def readings(self, timestamp: Optional[str] = None) -> list:
+        """``labelled_readings`` without the sources."""
+        return [reading for _, reading in self.labelled_readings(timestamp)]
+
+    def dump_profiles(self, directory: str) -> List[str]:
+        """Write ``<stage>.prof`` per profiled stage and ``stacks.folded``; return the paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, profiler in self.profiles.items():
+            path = os.path.join(directory, re.sub(r"[^\w.-]+", "_", name) + ".prof")
+            profiler.dump_stats(path)
+            paths.append(path)
+        if self.stacks:
+            path = os.path.join(directory, "stacks.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sorted(self.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            paths.append(path)
+        return paths
+
+
+def enable(**options) -> SelfTelemetry:
+    """Install (and start) a process-wide ``SelfTelemetry``."""
+    global _ACTIVE
+    disable()
+    _ACTIVE = SelfTelemetry(**options).start()
+    return _ACTIVE
+
+
+def disable() -> Optional[SelfTelemetry]:
+    """Stop and uninstall the active instrumentation, returning it."""
+    global _ACTIVE
+    telemetry, _ACTIVE = _ACTIVE, None
+    if telemetry is not None:
+        telemetry.stop()
+    return telemetry
+
+
+def active() -> Optional[SelfTelemetry]:
+    return _ACTIVE
+
+
+def stage(name: str):
+    """Context manager timing ``name`` when instrumentation is enabled."""
+    return _ACTIVE.stage(name) if _ACTIVE is not None else _DISABLED
+
+
+def instrumented(name: str) -> Callable:
+    """Decorator running the whole function as stage ``name``.
+
+    Calls the stage's sampling stride skips bypass the context manager
+    entirely (they do not count toward the nesting depth).
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            telemetry = _ACTIVE
+            if telemetry is None:
+                return function(*args, **kwargs)
+            manager = telemetry._stage_managers.get(name) or telemetry.stage(name)
+            if manager.countdown > 1:
+                manager.countdown -= 1
+                manager.untimed += 1
+                return function(*args, **kwargs)
+            with manager:
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def measure_overhead(readings: int = 200_000, agendas: int = 2000, repeat: int = 5, seed: int = 0) -> dict:
+    """Best-of-``repeat`` seconds for a report+agenda workload with and without timing."""
+    import random
+    from session_planner import format_agenda_markdown, generate_session_agenda, solve_guide_selection
+    from telemetry_mapper import (
+        METRIC_KEYS, TelemetryReading, format_report_markdown, generate_telemetry_report,
+    )
+
+    rng = random.Random(seed)
+    batch = [TelemetryReading(rng.choice(METRIC_KEYS), rng.uniform(0, 120), "2026-01-01T00:00:00Z", "")
+             for _ in range(readings)]
+    requests = [(rng.choice([2, 4, 8]), rng.randint(3, 20), rng.choice(["greedy", "optimal"]))
+                for _ in range(agendas)]
+
+    def workload():
+        solve_guide_selection.cache_clear()
+        start = time.perf_counter()
+        format_report_markdown(generate_telemetry_report(batch[:1000]))
+        generate_telemetry_report(batch)
+        for hours, size, solver in requests:
+            format_agenda_markdown(generate_session_agenda("", hours, size, solver=solver))
+        return time.perf_counter() - start
+
+    timings = {"disabled": [], "enabled": []}
+    for _ in range(repeat):
+        disable()
+        timings["disabled"].append(workload())
+        enable()
+        timings["enabled"].append(workload())
+    stages = disable().stages
+    baseline, instrumented_time = min(timings["disabled"]), min(timings["enabled"])
+
+    # Wall-clock differences of a few percent are within run-to-run noise, so
+    # also estimate the overhead from calibrated per-call costs
+    calibration, count = SelfTelemetry(), 100_000
+    manager = calibration.stage("calibration")
+    start = time.perf_counter()
+    for _ in range(count):
+        with manager:
+            pass
+    sampled = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        with _DISABLED:
+            pass
+    untimed_ns = (sampled - (time.perf_counter() - start)) / count * 1e9
+    timed_ns = _timing_cost_ns()
+    calls = sum(stats.calls for stats in stages.values())
+    timed = sum(stats.timed for stats in stages.values())
+    return {
+        "disabled_s": baseline,
+        "enabled_s": instrumented_time,
+        "measured_overhead": instrumented_time / baseline - 1,
+        "untimed_call_us": untimed_ns / 1e3,
+        "timed_call_us": timed_ns / 1e3,
+        "stage_calls": calls,
+        "timed_calls": timed,
+        "estimated_overhead": (calls * untimed_ns + timed * timed_ns) / 1e9 / baseline,
+        "stages": {name: stats.to_dict() for name, stats in stages.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the overhead of self-telemetry")
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--agendas", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = measure_overhead(args.readings, args.agendas, args.repeat)
+    print(json.dumps(result, indent=2))
+    if result["estimated_overhead"] > 0.02:
+        print(f"Estimated overhead {result['estimated_overhead']:.2%} exceeds 2%", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    import script_loader  # makes telemetry_mapper importable
+    script_loader.register_main("self_telemetry")
+    main()
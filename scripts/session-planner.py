@@ -9,7 +9,14 @@ Maps Grove Graphic Guides to planning phases and T-System transformations.
 import json
 import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import script_loader  # noqa: F401  (makes guide_index importable)
+from guide_index import load_index, t_code_mask
+from self_telemetry import instrumented, stage
+from transition_graph import exit_code, order_guides
+
 
 @dataclass
 class Guide:
@@ -20,101 +27,171 @@ class Guide:
     t_codes: List[str]
     description: str
 
-# Grove Graphic Guides library
+# Grove Graphic Guides library and planning cycle phases, compiled from
+# the tables in references/grove-guides.md
+GUIDE_INDEX = load_index()
+
 GUIDES = {
-    "meeting_startup_river": Guide(
-        "Meeting Startup - River Rafting", "Process", "General", 30,
-        ["T1"], "Establish OARRs using river navigation metaphor"
-    ),
-    "meeting_startup_treasure": Guide(
-        "Meeting Startup - Treasure Map", "Process", "General", 30,
-        ["T1"], "Establish OARRs using journey to treasure metaphor"
-    ),
-    "context_map": Guide(
-        "Context Map", "Structure", "Performance", 60,
-        ["T1", "T8"], "Scan external environment, identify trends and issues"
-    ),
-    "spot_matrix": Guide(
-        "SPOT Matrix", "Process", "Commitment", 45,
-        ["T4"], "Assess Strengths, Problems, Opportunities, Threats"
-    ),
-    "cover_story_vision": Guide(
-        "Cover Story Vision", "Process", "Commitment", 60,
-        ["T2", "T3"], "Create future-state story from magazine cover perspective"
-    ),
-    "five_bold_steps": Guide(
-        "Five Bold Steps", "Process", "Commitment", 45,
-        ["T4", "T5"], "Define specific strategic initiatives toward vision"
-    ),
-    "graphic_gameplan": Guide(
-        "Graphic Gameplan", "Process", "Commitment", 60,
-        ["T5", "T6"], "Create whole-systems action plan"
-    ),
-    "graphic_roadmap": Guide(
-        "Graphic Roadmap", "Process", "Commitment", 60,
-        ["T5", "T7"], "Document milestones and commitments"
-    ),
-    "journey_vision": Guide(
-        "Journey Vision", "Process", "Potential", 60,
-        ["T2", "T9"], "Map past, present, future trajectory"
-    ),
-    "mandala_vision": Guide(
-        "Mandala Vision", "Structure", "Potential", 45,
-        ["T2", "T3"], "Cluster vision themes into unified whole"
-    ),
-    "stakeholder_map": Guide(
-        "Stakeholder Map", "Structure", "Potential", 45,
-        ["T1", "T6"], "Identify and map key relationships"
-    ),
-    "value_proposition": Guide(
-        "Value Proposition", "Structure", "Potential", 60,
-        ["T3", "T7"], "Clarify offer, connection, and infrastructure"
-    ),
-    "investment_portfolio": Guide(
-        "Investment Portfolio", "Structure", "Potential", 45,
-        ["T7", "T8"], "Allocate resources across Sow/Grow/Plow/Harvest"
-    ),
-    "industry_structure_map": Guide(
-        "Industry Structure Map", "Structure", "Commitment", 60,
-        ["T1", "T4"], "Analyze value chain and competitive landscape"
-    ),
-    "graphic_history": Guide(
-        "Graphic History", "Structure", "Performance", 45,
-        ["T7", "T9"], "Harvest lessons from organizational evolution"
-    ),
+    record.key: Guide(record.name, record.type, record.dimension, record.duration_minutes,
+                      record.t_codes, record.description)
+    for record in GUIDE_INDEX.guides
 }
 
-# Planning cycle phases
-CYCLES = {
-    "current_environment": {
-        "name": "Current Environment Analysis",
-        "guides": ["context_map", "graphic_history", "spot_matrix", "industry_structure_map"],
-        "t_codes": ["T1", "T4", "T7", "T8"],
-        "description": "Understand where we are now"
-    },
-    "future_planning": {
-        "name": "Future Planning",
-        "guides": ["cover_story_vision", "mandala_vision", "journey_vision", "stakeholder_map"],
-        "t_codes": ["T2", "T3", "T6", "T9"],
-        "description": "Envision where we want to be"
-    },
-    "action_planning": {
-        "name": "Action Planning",
-        "guides": ["five_bold_steps", "value_proposition", "graphic_gameplan", "graphic_roadmap"],
-        "t_codes": ["T4", "T5", "T6", "T7"],
-        "description": "Plan how to get there"
-    }
-}
+CYCLES = {key: dict(cycle, guides=list(cycle["guides"])) for key, cycle in GUIDE_INDEX.cycles.items()}
+
+
+BREAK_MINUTES = 15
+
+# Dimensions balanced by the optimal solver (startup guides are "General")
+DIMENSIONS = ("Performance", "Potential", "Commitment")
+
+
+def _break_overhead(phase_count: int, has_startup: bool) -> int:
+    """Break minutes needed before ``phase_count`` non-empty phases."""
+    return BREAK_MINUTES * (phase_count if has_startup else max(0, phase_count - 1))
+
+
+def _balance_score(dimension_counts: Tuple[int, ...]) -> Tuple[int, int, int]:
+    """Dimension balance: dimensions represented, then minimum count, then -spread."""
+    return (
+        sum(1 for count in dimension_counts if count),
+        min(dimension_counts),
+        min(dimension_counts) - max(dimension_counts),
+    )
+
+
+def _candidate_items(cycle_keys: Tuple[str, ...]) -> List[tuple]:
+    """Guides eligible for the solver as (key, mask, minutes, phase, dimension).
+
+    Within a phase and dimension, a guide whose T-codes are a subset of a
+    no-longer guide's adds no coverage that guide cannot, so it is dropped
+    for the coverage solve. It could still have added to its dimension's
+    count, which the balance refinement then does not see.
+    """
+    groups: Dict[tuple, List[tuple]] = {}
+    seen = set()
+    for phase, cycle_key in enumerate(cycle_keys):
+        for guide_key in CYCLES[cycle_key]["guides"]:
+            if guide_key in seen:
+                continue
+            seen.add(guide_key)
+            guide = GUIDES[guide_key]
+            dimension = DIMENSIONS.index(guide.dimension) if guide.dimension in DIMENSIONS else -1
+            item = (guide_key, t_code_mask(guide.t_codes), guide.duration_minutes, phase, dimension)
+            groups.setdefault((phase, dimension), []).append((len(seen), item))
 
+    kept = []
+    for group in groups.values():
+        # Shortest (then widest) first, so any dominating guide is already kept
+        group.sort(key=lambda entry: (entry[1][2], -bin(entry[1][1]).count("1"), entry[0]))
+        masks: List[int] = []
+        for order, item in group:
+            if not any(mask | item[1] == mask for mask in masks):
+                masks.append(item[1])
+                kept.append((order, item))
+    return [item for _, item in sorted(kept)]
 
+
+@lru_cache(maxsize=1024)
+def solve_guide_selection(cycle_keys: Tuple[str, ...], budget_minutes: int,
+                          base_mask: int = 0, has_startup: bool = False) -> Tuple[str, ...]:
+    """Choose guides maximizing T-system coverage, then dimension balance.
+
+    Coverage is solved exactly: a 0/1 knapsack DP over one packed bitset
+    state (9 T-code bits, then one bit per phase used) keeps the fewest
+    minutes per state, with break overhead before each non-empty phase
+    counted against ``budget_minutes``. The best state is then filled with
+    guides that improve (or at least hold) the per-dimension balance while
+    they still fit. Results are memoized per (cycles, budget, base coverage,
+    startup); call ``solve_guide_selection.cache_clear()`` after editing
+    ``GUIDES`` or ``CYCLES``.
+    """
+    items = _candidate_items(cycle_keys)
+    overhead = [_break_overhead(bin(phases).count("1"), has_startup) for phases in range(1 << len(cycle_keys))]
+
+    # packed state -> (minutes, chosen guide keys)
+    states: Dict[int, Tuple[int, Tuple[str, ...]]] = {base_mask: (0, ())}
+    for key, mask, minutes, phase, dimension in items:
+        bits = mask | 1 << (9 + phase)
+        for state, (used, chosen) in list(states.items()):
+            target = state | bits
+            if target == state:
+                continue
+            new_used = used + minutes
+            if new_used + overhead[target >> 9] > budget_minutes:
+                continue
+            best = states.get(target)
+            if best is None or new_used < best[0]:
+                states[target] = (new_used, chosen + (key,))
+
+    def coverage(entry):
+        state, (used, chosen) = entry
+        return bin(state & 0x1FF).count("1"), -(used + overhead[state >> 9]), -len(chosen)
+
+    state, (used, chosen) = max(states.items(), key=coverage)
+    phases = state >> 9
+
+    # Balance refinement: keep adding the guide that best evens out the
+    # dimensions, as long as balance does not get worse and it still fits
+    counts = [0] * len(DIMENSIONS)
+    for key, _, _, _, dimension in items:
+        if key in chosen and dimension >= 0:
+            counts[dimension] += 1
+    chosen = list(chosen)
+    remaining = [item for item in items if item[0] not in chosen and item[4] >= 0]
+    while True:
+        current = _balance_score(tuple(counts))
+        best_item, best_score = None, None
+        for item in remaining:
+            key, _, minutes, phase, dimension = item
+            if used + minutes + overhead[phases | 1 << phase] > budget_minutes:
+                continue
+            counts[dimension] += 1
+            score = (_balance_score(tuple(counts)), -minutes)
+            counts[dimension] -= 1
+            if score[0] >= current and (best_score is None or score > best_score):
+                best_item, best_score = item, score
+        if best_item is None:
+            break
+        chosen.append(best_item[0])
+        remaining.remove(best_item)
+        counts[best_item[4]] += 1
+        used += best_item[2]
+        phases |= 1 << best_item[3]
+    return tuple(chosen)
+
+
+@instrumented("agenda.plan")
 def generate_session_agenda(
     objective: str,
     duration_hours: float,
     team_size: int,
     focus_cycle: Optional[str] = None,
-    include_startup: bool = True
+    include_startup: bool = True,
+    solver: str = "greedy",
+    guide_order: str = "transitions",
+    target_t_codes: Optional[List[str]] = None
 ) -> dict:
-    """Generate a session agenda based on parameters."""
+    """Generate a session agenda based on parameters.
+    
+    ``solver="greedy"`` fills each phase in order until a guide does not fit;
+    ``solver="optimal"`` selects guides with ``solve_guide_selection`` and
+    omits phases (and their breaks) that end up empty.
+    
+    Within each phase, ``guide_order="transitions"`` runs the chosen guides
+    in the cheapest order along the T-system transformation sequences,
+    continuing from the previous guide's exit T-code; ``"cycle"`` keeps the
+    ``CYCLES`` order.
+    
+    ``target_t_codes`` (optimal solver only) restricts the coverage the
+    solver maximizes to those T-codes; the others count as covered.
+    """
+    if solver not in ("greedy", "optimal"):
+        raise ValueError(f"Unknown solver '{solver}' (expected 'greedy' or 'optimal')")
+    if guide_order not in ("transitions", "cycle"):
+        raise ValueError(f"Unknown guide order '{guide_order}' (expected 'transitions' or 'cycle')")
+    if target_t_codes is not None and solver != "optimal":
+        raise ValueError("target_t_codes requires solver='optimal'")
     
     available_minutes = int(duration_hours * 60)
     agenda = {
@@ -146,20 +223,34 @@ def generate_session_agenda(
     else:
         cycles_to_include = ["current_environment", "future_planning", "action_planning"]
     
+    last_code = exit_code(t_code_mask(agenda["t_system_coverage"])) if agenda["t_system_coverage"] else None
+    selected = None
+    if solver == "optimal":
+        with stage("agenda.select"):
+            selected = set(solve_guide_selection(
+                tuple(cycles_to_include),
+                available_minutes - agenda["total_minutes"],
+                t_code_mask(agenda["t_system_coverage"])
+                | (0x1FF & ~t_code_mask(target_t_codes) if target_t_codes is not None else 0),
+                include_startup,
+            ))
+    
     for cycle_key in cycles_to_include:
         cycle = CYCLES[cycle_key]
+        if selected is not None and not selected.intersection(cycle["guides"]):
+            continue
         
         # Add break before each major phase
         if agenda["total_minutes"] > 0:
             agenda["sessions"].append({
                 "name": "Break",
-                "duration": 15,
+                "duration": BREAK_MINUTES,
                 "type": "Break",
                 "dimension": "-",
                 "t_codes": [],
                 "description": "Refresh and transition"
             })
-            agenda["total_minutes"] += 15
+            agenda["total_minutes"] += BREAK_MINUTES
         
         # Add cycle header
         agenda["sessions"].append({
@@ -171,11 +262,26 @@ def generate_session_agenda(
             "description": cycle["description"]
         })
         
+        # Pick this cycle's guides in CYCLES order
+        if selected is not None:
+            cycle_guides = [guide_key for guide_key in cycle["guides"] if guide_key in selected]
+            selected.difference_update(cycle_guides)
+        else:
+            cycle_guides, planned = [], agenda["total_minutes"]
+            for guide_key in cycle["guides"]:
+                if planned + GUIDES[guide_key].duration_minutes > available_minutes:
+                    break
+                planned += GUIDES[guide_key].duration_minutes
+                cycle_guides.append(guide_key)
+        
+        # Run them along the T-system transition sequences
+        masks = {guide_key: t_code_mask(GUIDES[guide_key].t_codes) for guide_key in cycle_guides}
+        if guide_order == "transitions":
+            cycle_guides = order_guides(list(masks.items()), last_code)
+        
         # Add guides for this cycle
-        for guide_key in cycle["guides"]:
-            if agenda["total_minutes"] + GUIDES[guide_key].duration_minutes > available_minutes:
-                break
-            
+        for guide_key in cycle_guides:
+            last_code = exit_code(masks[guide_key]) if masks[guide_key] else last_code
             guide = GUIDES[guide_key]
             agenda["sessions"].append({
                 "name": guide.name,
@@ -230,26 +336,34 @@ def format_agenda_markdown(agenda: dict) -> str:
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python session-planner.py <objective> [duration_hours] [team_size] [focus_cycle]")
+    argv = [arg for arg in sys.argv if arg not in ("--optimal", "--cycle-order")]
+    solver = "optimal" if "--optimal" in sys.argv else "greedy"
+    guide_order = "cycle" if "--cycle-order" in sys.argv else "transitions"
+    
+    if len(argv) < 2:
+        print("Usage: python session-planner.py [--optimal] [--cycle-order] <objective> [duration_hours] [team_size] [focus_cycle]")
         print("")
         print("Arguments:")
         print("  objective      - Session objective (required)")
         print("  duration_hours - Available time in hours (default: 4)")
         print("  team_size      - Number of participants (default: 10)")
         print("  focus_cycle    - Optional: current_environment, future_planning, or action_planning")
+        print("  --optimal      - Select guides for maximum T-system coverage instead of in phase order")
+        print("  --cycle-order  - Keep each phase's guide order instead of following T-system transitions")
         print("")
         print("Example:")
         print("  python session-planner.py 'Annual strategic planning' 8 15")
         print("  python session-planner.py 'Vision refresh' 4 8 future_planning")
+        print("  python session-planner.py --optimal 'Half-day offsite' 3 12")
         sys.exit(1)
     
-    objective = sys.argv[1]
-    duration_hours = float(sys.argv[2]) if len(sys.argv) > 2 else 4.0
-    team_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-    focus_cycle = sys.argv[4] if len(sys.argv) > 4 else None
+    objective = argv[1]
+    duration_hours = float(argv[2]) if len(argv) > 2 else 4.0
+    team_size = int(argv[3]) if len(argv) > 3 else 10
+    focus_cycle = argv[4] if len(argv) > 4 else None
     
-    agenda = generate_session_agenda(objective, duration_hours, team_size, focus_cycle)
+    agenda = generate_session_agenda(objective, duration_hours, team_size, focus_cycle,
+                                     solver=solver, guide_order=guide_order)
     markdown = format_agenda_markdown(agenda)
     
     print(markdown)
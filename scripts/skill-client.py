@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Thin Client for the Unicorn Dynamics Daemon
+
+Drop-in replacement for the integration CLIs that forwards the invocation to
+a warm ``skill-daemon.py`` over a Unix domain socket::
+
+    python skill-client.py session-planner 'Vision refresh' 4 8 future_planning
+    python skill-client.py telemetry-mapper --ndjson readings.ndjson
+
+Only the standard library is imported so startup stays minimal. If no daemon
+is listening, the original script is executed instead.
+"""
+
+import base64
+import json
+import os
+import socket
+import sys
+
+SCRIPTS = ("session-planner", "telemetry-mapper")
+
+DEFAULT_SOCKET = os.environ.get(
+    "UNICORN_DYNAMICS_SOCKET",
+    os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"unicorn-dynamics-{os.getuid()}.sock"),
+)
+
+
+def connect(socket_path: str = DEFAULT_SOCKET) -> socket.socket:
+    """Open a connection to the daemon (raises if none is listening)."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(sock: socket.socket, method: str, params: dict):
+    """Send one JSON request over ``sock`` and return the decoded result."""
+    with sock:
+        sock.sendall(json.dumps({"method": method, "params": params}).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    response = json.loads(b"".join(chunks))
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def call(method: str, params: dict, socket_path: str = DEFAULT_SOCKET):
+    """Call a daemon method, e.g. ``call("generate_session_agenda", {...})``."""
+    return request(connect(socket_path), method, params)
+
+
+def run_cli(sock: socket.socket, script: str, argv: list) -> int:
+    """Run a script's CLI inside the daemon, mirroring its output and exit code."""
+    stdin = base64.b64encode(sys.stdin.buffer.read()).decode("ascii") if "-" in argv else None
+    result = request(sock, "cli", {"script": script, "argv": argv, "cwd": os.getcwd(), "stdin": stdin})
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    return result["exit_code"]
+
+
+def main():
+    args = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET
+    if len(args) >= 2 and args[0] == "--socket":
+        socket_path, args = args[1], args[2:]
+    if not args or args[0].removesuffix(".py") not in SCRIPTS:
+        print(f"Usage: python skill-client.py [--socket PATH] <{'|'.join(SCRIPTS)}> [args...]")
+        sys.exit(1)
+
+    script, argv = args[0].removesuffix(".py"), args[1:]
+    try:
+        sock = connect(socket_path)
+    except OSError:
+        # No daemon: behave exactly like the original CLI
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{script}.py")
+        os.execv(sys.executable, [sys.executable, path, *argv])
+    sys.exit(run_cli(sock, script, argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Persistent Worker Daemon for Unicorn Dynamics
+
+Keeps the session planner and telemetry mapper imported, with their
+``GUIDES``, ``CYCLES`` and ``METRICS`` tables warm, behind a Unix domain
+socket. Each connection carries one JSON request::
+
+    {"method": "generate_session_agenda", "params": {"objective": "...", "duration_hours": 4, ...}}
+
+Methods: ``generate_session_agenda``, ``format_agenda_markdown``,
+``generate_telemetry_report``, ``format_report_markdown`` and ``cli`` (run a
+script's ``main()`` with the caller's argv, cwd and stdin). ``skill-client.py``
+is the matching drop-in CLI replacement.
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import socketserver
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import script_loader  # noqa: F401  (makes sibling scripts importable)
+import session_planner
+import telemetry_mapper
+from skill_client import DEFAULT_SOCKET, call
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CLI_MODULES = {
+    "session-planner": session_planner,
+    "telemetry-mapper": telemetry_mapper,
+}
+
+# Redirecting stdio and chdir are process-wide, so CLI runs are serialized
+_CLI_LOCK = threading.Lock()
+
+
+def _run_cli(script: str, argv: list, cwd: str = None, stdin: str = None) -> dict:
+    """Run ``script``'s ``main()``; ``stdin`` is the caller's raw stdin, base64-encoded."""
+    module = CLI_MODULES[script]
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    with _CLI_LOCK:
+        saved = sys.argv, sys.stdin, os.getcwd()
+        sys.argv = [f"{script}.py", *argv]
+        # Binary-backed, so CLIs reading sys.stdin.buffer see the same bytes
+        sys.stdin = io.TextIOWrapper(io.BytesIO(base64.b64decode(stdin or "")), encoding="utf-8")
+        try:
+            if cwd:
+                os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                module.main()
+        except SystemExit as exit:
+            if isinstance(exit.code, str):
+                stderr.write(exit.code + "\n")
+                exit_code = 1
+            else:
+                exit_code = exit.code or 0
+        except Exception:
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            sys.argv, sys.stdin = saved[0], saved[1]
+            os.chdir(saved[2])
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+def _generate_telemetry_report(readings: list, aggregate_recommendations: bool = False, top_k: int = 50) -> dict:
+    parsed = [
+        telemetry_mapper.TelemetryReading(r["metric_key"], float(r["value"]), r.get("timestamp", ""), r.get("status", ""))
+        for r in readings
+    ]
+    return telemetry_mapper.generate_telemetry_report(parsed, aggregate_recommendations, top_k)
+
+
+METHODS = {
+    "generate_session_agenda": lambda p: session_planner.generate_session_agenda(**p),
+    "format_agenda_markdown": lambda p: session_planner.format_agenda_markdown(p["agenda"]),
+    "generate_telemetry_report": lambda p: _generate_telemetry_report(**p),
+    "format_report_markdown": lambda p: telemetry_mapper.format_report_markdown(p["report"]),
+    "cli": lambda p: _run_cli(**p),
+    "ping": lambda p: "pong",
+}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.read())
+            try:
+                method = METHODS[request["method"]]
+            except KeyError as error:
+                response = {"error": f"unknown method or missing field: {error}"}
+            else:
+                response = {"result": method(request.get("params") or {})}
+        except Exception as error:
+            response = {"error": f"{type(error).__name__}: {error}"}
+        self.wfile.write(json.dumps(response).encode())
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start_daemon(socket_path: str = DEFAULT_SOCKET) -> DaemonServer:
+    """Bind the daemon socket and serve it from a background thread."""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = DaemonServer(socket_path, RequestHandler)
+    os.chmod(socket_path, 0o600)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    }
+
+
+def _time(action, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - start)
+    return _percentiles(samples)
+
+
+def benchmark(repeats: int = 20) -> dict:
+    """Compare end-to-end latency of subprocess CLIs with daemon-backed calls."""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "daemon.sock")
+        server = start_daemon(socket_path)
+        client = os.path.join(SCRIPTS_DIR, "skill-client.py")
+        ndjson_path = os.path.join(tmp, "readings.ndjson")
+        with open(ndjson_path, "w", encoding="utf-8") as f:
+            for index in range(1_000):
+                metric_key = telemetry_mapper.METRIC_KEYS[index % len(telemetry_mapper.METRIC_KEYS)]
+                f.write(json.dumps({"metric_key": metric_key, "value": index % 100,
+                                    "timestamp": "2026-01-29T10:00:00Z"}) + "\n")
+        with open(ndjson_path, "rb") as f:
+            ndjson = f.read()
+        # name -> (script, argv, stdin)
+        cases = {
+            "session-planner": ("session-planner", ["Annual strategic planning", "8", "15"], b""),
+            "telemetry-mapper": ("telemetry-mapper", [], b""),
+            "telemetry-mapper --ndjson FILE": ("telemetry-mapper", ["--ndjson", ndjson_path], b""),
+            "telemetry-mapper --ndjson -": ("telemetry-mapper", ["--ndjson", "-"], ndjson),
+        }
+        results = {}
+        try:
+            for name, (script, argv, stdin) in cases.items():
+                direct = [sys.executable, os.path.join(SCRIPTS_DIR, f"{script}.py"), *argv]
+                via_client = [sys.executable, client, "--socket", socket_path, script, *argv]
+                expected = subprocess.run(direct, input=stdin, capture_output=True).stdout
+                if subprocess.run(via_client, input=stdin, capture_output=True).stdout != expected:
+                    raise AssertionError(f"daemon output differs from {name}")
+                params = {"script": script, "argv": argv, "stdin": base64.b64encode(stdin).decode("ascii")}
+                results[name] = {
+                    "subprocess_cli": _time(lambda: subprocess.run(direct, input=stdin, capture_output=True),
+                                            repeats),
+                    "subprocess_client": _time(lambda: subprocess.run(via_client, input=stdin, capture_output=True),
+                                               repeats),
+                    "socket_call": _time(lambda: call("cli", params, socket_path), repeats),
+                }
+        finally:
+            server.shutdown()
+            server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm worker daemon for the Unicorn Dynamics scripts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Listen on a Unix domain socket")
+    serve.add_argument("--socket", default=DEFAULT_SOCKET)
+    bench = sub.add_parser("benchmark", help="Measure per-request latency against the subprocess CLIs")
+    bench.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        print(json.dumps(benchmark(args.requests), indent=2))
+        return
+
+    server = start_daemon(args.socket)
+    print(f"Listening on {args.socket}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
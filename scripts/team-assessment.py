@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Team Performance Assessment for Unicorn Dynamics
+
+Scores Drexler/Sibbet seven-stage survey responses for many teams at once.
+The stages, interventions and stage-to-guide mapping are read from
+``references/team-performance.md``.
+
+Responses are CSV or JSONL rows of one respondent each: a ``team`` column
+and a 1-5 rating per stage (``stage_1`` ... ``stage_7`` or the stage names,
+e.g. ``trust_building``). All rows are loaded into one NumPy matrix and
+per-team means and resolved (4-5) / unresolved (1-2) shares are computed
+for every stage with a single ``bincount`` pass each. Results carry
+spider-diagram data, interventions for weak stages, and a
+``generate_session_agenda`` request built from the mapped Grove guides.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import IO, List, Optional
+
+import numpy as np
+
+import script_loader  # noqa: F401  (makes session_planner importable)
+from session_planner import CYCLES, GUIDES
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SOURCE = os.path.join(SCRIPTS_DIR, os.pardir, "references", "team-performance.md")
+
+RATING_LABELS = {
+    1: "Unresolved",
+    2: "Partially unresolved",
+    3: "Neutral/In progress",
+    4: "Mostly resolved",
+    5: "Fully resolved",
+}
+
+WEAK_THRESHOLD = 3.0  # stage means below this are treated as unresolved
+
+
+@dataclass
+class Stage:
+    number: int
+    name: str
+    key_question: str
+    resolved: List[str]
+    unresolved: List[str]
+    facilitation_focus: List[str]
+    guides: List[str] = field(default_factory=list)  # guide names from the reference
+    guide_keys: List[str] = field(default_factory=list)  # matching GUIDES keys
+    interventions: List[str] = field(default_factory=list)
+
+    @property
+    def column(self) -> str:
+        return re.sub(r"\W+", "_", self.name.lower()).strip("_")
+
+
+def _bullets(lines: List[str]) -> List[str]:
+    return [line[2:].strip() for line in lines if line.startswith("- ")]
+
+
+def load_stages(path: str = DEFAULT_SOURCE) -> List[Stage]:
+    """Parse the seven stages, guide mapping and interventions."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    stages = []
+    for match in re.finditer(r"^### Stage (\d+): (.+)$", text, re.MULTILINE):
+        body = text[match.end():].split("\n---", 1)[0]
+        question = re.search(r"\*\*Key Question:\*\* (.+)", body)
+        rows = [
+            [cell.strip() for cell in line.strip().strip("|").split("|")]
+            for line in body.splitlines()
+            if line.startswith("|") and not set(line) <= set("|-: ")
+        ][1:]
+        focus = body.split("**Facilitation Focus:**", 1)[-1].splitlines()
+        stages.append(Stage(
+            int(match.group(1)), match.group(2).strip(), question.group(1).strip() if question else "",
+            [row[0] for row in rows], [row[1] for row in rows], _bullets(focus),
+        ))
+    if not stages:
+        raise ValueError(f"{path}: no '### Stage N: Name' sections found")
+
+    guide_keys = {guide.name: key for key, guide in GUIDES.items()}
+    mapping = text.split("## Integration with Grove Guides", 1)[-1].split("\n---", 1)[0]
+    for line in mapping.splitlines():
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        number = re.match(r"(\d+)\.", cells[0]) if line.startswith("|") else None
+        if number and int(number.group(1)) <= len(stages):
+            stage = stages[int(number.group(1)) - 1]
+            stage.guides = [name.strip() for name in cells[1].split(",")]
+            stage.guide_keys = [guide_keys[name] for name in stage.guides if name in guide_keys]
+
+    sections = re.split(r"^### For Unresolved .+$", text.split("## Team Improvement Interventions", 1)[-1],
+                        flags=re.MULTILINE)[1:]
+    for stage, section in zip(stages, sections):
+        stage.interventions = _bullets(section.split("\n---", 1)[0].splitlines())
+    return stages
+
+
+STAGES = load_stages()
+
+
+@dataclass
+class SurveyMatrix:
+    teams: np.ndarray  # unique team ids
+    team_index: np.ndarray  # per response, index into ``teams``
+    scores: np.ndarray  # (responses, stages) ratings, NaN where missing or out of range
+    skipped: int = 0  # malformed JSONL lines and records without a team
+
+
+def _stage_columns(header: List[str]) -> List[Optional[int]]:
+    """Map each stage to its column position in ``header``."""
+    normalized = [re.sub(r"\W+", "_", name.strip().lower()).strip("_") for name in header]
+    positions = []
+    for stage in STAGES:
+        names = (f"stage_{stage.number}", str(stage.number), stage.column)
+        positions.append(next((normalized.index(name) for name in names if name in normalized), None))
+    return positions
+
+
+def _rating(cell: str) -> float:
+    try:
+        return float(cell)
+    except ValueError:
+        return math.nan
+
+
+def _to_matrix(teams: List[str], cells: List[List[str]], skipped: int = 0) -> SurveyMatrix:
+    text = np.array(cells, dtype=str).reshape(len(cells), len(STAGES))
+    text[text == ""] = "nan"
+    try:
+        scores = text.astype(np.float64)
+    except ValueError:
+        # Stray non-numeric answers: fall back to converting cell by cell
+        scores = np.array([_rating(cell) for cell in text.ravel()]).reshape(text.shape)
+    scores[(scores < 1) | (scores > 5)] = np.nan
+    unique, index = np.unique(np.array(teams, dtype=str), return_inverse=True)
+    return SurveyMatrix(unique, index, scores, skipped)
+
+
+def read_responses(stream: IO[str], format: str = "csv") -> SurveyMatrix:
+    """Load all survey responses into a ``SurveyMatrix``.
+
+    CSV rows with a blank or missing team cell, and JSONL lines that do not
+    parse or whose record has no ``team``/``team_id``, are counted in
+    ``skipped`` instead of aborting the load.
+    """
+    teams, cells, skipped = [], [], 0
+    if format == "csv":
+        reader = csv.reader(stream)
+        header = next(reader, [])
+        positions = _stage_columns(header)
+        team_column = next((i for i, name in enumerate(header) if name.strip().lower() in ("team", "team_id")), 0)
+        for row in reader:
+            if not row:
+                continue
+            if team_column >= len(row) or not row[team_column].strip():
+                skipped += 1
+                continue
+            teams.append(row[team_column])
+            cells.append([row[p].strip() if p is not None and p < len(row) else "" for p in positions])
+    else:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                team = record.get("team") or record.get("team_id")
+                if team is None or str(team).strip() == "":
+                    raise ValueError("record has no team")
+                if "scores" in record:
+                    values = list(record["scores"])[:len(STAGES)]
+                    row = ([str(value) if value is not None else "" for value in values]
+                           + [""] * (len(STAGES) - len(values)))
+                else:
+                    positions = _stage_columns(list(record))
+                    values = list(record.values())
+                    row = [str(values[p]) if p is not None and values[p] is not None else "" for p in positions]
+            except (ValueError, TypeError, AttributeError):
+                skipped += 1
+                continue
+            teams.append(str(team))
+            cells.append(row)
+    return _to_matrix(teams, cells, skipped)
+
+
+@dataclass
+class TeamScores:
+    teams: np.ndarray
+    respondents: np.ndarray  # (teams,) responses per team
+    mean: np.ndarray  # (teams, stages) mean rating, NaN without answers
+    resolved: np.ndarray  # (teams, stages) share of ratings 4-5
+    unresolved: np.ndarray  # (teams, stages) share of ratings 1-2
+
+
+def score_teams(matrix: SurveyMatrix) -> TeamScores:
+    """Per-team, per-stage scores for every team in one vectorized pass."""
+    team_count, stage_count = len(matrix.teams), matrix.scores.shape[1]
+    cells = (matrix.team_index[:, None] * stage_count + np.arange(stage_count)).ravel()
+    scores = matrix.scores.ravel()
+    answered = ~np.isnan(scores)
+    cells, scores = cells[answered], scores[answered]
+    size = team_count * stage_count
+
+    def per_cell(weights=None) -> np.ndarray:
+        return np.bincount(cells, weights=weights, minlength=size).reshape(team_count, stage_count)
+
+    counts = per_cell()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return TeamScores(
+            teams=matrix.teams,
+            respondents=np.bincount(matrix.team_index, minlength=team_count),
+            mean=per_cell(scores) / counts,
+            resolved=per_cell(scores >= 4) / counts,
+            unresolved=per_cell(scores <= 2) / counts,
+        )
+
+
+def spider_diagram(values: List[Optional[float]]) -> dict:
+    """Axes, values and unit-circle plot points (Orientation at the top, clockwise)."""
+    points = []
+    for index, value in enumerate(values):
+        angle = 2 * math.pi * index / len(values)
+        radius = (value or 0.0) / 5
+        points.append([round(radius * math.sin(angle), 4), round(radius * math.cos(angle), 4)])
+    return {"axes": [stage.name for stage in STAGES], "values": values, "max": 5, "points": points}
+
+
+def _focus_cycle(guide_keys: List[str]) -> Optional[str]:
+    """The cycle holding most of ``guide_keys`` (None for a full session on ties)."""
+    counts = {key: sum(guide in cycle["guides"] for guide in guide_keys) for key, cycle in CYCLES.items()}
+    ranked = sorted(counts.items(), key=lambda item: -item[1])
+    if not ranked or not ranked[0][1] or (len(ranked) > 1 and ranked[0][1] == ranked[1][1]):
+        return None
+    return ranked[0][0]
+
+
+def assess(scores: TeamScores, weak_threshold: float = WEAK_THRESHOLD,
+           duration_hours: float = 4.0) -> List[dict]:
+    """Per-team results: stage scores, spider data, interventions and agenda request."""
+    weak = scores.mean < weak_threshold  # NaN compares False
+    results = []
+    for row, team in enumerate(scores.teams.tolist()):
+        means = [None if math.isnan(value) else round(value, 2) for value in scores.mean[row].tolist()]
+        stages = []
+        for stage, mean, resolved, unresolved in zip(STAGES, means, scores.resolved[row].tolist(),
+                                                     scores.unresolved[row].tolist()):
+            stages.append({
+                "stage": stage.number,
+                "name": stage.name,
+                "mean": mean,
+                "status": RATING_LABELS[int(round(mean))] if mean is not None else "No responses",
+                "resolved_pct": None if math.isnan(resolved) else round(resolved * 100, 1),
+                "unresolved_pct": None if math.isnan(unresolved) else round(unresolved * 100, 1),
+            })
+
+        # Earlier stages gate later ones, so the first weak stage is the focus
+        weak_stages = [STAGES[column] for column in np.flatnonzero(weak[row]).tolist()]
+        guide_keys = list(dict.fromkeys(key for stage in weak_stages for key in stage.guide_keys))
+        results.append({
+            "team": team,
+            "respondents": int(scores.respondents[row]),
+            "stages": stages,
+            "spider": spider_diagram(means),
+            "focus_stage": weak_stages[0].name if weak_stages else None,
+            "weak_stages": [
+                {
+                    "stage": stage.number,
+                    "name": stage.name,
+                    "unresolved_signs": stage.unresolved,
+                    "interventions": stage.interventions,
+                    "guides": stage.guides,
+                }
+                for stage in weak_stages
+            ],
+            "suggested_guides": guide_keys,
+            "agenda_request": {
+                "id": team,
+                "objective": "Resolve " + ", ".join(stage.name for stage in weak_stages) if weak_stages
+                else "Sustain high performance and plan renewal",
+                "duration_hours": duration_hours,
+                "team_size": int(scores.respondents[row]),
+                "focus_cycle": _focus_cycle(guide_keys),
+            },
+        })
+    return results
+
+
+def format_assessment_markdown(results: List[dict]) -> str:
+    lines = ["# Team Performance Assessment", ""]
+    for result in results:
+        lines.append(f"## {result['team']} ({result['respondents']} respondents)")
+        lines.append("")
+        lines.append("| Stage | Mean | Resolved | Unresolved | Status |")
+        lines.append("|-------|------|----------|------------|--------|")
+        for stage in result["stages"]:
+            mean = f"{stage['mean']:.2f}" if stage["mean"] is not None else "-"
+            resolved = f"{stage['resolved_pct']:.0f}%" if stage["resolved_pct"] is not None else "-"
+            unresolved = f"{stage['unresolved_pct']:.0f}%" if stage["unresolved_pct"] is not None else "-"
+            lines.append(f"| {stage['stage']}. {stage['name']} | {mean} | {resolved} | {unresolved} | "
+                         f"{stage['status']} |")
+        lines.append("")
+        if result["focus_stage"]:
+            lines.append(f"**Current Focus:** {result['focus_stage']}")
+            for stage in result["weak_stages"]:
+                lines.append(f"- **{stage['name']}:** {'; '.join(stage['interventions'])} "
+                             f"(guides: {', '.join(stage['guides'])})")
+        elif all(stage["mean"] is None for stage in result["stages"]):
+            lines.append("**Current Focus:** none - no responses")
+        else:
+            lines.append("**Current Focus:** none - all stages resolved")
+        request = result["agenda_request"]
+        lines.append(f"**Suggested Session:** {request['duration_hours']}h, "
+                     f"focus cycle {request['focus_cycle'] or 'full'}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score Drexler/Sibbet team performance surveys")
+    parser.add_argument("responses", help="CSV or JSONL survey responses ('-' for CSV on stdin)")
+    parser.add_argument("--weak-threshold", type=float, default=WEAK_THRESHOLD,
+                        help="Stage mean below which a stage is unresolved")
+    parser.add_argument("--duration-hours", type=float, default=4.0, help="Session length for agenda requests")
+    parser.add_argument("--requests", metavar="JSONL", help="Write agenda requests for agenda-batch.py")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of Markdown")
+    args = parser.parse_args()
+
+    input_format = "jsonl" if args.responses.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    stream = sys.stdin if args.responses == "-" else open(args.responses, encoding="utf-8", newline="")
+    try:
+        matrix = read_responses(stream, input_format)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if matrix.skipped:
+        print(f"Skipped {matrix.skipped} malformed or team-less responses", file=sys.stderr)
+
+    results = assess(score_teams(matrix), args.weak_threshold, args.duration_hours)
+    if args.requests:
+        with open(args.requests, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result["agenda_request"]) + "\n")
+    print(json.dumps(results, indent=2) if args.json else format_assessment_markdown(results))
+
+
+if __name__ == "__main__":
+    main()
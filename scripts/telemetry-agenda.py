@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Telemetry-to-Agenda Pipeline for Unicorn Dynamics
+
+Closes the loop from a telemetry report to a session agenda: the report's
+degraded b9/p9/j9 layers and the T-codes of its recommendations become an
+agenda whose guides are chosen (by the optimal solver) to cover exactly the
+flagged T-codes, within a single focus cycle when one can cover them all.
+
+Plans are memoized by a compact integer signature of (layer statuses,
+flagged T-codes, duration, team size), so repeated scrapes showing the
+same degradation pattern reuse the plan instead of re-planning.
+"""
+
+import argparse
+import json
+import sys
+import time
+from functools import lru_cache
+from typing import List, Optional
+
+import script_loader  # noqa: F401  (makes telemetry_mapper importable)
+from session_planner import CYCLES, GUIDES, format_agenda_markdown, generate_session_agenda
+from guide_index import mask_to_t_codes, t_code_mask
+from telemetry_mapper import STATUS_CODES, STATUS_NAMES, ArchitectureLayer, generate_streaming_report
+
+LAYER_KEYS = [layer.value for layer in ArchitectureLayer]
+LAYER_NAMES = {"b9": "b9 Form", "p9": "p9 Void", "j9": "j9 Pole"}
+ALL_T_CODES = 0x1FF
+
+# Signature layout: 2 bits per layer status, 9 T-code bits, 17 bits of
+# minutes, then the team size
+_T_CODE_SHIFT = 2 * len(LAYER_KEYS)
+_MINUTES_SHIFT = _T_CODE_SHIFT + 9
+_TEAM_SHIFT = _MINUTES_SHIFT + 17
+
+
+def report_signature(report: dict, duration_hours: float, team_size: int) -> int:
+    """Pack a report's degradation pattern and the session shape into one int."""
+    minutes = int(round(duration_hours * 60))
+    if not 0 < minutes < 1 << (_TEAM_SHIFT - _MINUTES_SHIFT):
+        raise ValueError(f"duration out of range: {duration_hours} hours")
+    if team_size < 1:
+        raise ValueError(f"team size must be positive: {team_size}")
+
+    signature = 0
+    for position, layer_key in enumerate(LAYER_KEYS):
+        signature |= STATUS_CODES[report["by_layer"][layer_key]["status"]] << (2 * position)
+    flagged = 0
+    for recommendation in report["recommendations"]:
+        flagged |= t_code_mask(recommendation["t_codes"])
+        if flagged == ALL_T_CODES:
+            break
+    return signature | flagged << _T_CODE_SHIFT | minutes << _MINUTES_SHIFT | team_size << _TEAM_SHIFT
+
+
+def decode_signature(signature: int) -> dict:
+    return {
+        "layers": {
+            layer_key: STATUS_NAMES[signature >> (2 * position) & 3]
+            for position, layer_key in enumerate(LAYER_KEYS)
+        },
+        "flagged_t_codes": mask_to_t_codes(signature >> _T_CODE_SHIFT & ALL_T_CODES),
+        "duration_hours": (signature >> _MINUTES_SHIFT & (1 << (_TEAM_SHIFT - _MINUTES_SHIFT)) - 1) / 60,
+        "team_size": signature >> _TEAM_SHIFT,
+    }
+
+
+def focus_cycle_for(flagged: int) -> Optional[str]:
+    """The first cycle whose guides cover every flagged T-code, if any."""
+    for cycle_key, cycle in CYCLES.items():
+        covered = 0
+        for guide_key in cycle["guides"]:
+            covered |= t_code_mask(GUIDES[guide_key].t_codes)
+        if flagged & covered == flagged:
+            return cycle_key
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _plan_json(signature: int) -> str:
+    """Plan the agenda template for a signature, cached as (immutable) JSON."""
+    pattern = decode_signature(signature)
+    flagged = t_code_mask(pattern["flagged_t_codes"])
+    focus = focus_cycle_for(flagged) if flagged else None
+    agenda = generate_session_agenda(
+        "", pattern["duration_hours"], pattern["team_size"], focus, solver="optimal",
+        target_t_codes=pattern["flagged_t_codes"] if flagged else None,
+    )
+    covered = t_code_mask(agenda["t_system_coverage"])
+    agenda["telemetry"] = {
+        "signature": f"{signature:x}",
+        "degraded_layers": [key for key, status in pattern["layers"].items() if status != "normal"],
+        "flagged_t_codes": pattern["flagged_t_codes"],
+        "uncovered_t_codes": mask_to_t_codes(flagged & ~covered),
+        "focus_cycle": focus,
+    }
+    return json.dumps(agenda)
+
+
+def plan_for_signature(signature: int) -> dict:
+    """The agenda template for a degradation pattern, planned once per signature.
+
+    The template has a blank objective. Each call returns a fresh copy, so
+    callers may modify it. Call ``plan_for_signature.cache_clear()`` after
+    editing ``GUIDES`` or ``CYCLES``.
+    """
+    return json.loads(_plan_json(signature))
+
+
+plan_for_signature.cache_info = _plan_json.cache_info
+plan_for_signature.cache_clear = _plan_json.cache_clear
+
+
+def default_objective(report: dict) -> str:
+    degraded = [f"{LAYER_NAMES[key]} ({layer['status']})"
+                for key, layer in report["by_layer"].items() if layer["status"] != "normal"]
+    return f"Restore {', '.join(degraded)}" if degraded else "Sustain system health"
+
+
+def agenda_from_report(report: dict, duration_hours: float = 4.0, team_size: int = 10,
+                       objective: Optional[str] = None) -> dict:
+    """A focused agenda for a telemetry report (planned once per signature)."""
+    agenda = plan_for_signature(report_signature(report, duration_hours, team_size))
+    agenda["objective"] = objective or default_objective(report)
+    return agenda
+
+
+def format_pipeline_markdown(agenda: dict) -> str:
+    telemetry = agenda["telemetry"]
+    lines = [
+        format_agenda_markdown(agenda),
+        "---",
+        "",
+        "## Telemetry Signal",
+        "",
+        f"- **Degraded Layers:** {', '.join(telemetry['degraded_layers']) or 'none'}",
+        f"- **Flagged T-Codes:** {', '.join(telemetry['flagged_t_codes']) or 'none'}",
+        f"- **Uncovered T-Codes:** {', '.join(telemetry['uncovered_t_codes']) or 'none'}",
+        f"- **Focus Cycle:** {telemetry['focus_cycle'] or 'full session'}",
+        f"- **Signature:** `{telemetry['signature']}`",
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn telemetry reports into focused session agendas")
+    parser.add_argument("inputs", nargs="+",
+                        help="Report JSON files, or NDJSON reading files with --ndjson ('-' for stdin)")
+    parser.add_argument("--ndjson", action="store_true", help="Inputs are NDJSON readings, not reports")
+    parser.add_argument("--duration-hours", type=float, default=4.0)
+    parser.add_argument("--team-size", type=int, default=10)
+    parser.add_argument("--objective", help="Objective for every agenda (default: derived from the report)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of Markdown")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    agendas: List[dict] = []
+    for path in args.inputs:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            report = generate_streaming_report(stream) if args.ndjson else json.load(stream)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        agendas.append(agenda_from_report(report, args.duration_hours, args.team_size, args.objective))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(agendas if len(agendas) > 1 else agendas[0], indent=2))
+    else:
+        print("\n\n".join(format_pipeline_markdown(agenda) for agenda in agendas))
+    info = plan_for_signature.cache_info()
+    print(f"Planned {len(agendas)} agendas in {elapsed:.3f}s ({info.misses} plans, {info.hits} memoized)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
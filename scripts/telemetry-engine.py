@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Incremental Telemetry Engine for Unicorn Dynamics
+
+Long-lived engine that keeps the current status of every metric and b9/p9/j9
+layer, accepts new readings and emits only status transitions (escalations
+and recoveries). Recovery uses hysteresis so values hovering around a
+threshold do not flap. Full reports are rendered on demand and cached per
+status generation.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Union
+
+import script_loader  # noqa: F401  (makes telemetry_mapper importable)
+from telemetry_mapper import (
+    LOWER_IS_WORSE,
+    METRIC_KEYS,
+    METRICS,
+    STATUS_CODES,
+    ArchitectureLayer,
+    NdjsonReadingReader,
+    ReportState,
+    TelemetryReading,
+    evaluate_metric,
+    format_report_markdown,
+)
+
+STATUS_ORDER = ["normal", "warning", "critical"]
+
+
+@dataclass
+class TransitionEvent:
+    scope: str  # "metric" or "layer"
+    key: str  # metric key or layer key
+    layer: str
+    previous: str
+    current: str
+    kind: str  # escalation or recovery
+    value: Optional[float]
+    timestamp: str
+    generation: int
+
+
+def evaluate_with_hysteresis(metric_key: str, value: float, current: str, hysteresis: float) -> str:
+    """Evaluate a reading, requiring a margin before de-escalating.
+
+    Escalation is immediate. To drop below ``current`` the value must clear
+    that status's threshold by ``hysteresis`` (a fraction of the threshold).
+    """
+    raw = evaluate_metric(metric_key, value)
+    if raw == "unknown" or STATUS_CODES[raw] >= STATUS_CODES[current]:
+        return raw
+
+    # Shift thresholds toward the healthy side and cap at the current status
+    thresholds = METRICS[metric_key].thresholds
+    lower_is_worse = metric_key in LOWER_IS_WORSE
+    shifted = "normal"
+    for level in ("warning", "critical"):
+        threshold = thresholds[level]
+        margin = abs(threshold) * hysteresis
+        if lower_is_worse and value <= threshold + margin:
+            shifted = level
+        elif not lower_is_worse and value >= threshold - margin:
+            shifted = level
+    return min(current, shifted, key=STATUS_CODES.get)
+
+
+class IncrementalEngine:
+    """Keeps per-metric and per-layer status and emits transitions.
+
+    Each ingested reading costs O(1): the metric's status is re-evaluated
+    and per-layer status counts are adjusted, so a layer's status is the
+    worst status with a non-zero count.
+    """
+
+    def __init__(self, hysteresis: Union[float, Dict[str, float]] = 0.05):
+        self.hysteresis = hysteresis
+        self.metrics: Dict[str, TelemetryReading] = {}
+        self.layer_counts = {layer.value: {s: 0 for s in STATUS_ORDER} for layer in ArchitectureLayer}
+        self.layer_status = {layer.value: "normal" for layer in ArchitectureLayer}
+        self.generation = 0
+        self._snapshot = None
+        self._snapshot_generation = -1
+
+    def _hysteresis_for(self, metric_key: str) -> float:
+        if isinstance(self.hysteresis, dict):
+            return self.hysteresis.get(metric_key, 0.0)
+        return self.hysteresis
+
+    def ingest(self, readings: Iterable[TelemetryReading]) -> List[TransitionEvent]:
+        """Apply new readings and return the resulting status transitions."""
+        events = []
+        for reading in readings:
+            if reading.metric_key not in METRICS:
+                continue
+
+            previous_reading = self.metrics.get(reading.metric_key)
+            previous = previous_reading.status if previous_reading else None
+            status = evaluate_with_hysteresis(
+                reading.metric_key, reading.value, previous or "normal", self._hysteresis_for(reading.metric_key)
+            )
+            self.metrics[reading.metric_key] = TelemetryReading(
+                reading.metric_key, reading.value, reading.timestamp, status
+            )
+            if status == previous:
+                continue
+
+            layer_key = METRICS[reading.metric_key].layer.value
+            counts = self.layer_counts[layer_key]
+            if previous is not None:
+                counts[previous] -= 1
+            counts[status] += 1
+
+            # A first reading that is normal is not a transition
+            if previous is not None or status != "normal":
+                self.generation += 1
+                events.append(self._event(
+                    "metric", reading.metric_key, layer_key, previous or "normal", status,
+                    reading.value, reading.timestamp,
+                ))
+
+            layer_status = next(s for s in reversed(STATUS_ORDER) if counts[s] or s == "normal")
+            if layer_status != self.layer_status[layer_key]:
+                self.generation += 1
+                events.append(self._event(
+                    "layer", layer_key, layer_key, self.layer_status[layer_key], layer_status,
+                    None, reading.timestamp,
+                ))
+                self.layer_status[layer_key] = layer_status
+        return events
+
+    def _event(self, scope, key, layer, previous, current, value, timestamp) -> TransitionEvent:
+        kind = "escalation" if STATUS_CODES[current] > STATUS_CODES[previous] else "recovery"
+        return TransitionEvent(scope, key, layer, previous, current, kind, value, timestamp, self.generation)
+
+    def report(self) -> dict:
+        """Build a full report from the current per-metric state."""
+        readings = [self.metrics[key] for key in METRIC_KEYS if key in self.metrics]
+        report = ReportState().add(readings, [r.status for r in readings]).to_report()
+        report["generation"] = self.generation
+        return report
+
+    def snapshot(self) -> dict:
+        """Rendered report, Markdown and JSON, re-rendered only when status changed.
+
+        Values reflect the readings current at the last status transition.
+        """
+        if self._snapshot_generation != self.generation:
+            report = self.report()
+            self._snapshot = {
+                "generation": self.generation,
+                "report": report,
+                "markdown": format_report_markdown(report),
+                "json": json.dumps(report, indent=2),
+            }
+            self._snapshot_generation = self.generation
+        return self._snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit telemetry status transitions from an NDJSON stream")
+    parser.add_argument("ndjson", nargs="?", default="-", help="NDJSON readings (default: stdin)")
+    parser.add_argument("--hysteresis", type=float, default=0.05,
+                        help="Recovery margin as a fraction of the threshold (default: 0.05)")
+    parser.add_argument("--report", action="store_true", help="Print the full Markdown report at end of input")
+    args = parser.parse_args()
+
+    engine = IncrementalEngine(args.hysteresis)
+    stream = sys.stdin if args.ndjson == "-" else open(args.ndjson, encoding="utf-8")
+    try:
+        for reading in NdjsonReadingReader(stream):
+            for event in engine.ingest([reading]):
+                print(json.dumps(asdict(event)), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if args.report:
+        print(engine.snapshot()["markdown"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Telemetry Export Endpoint for Unicorn Dynamics
+
+Serves pre-rendered, generation-numbered snapshots of the incremental
+engine's b9/p9/j9 status over a small localhost HTTP server:
+
+    /status    layer status and recommendations (JSON)
+    /report    full telemetry report (JSON)
+    /report.md full telemetry report (Markdown)
+    /metrics   OpenMetrics text exposition
+
+Status and report bodies are re-rendered only when the engine's status
+generation changes, so their values are those at the last transition.
+``/metrics`` is rendered per request so its values stay current. Every
+response carries an ETag hashed from its body, so polls with
+``If-None-Match`` get a 304 when nothing changed.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from typing import Dict, Tuple
+
+import script_loader  # noqa: F401  (makes sibling scripts importable)
+from telemetry_engine import IncrementalEngine
+from telemetry_mapper import METRIC_KEYS, METRICS, STATUS_CODES, NdjsonReadingReader
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+ROUTES = {
+    "/status": "application/json",
+    "/report": "application/json",
+    "/report.md": "text/markdown; charset=utf-8",
+    "/metrics": OPENMETRICS_TYPE,
+}
+
+
+def format_openmetrics(engine: IncrementalEngine) -> str:
+    """Render current engine state in the OpenMetrics text format."""
+    lines = [
+        "# TYPE unicorn_layer_status gauge",
+        "# HELP unicorn_layer_status Layer status (0 normal, 1 warning, 2 critical).",
+    ]
+    for layer_key, status in engine.layer_status.items():
+        lines.append(f'unicorn_layer_status{{layer="{layer_key}"}} {STATUS_CODES[status]}')
+
+    lines.append("# TYPE unicorn_metric_value gauge")
+    lines.append("# HELP unicorn_metric_value Latest reading per metric.")
+    for key in METRIC_KEYS:
+        if key in engine.metrics:
+            metric = METRICS[key]
+            lines.append(
+                f'unicorn_metric_value{{metric="{key}",layer="{metric.layer.value}",unit="{metric.unit}"}} '
+                f"{engine.metrics[key].value}"
+            )
+
+    lines.append("# TYPE unicorn_metric_status gauge")
+    lines.append("# HELP unicorn_metric_status Metric status (0 normal, 1 warning, 2 critical).")
+    for key in METRIC_KEYS:
+        if key in engine.metrics:
+            lines.append(
+                f'unicorn_metric_status{{metric="{key}",layer="{METRICS[key].layer.value}"}} '
+                f"{STATUS_CODES[engine.metrics[key].status]}"
+            )
+
+    lines.append("# TYPE unicorn_status_generation gauge")
+    lines.append("# HELP unicorn_status_generation Number of status transitions observed.")
+    lines.append(f"unicorn_status_generation {engine.generation}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _with_etag(body: str) -> Tuple[bytes, str]:
+    # Hashing the body keeps ETags valid across restarts, when generation
+    # numbers start over for different data
+    data = body.encode()
+    return data, f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+
+
+class SnapshotCache:
+    """Response bodies keyed by the engine's status generation.
+
+    ``/metrics`` carries live values, so it is rendered on every request.
+    """
+
+    def __init__(self, engine: IncrementalEngine):
+        self.engine = engine
+        self.generation = -1
+        self.bodies: Dict[str, Tuple[bytes, str]] = {}
+        self.renders = 0
+
+    def get(self, path: str) -> Tuple[bytes, str]:
+        """Return ``(body, etag)`` for a route, rendering only on a new generation."""
+        if path == "/metrics":
+            return _with_etag(format_openmetrics(self.engine))
+        if self.engine.generation != self.generation:
+            self._render()
+        return self.bodies[path]
+
+    def _render(self) -> None:
+        generation = self.engine.generation
+        snapshot = self.engine.snapshot()
+        status = {
+            "generation": generation,
+            "layers": dict(self.engine.layer_status),
+            "recommendations": snapshot["report"]["recommendations"],
+        }
+        rendered = {
+            "/status": json.dumps(status),
+            "/report": snapshot["json"],
+            "/report.md": snapshot["markdown"],
+        }
+        self.bodies = {path: _with_etag(body) for path, body in rendered.items()}
+        self.generation = generation
+        self.renders += 1
+
+
+async def handle_http(cache: SnapshotCache, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serve GET/HEAD requests with keep-alive and conditional responses."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            method, path = (parts[0], parts[1].split("?", 1)[0]) if len(parts) >= 2 else ("", "")
+            if method not in ("GET", "HEAD"):
+                status_line, body, extra = "405 Method Not Allowed", b"", {"Allow": "GET, HEAD"}
+            elif path not in ROUTES:
+                status_line, body, extra = "404 Not Found", b"not found\n", {}
+            else:
+                body, etag = cache.get(path)
+                extra = {"ETag": etag, "Content-Type": ROUTES[path], "Cache-Control": "no-cache"}
+                if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+                    status_line, body = "304 Not Modified", b""
+                else:
+                    status_line = "200 OK"
+
+            keep_alive = headers.get("connection", "").lower() != "close"
+            head = [f"HTTP/1.1 {status_line}", f"Content-Length: {len(body)}"]
+            head += [f"{name}: {value}" for name, value in extra.items()]
+            head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            if method != "HEAD":
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionResetError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_http(cache: SnapshotCache, host: str = "127.0.0.1", port: int = 9464) -> asyncio.AbstractServer:
+    """Start the export endpoint on the running event loop."""
+    return await asyncio.start_server(lambda r, w: handle_http(cache, r, w), host, port)
+
+
+async def _serve(cache: SnapshotCache, host: str, port: int) -> None:
+    server = await start_http(cache, host, port)
+    print(f"Serving http://{host}:{port}{{{','.join(ROUTES)}}}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve cached telemetry status snapshots over HTTP")
+    parser.add_argument("ndjson", nargs="?", help="Seed the engine from an NDJSON readings file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9464)
+    parser.add_argument("--hysteresis", type=float, default=0.05)
+    args = parser.parse_args()
+
+    engine = IncrementalEngine(args.hysteresis)
+    if args.ndjson:
+        with open(args.ndjson, encoding="utf-8") as stream:
+            engine.ingest(NdjsonReadingReader(stream))
+    try:
+        asyncio.run(_serve(SnapshotCache(engine), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
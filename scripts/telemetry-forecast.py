@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Telemetry Forecaster for Unicorn Dynamics
+
+Holt-linear (double exponential smoothing) state for every metric in
+``METRICS``, held in plain float lists indexed by metric id. Each reading
+updates its metric in O(1); projections of time-to-warning and
+time-to-critical are computed for all metrics at once in NumPy and added to
+reports as a "predicted" section with matching recommendations.
+
+Only this script's reports carry the "predicted" section;
+``generate_telemetry_report`` and the engine leave it out unless
+``add_forecast_to_report`` is applied to their output.
+"""
+
+import argparse
+import json
+import math
+import sys
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+import script_loader  # noqa: F401  (makes telemetry_mapper importable)
+from telemetry_mapper import (
+    LOWER_IS_WORSE,
+    METRIC_IDS,
+    METRIC_KEYS,
+    METRICS,
+    NdjsonReadingReader,
+    StreamingReport,
+    TelemetryReading,
+    format_report_markdown,
+    iter_reading_batches,
+    map_to_grove_guides,
+    parse_timestamp,
+)
+
+DEFAULT_HORIZON = 3600.0  # seconds
+
+
+class HoltForecaster:
+    """Time-aware Holt-linear smoothing for all metrics.
+
+    Trends are kept per second so irregular scrape intervals are handled.
+    Lower-is-worse metrics are tracked in negated space, so "toward the
+    threshold" is always an increasing signed value.
+    """
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.1):
+        size = len(METRIC_KEYS)
+        self.alpha = alpha
+        self.beta = beta
+        # Per-reading updates index plain floats; NumPy scalar indexing is slower
+        self.level = [0.0] * size
+        self.trend = [0.0] * size
+        self.last_epoch = [math.nan] * size
+        self.updates = [0] * size
+        self.untimed = 0  # readings skipped for lack of a finite timestamp
+        self.nonfinite = 0  # readings skipped for a NaN or infinite value
+
+        self.sign_list = [-1.0 if key in LOWER_IS_WORSE else 1.0 for key in METRIC_KEYS]
+        self.signs = np.array(self.sign_list)
+        self.warning = np.array([METRICS[key].thresholds["warning"] for key in METRIC_KEYS]) * self.signs
+        self.critical = np.array([METRICS[key].thresholds["critical"] for key in METRIC_KEYS]) * self.signs
+
+    def update(self, metric_id: int, value: float, epoch: float) -> None:
+        """Fold one reading into its metric's level and trend.
+
+        Readings with a NaN or infinite epoch or value are skipped and counted
+        in ``untimed`` or ``nonfinite``; either would stick in the state.
+        """
+        if not math.isfinite(epoch):
+            self.untimed += 1
+            return
+        if not math.isfinite(value):
+            self.nonfinite += 1
+            return
+        value *= self.sign_list[metric_id]
+        if not self.updates[metric_id]:
+            self.level[metric_id] = value
+            self.last_epoch[metric_id] = epoch
+            self.updates[metric_id] = 1
+            return
+
+        level = self.level[metric_id]
+        trend = self.trend[metric_id]
+        dt = epoch - self.last_epoch[metric_id]
+        if dt <= 0:
+            # Same (or out-of-order) timestamp: refine the level only
+            self.level[metric_id] = self.alpha * value + (1 - self.alpha) * level
+        else:
+            new_level = self.alpha * value + (1 - self.alpha) * (level + trend * dt)
+            self.trend[metric_id] = self.beta * (new_level - level) / dt + (1 - self.beta) * trend
+            self.level[metric_id] = new_level
+            self.last_epoch[metric_id] = epoch
+        self.updates[metric_id] += 1
+
+    def update_batch(self, metric_ids, values, epochs) -> None:
+        """Fold columnar readings in order."""
+        for metric_id, value, epoch in zip(np.asarray(metric_ids).tolist(),
+                                           np.asarray(values, dtype=np.float64).tolist(),
+                                           np.asarray(epochs, dtype=np.float64).tolist()):
+            if 0 <= metric_id < len(METRIC_KEYS):
+                self.update(metric_id, value, epoch)
+
+    def add_readings(self, readings: Iterable[TelemetryReading]) -> None:
+        """Fold ``TelemetryReading`` objects in order.
+
+        Readings without a parseable timestamp carry no trend information;
+        ``update`` skips them and counts them in ``untimed``.
+        """
+        for reading in readings:
+            metric_id = METRIC_IDS.get(reading.metric_key)
+            if metric_id is None:
+                continue
+            try:
+                epoch = parse_timestamp(reading.timestamp)
+            except ValueError:
+                epoch = math.nan
+            self.update(metric_id, reading.value, epoch)
+
+    def time_to(self, thresholds: np.ndarray) -> np.ndarray:
+        """Seconds until each metric's trend reaches ``thresholds`` (inf if never, 0 if past)."""
+        level, trend = np.array(self.level), np.array(self.trend)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eta = np.where(trend > 0, (thresholds - level) / trend, np.inf)
+        eta = np.where(level >= thresholds, 0.0, eta)
+        return np.where(np.array(self.updates) > 1, eta, np.inf)
+
+    def predictions(self, horizon: float = DEFAULT_HORIZON) -> List[dict]:
+        """Metrics projected to cross warning or critical within ``horizon`` seconds.
+
+        Metrics already past a threshold are reported by the regular
+        evaluation and are only listed here for the next threshold ahead.
+        """
+        to_warning = self.time_to(self.warning)
+        to_critical = self.time_to(self.critical)
+        upcoming = ((to_warning > 0) & (to_warning <= horizon)) | ((to_critical > 0) & (to_critical <= horizon))
+
+        predicted = []
+        for metric_id in np.flatnonzero(upcoming).tolist():
+            key = METRIC_KEYS[metric_id]
+            metric = METRICS[key]
+            sign = self.sign_list[metric_id]
+            predicted.append({
+                "metric_key": key,
+                "name": metric.name,
+                "layer": metric.layer.value,
+                "unit": metric.unit,
+                "level": self.level[metric_id] * sign,
+                "trend_per_minute": self.trend[metric_id] * sign * 60,
+                "time_to_warning": _finite(to_warning[metric_id]),
+                "time_to_critical": _finite(to_critical[metric_id]),
+            })
+        predicted.sort(key=_next_crossing)
+        return predicted
+
+
+def _next_crossing(prediction: dict) -> float:
+    upcoming = [eta for eta in (prediction["time_to_warning"], prediction["time_to_critical"]) if eta]
+    return min(upcoming, default=np.inf)
+
+
+def _finite(seconds: float) -> Optional[float]:
+    return float(seconds) if np.isfinite(seconds) else None
+
+
+def add_forecast_to_report(report: dict, forecaster: HoltForecaster, horizon: float = DEFAULT_HORIZON) -> dict:
+    """Add a "predicted" section and predictive recommendations to a report."""
+    report["predicted"] = forecaster.predictions(horizon)
+    for prediction in report["predicted"]:
+        metric = METRICS[prediction["metric_key"]]
+        warning_eta, critical_eta = prediction["time_to_warning"], prediction["time_to_critical"]
+        status, eta = ("predicted critical", critical_eta) if warning_eta in (None, 0.0) else \
+            ("predicted warning", warning_eta)
+        report["recommendations"].append({
+            "metric": metric.name,
+            "status": status,
+            "layer": metric.layer.value,
+            "triad": metric.triad.value,
+            "suggested_guides": map_to_grove_guides(metric.layer),
+            "t_codes": metric.t_codes,
+            "eta_seconds": eta,
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast telemetry threshold crossings from an NDJSON stream")
+    parser.add_argument("ndjson", nargs="?", default="-", help="NDJSON readings (default: stdin)")
+    parser.add_argument("--horizon", type=float, default=DEFAULT_HORIZON, help="Forecast horizon in seconds")
+    parser.add_argument("--alpha", type=float, default=0.3, help="Level smoothing factor")
+    parser.add_argument("--beta", type=float, default=0.1, help="Trend smoothing factor")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of Markdown")
+    args = parser.parse_args()
+
+    forecaster = HoltForecaster(args.alpha, args.beta)
+    summary = StreamingReport()
+    stream = sys.stdin if args.ndjson == "-" else open(args.ndjson, encoding="utf-8")
+    try:
+        for batch in iter_reading_batches(NdjsonReadingReader(stream)):
+            forecaster.add_readings(batch)
+            summary.update(batch)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    report = add_forecast_to_report(summary.to_report(), forecaster, args.horizon)
+    print(json.dumps(report, indent=2) if args.json else format_report_markdown(report))
+    if forecaster.untimed:
+        print(f"Left {forecaster.untimed} readings without a timestamp out of the forecast", file=sys.stderr)
+    if forecaster.nonfinite:
+        print(f"Left {forecaster.nonfinite} readings with a non-finite value out of the forecast", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
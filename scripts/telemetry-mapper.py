@@ -6,12 +6,46 @@ Maps operational metrics to b9/p9/j9 architecture layers and AUTOGNOSIS levels.
 Provides integration between Grove planning artifacts and system telemetry.
 """
 
+import argparse
+import contextlib
+import itertools
 import json
+import math
+import os
+import random
+import re
 import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import IO, Iterable, Iterator, List, Dict, Optional
 from enum import Enum
 
+try:
+    import script_loader  # noqa: F401  (makes self_telemetry importable)
+    import self_telemetry
+    from self_telemetry import active as active_self_telemetry, instrumented, stage
+except ImportError:  # copied without its siblings: stages are no-ops, --self-telemetry is unavailable
+    self_telemetry = None
+
+    def active_self_telemetry():
+        return None
+
+    def instrumented(name: str):
+        return lambda function: function
+
+    def stage(name: str):
+        return contextlib.nullcontext()
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; readings fall back to the per-reading path
+    np = None
+
 
 class ArchitectureLayer(Enum):
     B9 = "b9"  # Form Triad - Rooted trees (structure/sensory) - T7, T4, T1
@@ -128,6 +162,47 @@ METRICS = {
 }
 
 
+# Metrics where a lower value is worse (throughput, coverage, coherence)
+LOWER_IS_WORSE = frozenset({
+    "edge_throughput", "topology_coverage", "resonance_coherence",
+    "system_coherence", "gradient_entropy",
+})
+
+# Integer status codes used by the batch evaluator, ordered so max() is the worst
+STATUS_UNKNOWN = -1
+STATUS_NORMAL = 0
+STATUS_WARNING = 1
+STATUS_CRITICAL = 2
+
+STATUS_NAMES = {
+    STATUS_UNKNOWN: "unknown",
+    STATUS_NORMAL: "normal",
+    STATUS_WARNING: "warning",
+    STATUS_CRITICAL: "critical",
+}
+STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+
+# Columnar metric ids: a metric's id is its position in METRIC_KEYS
+METRIC_KEYS = tuple(METRICS)
+METRIC_IDS = {key: metric_id for metric_id, key in enumerate(METRIC_KEYS)}
+
+
+def _build_threshold_arrays():
+    """Precompute sign-normalized threshold arrays indexed by metric id.
+
+    Lower-is-worse metrics are negated so every metric can be compared with
+    ``value * sign >= threshold * sign``.
+    """
+    signs = np.array([-1.0 if key in LOWER_IS_WORSE else 1.0 for key in METRIC_KEYS])
+    warning = np.array([METRICS[key].thresholds["warning"] for key in METRIC_KEYS], dtype=np.float64)
+    critical = np.array([METRICS[key].thresholds["critical"] for key in METRIC_KEYS], dtype=np.float64)
+    return signs, warning * signs, critical * signs
+
+
+if np is not None:
+    _THRESHOLD_SIGNS, _SIGNED_WARNING, _SIGNED_CRITICAL = _build_threshold_arrays()
+
+
 @dataclass
 class TelemetryReading:
     metric_key: str
@@ -145,8 +220,7 @@ def evaluate_metric(metric_key: str, value: float) -> str:
     thresholds = metric.thresholds
     
     # Handle metrics where lower is worse
-    if metric_key in ["edge_throughput", "topology_coverage", "resonance_coherence", 
-                      "system_coherence", "gradient_entropy"]:
+    if metric_key in LOWER_IS_WORSE:
         if value <= thresholds["critical"]:
             return "critical"
         elif value <= thresholds["warning"]:
@@ -161,91 +235,591 @@ def evaluate_metric(metric_key: str, value: float) -> str:
     return "normal"
 
 
+def encode_metric_keys(metric_keys: Iterable[str]) -> "np.ndarray":
+    """Encode metric keys as an int32 metric id column (-1 for unknown keys)."""
+    return np.fromiter((METRIC_IDS.get(key, -1) for key in metric_keys), dtype=np.int32)
+
+
+def evaluate_metrics_batch(metric_ids, values) -> "np.ndarray":
+    """Evaluate columnar readings against thresholds in one vectorized pass.
+
+    ``metric_ids`` is an integer array of ids into ``METRIC_KEYS`` (or a
+    sequence of metric key strings) and ``values`` the matching float array.
+    Returns an int8 array of status codes (see ``STATUS_NAMES``).
+    """
+    if np is None:
+        raise RuntimeError("evaluate_metrics_batch requires NumPy")
+    
+    ids = np.asarray(metric_ids)
+    if ids.dtype.kind not in "iu":
+        ids = encode_metric_keys(ids)
+    values = np.asarray(values, dtype=np.float64)
+    if ids.shape != values.shape:
+        raise ValueError(f"metric_ids and values differ in shape: {ids.shape} != {values.shape}")
+    
+    known = (ids >= 0) & (ids < len(METRIC_KEYS))
+    safe_ids = np.where(known, ids, 0)
+    signed = values * _THRESHOLD_SIGNS[safe_ids]
+    
+    # Thresholds are ordered, so warning + critical hits give 0/1/2 directly
+    statuses = (signed >= _SIGNED_WARNING[safe_ids]).astype(np.int8)
+    statuses += signed >= _SIGNED_CRITICAL[safe_ids]
+    statuses[~known] = STATUS_UNKNOWN
+    return statuses
+
+
+def _evaluate_readings(readings: List[TelemetryReading]) -> List[str]:
+    """Evaluate readings, using the batch evaluator when NumPy is available."""
+    with stage("report.evaluate"):
+        if isinstance(readings, ReadingBatch):
+            return readings.statuses()
+        if np is None:
+            return [evaluate_metric(r.metric_key, r.value) for r in readings]
+        
+        ids = encode_metric_keys(r.metric_key for r in readings)
+        values = np.fromiter((r.value for r in readings), dtype=np.float64, count=len(readings))
+        return [STATUS_NAMES[code] for code in evaluate_metrics_batch(ids, values).tolist()]
+
+
+@lru_cache(maxsize=4096)
+def _format_epoch(epoch: float) -> str:
+    if epoch != epoch:  # NaN: the reading had no parseable timestamp
+        return ""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _parse_epoch(timestamp) -> float:
+    """``parse_timestamp`` for str or bytes, NaN when absent or unparseable."""
+    if not timestamp:
+        return math.nan
+    if isinstance(timestamp, bytes):
+        timestamp = timestamp.decode("utf-8", "replace")
+    try:
+        return parse_timestamp(timestamp)
+    except ValueError:
+        return math.nan
+
+
+class CompactReading:
+    """A reading stored as an interned metric id, epoch seconds and a status code.
+    
+    Duck-compatible with ``TelemetryReading``: ``metric_key``, ``timestamp``
+    and ``status`` are derived on access, so no per-reading strings are kept.
+    Unknown metric keys have id -1 and an empty ``metric_key``.
+    """
+    
+    __slots__ = ("metric_id", "value", "epoch", "status_code")
+    
+    def __init__(self, metric_id: int, value: float, epoch: float, status_code: int = STATUS_UNKNOWN):
+        self.metric_id = metric_id
+        self.value = value
+        self.epoch = epoch
+        self.status_code = status_code
+    
+    @classmethod
+    def from_reading(cls, reading: TelemetryReading) -> "CompactReading":
+        status = evaluate_metric(reading.metric_key, reading.value)
+        return cls(METRIC_IDS.get(reading.metric_key, -1), reading.value,
+                   _parse_epoch(reading.timestamp), STATUS_CODES[status])
+    
+    @property
+    def metric_key(self) -> str:
+        return METRIC_KEYS[self.metric_id] if self.metric_id >= 0 else ""
+    
+    @property
+    def timestamp(self) -> str:
+        return _format_epoch(self.epoch)
+    
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self.status_code]
+    
+    def __repr__(self) -> str:
+        return f"CompactReading({self.metric_key!r}, {self.value!r}, {self.timestamp!r}, {self.status!r})"
+
+
+class ReadingBatch:
+    """Array-backed reading columns, 19 bytes per reading.
+    
+    ``metric_ids`` (int16), ``values`` and ``epochs`` (float64) and
+    ``status_codes`` (int8) are ``array.array`` columns, so a batch pickles
+    compactly and NumPy reads it without copying. The report paths use the
+    columns directly; indexing or iterating yields ``CompactReading`` views.
+    """
+    
+    def __init__(self):
+        self.metric_ids = array("h")
+        self.values = array("d")
+        self.epochs = array("d")
+        self.status_codes = array("b")
+    
+    @classmethod
+    def from_readings(cls, readings: Iterable[TelemetryReading]) -> "ReadingBatch":
+        batch = cls()
+        last_timestamp, last_epoch = None, math.nan
+        for reading in readings:
+            if reading.timestamp != last_timestamp:
+                last_timestamp, last_epoch = reading.timestamp, _parse_epoch(reading.timestamp)
+            batch.metric_ids.append(METRIC_IDS.get(reading.metric_key, -1))
+            batch.values.append(reading.value)
+            batch.epochs.append(last_epoch)
+        return batch.evaluate()
+    
+    def evaluate(self) -> "ReadingBatch":
+        """(Re)compute ``status_codes`` from the id and value columns."""
+        if np is not None:
+            codes = evaluate_metrics_batch(np.frombuffer(self.metric_ids, dtype=np.int16),
+                                           np.frombuffer(self.values, dtype=np.float64))
+            self.status_codes = array("b", codes.tobytes())
+        else:
+            self.status_codes = array("b", (
+                STATUS_CODES[evaluate_metric(METRIC_KEYS[metric_id], value)] if metric_id >= 0 else STATUS_UNKNOWN
+                for metric_id, value in zip(self.metric_ids, self.values)
+            ))
+        return self
+    
+    def statuses(self) -> List[str]:
+        return [STATUS_NAMES[code] for code in self.status_codes]
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column)
+                   for column in (self.metric_ids, self.values, self.epochs, self.status_codes))
+    
+    def extend(self, other: "ReadingBatch") -> "ReadingBatch":
+        self.metric_ids.extend(other.metric_ids)
+        self.values.extend(other.values)
+        self.epochs.extend(other.epochs)
+        self.status_codes.extend(other.status_codes)
+        return self
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            batch = ReadingBatch()
+            batch.metric_ids = self.metric_ids[index]
+            batch.values = self.values[index]
+            batch.epochs = self.epochs[index]
+            batch.status_codes = self.status_codes[index]
+            return batch
+        return CompactReading(self.metric_ids[index], self.values[index], self.epochs[index],
+                              self.status_codes[index])
+    
+    def __iter__(self) -> Iterator[CompactReading]:
+        for fields in zip(self.metric_ids, self.values, self.epochs, self.status_codes):
+            yield CompactReading(*fields)
+
+
+# Metric ids keyed by both str and bytes, so the parsers can intern either
+_METRIC_IDS_ANY = {**METRIC_IDS, **{key.encode(): metric_id for key, metric_id in METRIC_IDS.items()}}
+
+# A whole record in the usual metric_key/value/timestamp order with no escapes,
+# duplicate or extra fields, for which the regex captures exactly what
+# ``json.loads`` would; any other line goes through ``json.loads``
+_JSON_SPACE = r"[ \t\r]*"
+_JSON_NUMBER = r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?"
+_NDJSON_RECORD = (
+    rf'^{_JSON_SPACE}\{{{_JSON_SPACE}"metric_key"{_JSON_SPACE}:{_JSON_SPACE}"([^"\\]+)"{_JSON_SPACE},'
+    rf'{_JSON_SPACE}"value"{_JSON_SPACE}:{_JSON_SPACE}({_JSON_NUMBER}){_JSON_SPACE}'
+    rf'(?:,{_JSON_SPACE}"timestamp"{_JSON_SPACE}:{_JSON_SPACE}"([^"\\]*)"{_JSON_SPACE})?\}}{_JSON_SPACE}$'
+)
+_NDJSON_RECORDS = {str: re.compile(_NDJSON_RECORD, re.M), bytes: re.compile(_NDJSON_RECORD.encode(), re.M)}
+_CSV_SEPARATORS = {str: ",", bytes: b","}
+
+
+def _record_metric_key(record: dict) -> str:
+    """The ``metric_key`` (or ``metric``) of a decoded NDJSON record.
+    
+    Raises ``KeyError`` when absent and ``TypeError`` when not a string, so
+    readers skip the line instead of passing an unhashable key downstream.
+    """
+    metric_key = record.get("metric_key") or record["metric"]
+    if not isinstance(metric_key, str):
+        raise TypeError(f"metric key must be a string, not {type(metric_key).__name__}")
+    return metric_key
+
+
+class ReadingBatchReader:
+    """Parse readings from a line stream straight into ``ReadingBatch`` columns.
+    
+    Formats are ``ndjson`` (fields as for ``NdjsonReadingReader``), ``csv``
+    (unquoted ``metric_key,value[,timestamp]``, with an optional header
+    naming the columns) and ``line`` protocol (``metric_key value [epoch]``);
+    lines may be str or bytes. Plain NDJSON records are matched with a regex
+    (over the whole chunk when every line is one) rather than decoded into a
+    dict per line; any other line is decoded with ``json.loads``, so the
+    result always equals ``NdjsonReadingReader``'s. Iterating yields
+    evaluated batches of at most ``batch_size`` lines; malformed lines are
+    counted in ``skipped``.
+    """
+    
+    FORMATS = ("ndjson", "csv", "line")
+    
+    def __init__(self, stream: Iterable, format: str = "ndjson", batch_size: int = 10_000):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown reading format '{format}' (expected one of {', '.join(self.FORMATS)})")
+        self.stream = stream
+        self.format = format
+        self.batch_size = batch_size
+        self.lines = 0
+        self.skipped = 0
+        self._columns = None
+        self._last_stamp = None
+        self._last_epoch = math.nan
+    
+    def __iter__(self) -> Iterator[ReadingBatch]:
+        parse = getattr(self, f"_parse_{self.format}")
+        iterator = iter(self.stream)
+        while True:
+            chunk = list(itertools.islice(iterator, self.batch_size))
+            if not chunk:
+                return
+            self.lines += len(chunk)
+            batch = ReadingBatch()
+            with stage("report.parse"):
+                parse(chunk, batch)
+            with stage("report.evaluate"):
+                batch.evaluate()
+            yield batch
+    
+    def _epoch(self, stamp) -> float:
+        # Dumps usually repeat the same timestamp for a whole scrape
+        if stamp != self._last_stamp:
+            self._last_stamp, self._last_epoch = stamp, _parse_epoch(stamp)
+        return self._last_epoch
+    
+    def _parse_ndjson(self, lines: list, batch: ReadingBatch) -> None:
+        kind = type(lines[0])
+        pattern = _NDJSON_RECORDS[kind]
+        records = pattern.findall(kind().join(lines))
+        if len(records) == len(lines):
+            # Every line is a plain record: parse the chunk in one regex pass
+            batch.metric_ids.extend([_METRIC_IDS_ANY.get(key, -1) for key, _, _ in records])
+            batch.values.extend([float(value) for _, value, _ in records])
+            batch.epochs.extend([self._epoch(stamp) for _, _, stamp in records])
+            return
+        
+        match = pattern.match
+        add_id, add_value, add_epoch = batch.metric_ids.append, batch.values.append, batch.epochs.append
+        for line in lines:
+            record = match(line)
+            if record is not None:
+                key, value, stamp = record.groups()
+                add_id(_METRIC_IDS_ANY.get(key, -1))
+                add_value(float(value))
+                add_epoch(self._epoch(stamp))
+                continue
+            
+            # Same rules as NdjsonReadingReader
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                metric_key = _record_metric_key(record)
+                value = float(record["value"])
+                stamp = str(record.get("timestamp", ""))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self.skipped += 1
+                continue
+            add_id(METRIC_IDS.get(metric_key, -1))
+            add_value(value)
+            add_epoch(self._epoch(stamp))
+    
+    def _parse_csv(self, lines: list, batch: ReadingBatch) -> None:
+        separator = _CSV_SEPARATORS[type(lines[0])]
+        if self._columns is None:
+            header = lines[0].split(separator)
+            if isinstance(lines[0], bytes):
+                header = [field.decode("utf-8", "replace") for field in header]
+            header = [field.strip().lower() for field in header]
+            self._columns = (0, 1, 2)
+            if "value" in header:
+                key_name = "metric_key" if "metric_key" in header else "metric"
+                self._columns = (header.index(key_name) if key_name in header else 0, header.index("value"),
+                                 header.index("timestamp") if "timestamp" in header else None)
+                lines = lines[1:]
+        key_column, value_column, stamp_column = self._columns
+        add_id, add_value, add_epoch = batch.metric_ids.append, batch.values.append, batch.epochs.append
+        for line in lines:
+            fields = line.split(separator)
+            try:
+                value = float(fields[value_column])
+                metric_key = fields[key_column].strip()
+            except (IndexError, ValueError):
+                if line.strip():
+                    self.skipped += 1
+                continue
+            stamp = fields[stamp_column].strip() if stamp_column is not None and stamp_column < len(fields) else None
+            add_id(_METRIC_IDS_ANY.get(metric_key, -1))
+            add_value(value)
+            add_epoch(self._epoch(stamp))
+    
+    def _parse_line(self, lines: list, batch: ReadingBatch) -> None:
+        add_id, add_value, add_epoch = batch.metric_ids.append, batch.values.append, batch.epochs.append
+        for line in lines:
+            fields = line.split()
+            try:
+                value = float(fields[1])
+                epoch = float(fields[2]) if len(fields) > 2 else math.nan
+            except (IndexError, ValueError):
+                if fields:
+                    self.skipped += 1
+                continue
+            add_id(_METRIC_IDS_ANY.get(fields[0], -1))
+            add_value(value)
+            add_epoch(epoch)
+
+
+# Recommended Grove Guides per architecture layer (triad), built once at import
+GROVE_GUIDES_BY_LAYER = {
+    # b9 Form Triad - Structure/Sensory guides
+    ArchitectureLayer.B9: ["Context Map", "Graphic History", "SPOT Matrix"],
+    # p9 Void Triad - Process/Motor guides  
+    ArchitectureLayer.P9: ["Graphic Gameplan", "Graphic Roadmap", "Five Bold Steps"],
+    # j9 Pole Triad - Association/Relational guides
+    ArchitectureLayer.J9: ["Stakeholder Map", "Value Proposition", "Journey Vision"],
+}
+
+
 def map_to_grove_guides(layer: ArchitectureLayer) -> List[str]:
     """Map architecture layer (triad) to recommended Grove Guides."""
-    mapping = {
-        # b9 Form Triad - Structure/Sensory guides
-        ArchitectureLayer.B9: ["Context Map", "Graphic History", "SPOT Matrix"],
-        # p9 Void Triad - Process/Motor guides  
-        ArchitectureLayer.P9: ["Graphic Gameplan", "Graphic Roadmap", "Five Bold Steps"],
-        # j9 Pole Triad - Association/Relational guides
-        ArchitectureLayer.J9: ["Stakeholder Map", "Value Proposition", "Journey Vision"],
-    }
-    return mapping.get(layer, [])
-
-
-def generate_telemetry_report(readings: List[TelemetryReading]) -> dict:
-    """Generate a comprehensive telemetry report."""
-    report = {
-        "summary": {
-            "total_metrics": len(readings),
-            "normal": 0,
-            "warning": 0,
-            "critical": 0,
-        },
-        "by_layer": {
-            "b9": {"metrics": [], "status": "normal"},
-            "p9": {"metrics": [], "status": "normal"},
-            "j9": {"metrics": [], "status": "normal"},
-        },
-        "by_autognosis_level": {
+    return GROVE_GUIDES_BY_LAYER.get(layer, [])
+
+
+def _worse_status(current: str, status: str) -> str:
+    """Return the worse of two statuses (worst status wins)."""
+    return status if STATUS_CODES[status] > STATUS_CODES[current] else current
+
+
+def _pick_timestamp(choose, current: str, other: str) -> str:
+    """``choose`` (min or max) of two timestamps by time, ignoring unparseable ones."""
+    current_epoch, other_epoch = _parse_epoch(current), _parse_epoch(other)
+    if other_epoch != other_epoch:
+        return current
+    if current_epoch != current_epoch:
+        return other
+    return current if choose(current_epoch, other_epoch) == current_epoch else other
+
+
+class RecommendationAggregator:
+    """Mergeable recommendations keyed on (metric, status).
+    
+    Repeated warning/critical readings increment an occurrence count and
+    update first-seen/last-seen (by time, not arrival order) and the worst
+    value instead of appending a new recommendation. There are at most two
+    keys per metric, so the state stays small without eviction, and ``top``
+    returns the top-K by severity then frequency.
+    """
+    
+    def __init__(self, top_k: int = 50):
+        self.top_k = top_k
+        self.entries: Dict[tuple, dict] = {}
+    
+    def add(self, metric_key: str, status: str, value: float, timestamp: str) -> None:
+        """Record one warning or critical reading."""
+        key = (metric_key, status)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = {"count": 1, "first_seen": timestamp, "last_seen": timestamp, "worst_value": value}
+            return
+        entry["count"] += 1
+        entry["first_seen"] = _pick_timestamp(min, entry["first_seen"], timestamp)
+        entry["last_seen"] = _pick_timestamp(max, entry["last_seen"], timestamp)
+        entry["worst_value"] = _worse_value(metric_key, entry["worst_value"], value)
+    
+    def merge(self, other: "RecommendationAggregator") -> "RecommendationAggregator":
+        """Fold ``other`` (a later shard) into this aggregator."""
+        for key, theirs in other.entries.items():
+            ours = self.entries.get(key)
+            if ours is None:
+                self.entries[key] = dict(theirs)
+                continue
+            ours["count"] += theirs["count"]
+            ours["first_seen"] = _pick_timestamp(min, ours["first_seen"], theirs["first_seen"])
+            ours["last_seen"] = _pick_timestamp(max, ours["last_seen"], theirs["last_seen"])
+            ours["worst_value"] = _worse_value(key[0], ours["worst_value"], theirs["worst_value"])
+        return self
+    
+    def top(self) -> List[dict]:
+        """Top-K recommendations by severity, then occurrence count."""
+        ranked = sorted(
+            self.entries.items(),
+            key=lambda item: (-STATUS_CODES[item[0][1]], -item[1]["count"], METRIC_IDS[item[0][0]]),
+        )
+        recommendations = []
+        for (metric_key, status), entry in ranked[:self.top_k]:
+            metric = METRICS[metric_key]
+            recommendations.append({
+                "metric": metric.name,
+                "status": status,
+                "layer": metric.layer.value,
+                "triad": metric.triad.value,
+                "suggested_guides": map_to_grove_guides(metric.layer),
+                "t_codes": metric.t_codes,
+                "occurrences": entry["count"],
+                "first_seen": entry["first_seen"],
+                "last_seen": entry["last_seen"],
+                "worst_value": entry["worst_value"],
+            })
+        return recommendations
+
+
+# Per-id metric lookups, so report loops index instead of hashing keys
+_METRICS_BY_ID = tuple(METRICS[key] for key in METRIC_KEYS)
+_LEVEL_KEYS_BY_ID = tuple(
+    f"{metric.autognosis_level.value}_{metric.autognosis_level.name.lower()}" for metric in _METRICS_BY_ID
+)
+
+
+def _reading_columns(readings) -> tuple:
+    """Metric ids (-1 for unknown keys) and values of a reading list or batch."""
+    if isinstance(readings, ReadingBatch):
+        return readings.metric_ids, readings.values
+    return [METRIC_IDS.get(r.metric_key, -1) for r in readings], [r.value for r in readings]
+
+
+def _worse_value(metric_key: str, current: float, value: float) -> float:
+    """Return the worse of two values for a metric."""
+    if metric_key in LOWER_IS_WORSE:
+        return min(current, value)
+    return max(current, value)
+
+
+class ReportState:
+    """Mergeable telemetry report state.
+    
+    ``merge`` is associative: counts add, layer status is worst-wins and the
+    per-layer, per-level and recommendation lists concatenate. Merging the
+    states of contiguous shards in order therefore reproduces a serial run.
+    
+    With ``aggregate_recommendations`` the per-reading recommendation list is
+    replaced by a ``RecommendationAggregator`` keeping the top ``top_k``.
+    """
+    
+    def __init__(self, aggregate_recommendations: bool = False, top_k: int = 50):
+        self.total = 0
+        self.summary = {"normal": 0, "warning": 0, "critical": 0}
+        self.layers = {layer.value: {"metrics": [], "status": "normal"} for layer in ArchitectureLayer}
+        self.levels = {
             "0_emission": [],
             "1_patterns": [],
             "2_self_image": [],
             "3_optimization": [],
-        },
-        "recommendations": [],
-    }
+        }
+        self.recommendations: List[dict] = []
+        self.aggregator = RecommendationAggregator(top_k) if aggregate_recommendations else None
     
-    for reading in readings:
-        if reading.metric_key not in METRICS:
-            continue
+    def add(self, readings: List[TelemetryReading], statuses: Optional[List[str]] = None) -> "ReportState":
+        """Evaluate a batch of readings into this state.
         
-        metric = METRICS[reading.metric_key]
-        status = evaluate_metric(reading.metric_key, reading.value)
-        
-        # Update summary counts
-        report["summary"][status] += 1
-        
-        # Add to layer grouping
-        layer_key = metric.layer.value
-        report["by_layer"][layer_key]["metrics"].append({
-            "name": metric.name,
-            "value": reading.value,
-            "unit": metric.unit,
-            "status": status,
-            "t_codes": metric.t_codes,
-        })
-        
-        # Update layer status (worst status wins)
-        if status == "critical":
-            report["by_layer"][layer_key]["status"] = "critical"
-        elif status == "warning" and report["by_layer"][layer_key]["status"] != "critical":
-            report["by_layer"][layer_key]["status"] = "warning"
-        
-        # Add to autognosis level grouping
-        level_key = f"{metric.autognosis_level.value}_{metric.autognosis_level.name.lower()}"
-        report["by_autognosis_level"][level_key].append({
-            "name": metric.name,
-            "value": reading.value,
-            "status": status,
-        })
+        ``statuses`` may supply precomputed statuses (e.g. with hysteresis)
+        instead of evaluating the readings against their thresholds; a
+        ``ReadingBatch`` already carries its own.
+        """
+        if statuses is None:
+            statuses = _evaluate_readings(readings)
+        self.total += len(readings)
+        metric_ids, values = _reading_columns(readings)
+        issues = []
+        with stage("report.aggregate"):
+            for index, (metric_id, value, status) in enumerate(zip(metric_ids, values, statuses)):
+                if metric_id < 0:
+                    continue
+                
+                metric = _METRICS_BY_ID[metric_id]
+                
+                # Update summary counts
+                self.summary[status] += 1
+                
+                # Add to layer grouping
+                layer = self.layers[metric.layer.value]
+                layer["metrics"].append({
+                    "name": metric.name,
+                    "value": value,
+                    "unit": metric.unit,
+                    "status": status,
+                    "t_codes": metric.t_codes,
+                })
+                
+                # Update layer status (worst status wins)
+                layer["status"] = _worse_status(layer["status"], status)
+                
+                # Add to autognosis level grouping
+                self.levels[_LEVEL_KEYS_BY_ID[metric_id]].append({
+                    "name": metric.name,
+                    "value": value,
+                    "status": status,
+                })
+                
+                if status in ["warning", "critical"]:
+                    issues.append((index, status))
         
         # Generate recommendations for issues
-        if status in ["warning", "critical"]:
-            guides = map_to_grove_guides(metric.layer)
-            report["recommendations"].append({
-                "metric": metric.name,
-                "status": status,
-                "layer": layer_key,
-                "triad": metric.triad.value,
-                "suggested_guides": guides,
-                "t_codes": metric.t_codes,
-            })
+        with stage("report.recommend"):
+            for index, status in issues:
+                metric_key = METRIC_KEYS[metric_ids[index]]
+                if self.aggregator is not None:
+                    self.aggregator.add(metric_key, status, values[index], readings[index].timestamp)
+                    continue
+                metric = METRICS[metric_key]
+                self.recommendations.append({
+                    "metric": metric.name,
+                    "status": status,
+                    "layer": metric.layer.value,
+                    "triad": metric.triad.value,
+                    "suggested_guides": map_to_grove_guides(metric.layer),
+                    "t_codes": metric.t_codes,
+                })
+        return self
+    
+    def merge(self, other: "ReportState") -> "ReportState":
+        """Fold ``other`` (a later shard) into this state."""
+        self.total += other.total
+        for status, count in other.summary.items():
+            self.summary[status] += count
+        for layer_key, layer in other.layers.items():
+            self.layers[layer_key]["metrics"].extend(layer["metrics"])
+            self.layers[layer_key]["status"] = _worse_status(self.layers[layer_key]["status"], layer["status"])
+        for level_key, entries in other.levels.items():
+            self.levels[level_key].extend(entries)
+        self.recommendations.extend(other.recommendations)
+        if self.aggregator is not None and other.aggregator is not None:
+            self.aggregator.merge(other.aggregator)
+        return self
+    
+    def to_report(self) -> dict:
+        """Render the state as a report dict."""
+        return {
+            "summary": {"total_metrics": self.total, **self.summary},
+            "by_layer": self.layers,
+            "by_autognosis_level": self.levels,
+            "recommendations": self.aggregator.top() if self.aggregator is not None else self.recommendations,
+        }
+
+
+def generate_telemetry_report(readings: List[TelemetryReading], aggregate_recommendations: bool = False,
+                              top_k: int = 50) -> dict:
+    """Generate a comprehensive telemetry report.
     
+    With self-telemetry enabled, the tool's own stage measurements so far
+    are summarized under ``self_telemetry``, with their b9/p9 readings
+    evaluated there too. They are kept out of the summary, layers and
+    recommendations, which describe only ``readings``.
+    """
+    report = ReportState(aggregate_recommendations, top_k).add(readings).to_report()
+    telemetry = active_self_telemetry()
+    if telemetry is not None:
+        report["self_telemetry"] = {
+            **telemetry.summary(),
+            "readings": [{"source": source, **asdict(r)} for source, r in telemetry.labelled_readings()],
+        }
     return report
 
 
+@instrumented("report.render")
 def format_report_markdown(report: dict) -> str:
     """Format telemetry report as Markdown."""
     lines = [
@@ -281,6 +855,38 @@ def format_report_markdown(report: dict) -> str:
             lines.append("*No metrics reported*")
         lines.append("")
     
+    if report.get("self_telemetry"):
+        lines.append("---")
+        lines.append("")
+        lines.append("## Self-Telemetry")
+        lines.append("")
+        lines.append("| Stage | Calls | Mean (ms) | Max (ms) |")
+        lines.append("|-------|-------|-----------|----------|")
+        for name, stats in report["self_telemetry"]["stages"].items():
+            lines.append(f"| {name} | {stats['calls']} | {stats['mean_ms']:.4g} | {stats['max_ms']:.4g} |")
+        lines.append("")
+        lines.append("| Source | Metric | Value | Status |")
+        lines.append("|--------|--------|-------|--------|")
+        for reading in report["self_telemetry"]["readings"]:
+            metric = METRICS[reading["metric_key"]]
+            lines.append(f"| {reading['source']} | {metric.name} | {reading['value']:.4g} {metric.unit} | "
+                         f"{reading['status']} |")
+        lines.append("")
+    
+    if report.get("predicted"):
+        lines.append("---")
+        lines.append("")
+        lines.append("## Predicted Threshold Crossings")
+        lines.append("")
+        lines.append("| Metric | Layer | Level | Trend/min | Warning in | Critical in |")
+        lines.append("|--------|-------|-------|-----------|------------|-------------|")
+        for p in report["predicted"]:
+            lines.append(
+                f"| {p['name']} | {p['layer']} | {p['level']:.4g} {p['unit']} | {p['trend_per_minute']:+.4g} | "
+                f"{_format_eta(p['time_to_warning'])} | {_format_eta(p['time_to_critical'])} |"
+            )
+        lines.append("")
+    
     if report["recommendations"]:
         lines.append("---")
         lines.append("")
@@ -292,30 +898,713 @@ def format_report_markdown(report: dict) -> str:
             lines.append(f"- **Layer:** {rec['layer']} | **Triad:** {rec['triad']}")
             lines.append(f"- **T-Codes:** {', '.join(rec['t_codes'])}")
             lines.append(f"- **Suggested Grove Guides:** {', '.join(rec['suggested_guides'])}")
+            if "occurrences" in rec:
+                lines.append(f"- **Occurrences:** {rec['occurrences']}"
+                             + (f" (first {rec['first_seen']}, last {rec['last_seen']}, worst {rec['worst_value']})"
+                                if "worst_value" in rec else ""))
+            if "eta_seconds" in rec:
+                lines.append(f"- **Projected crossing:** {_format_eta(rec['eta_seconds'])}")
             lines.append("")
     
     return "\n".join(lines)
 
 
-def main():
-    # Example usage with sample readings
-    sample_readings = [
-        TelemetryReading("connection_latency", 45, "2026-01-29T10:00:00Z", "normal"),
-        TelemetryReading("edge_throughput", 25, "2026-01-29T10:00:00Z", "normal"),
-        TelemetryReading("membrane_utilization", 85, "2026-01-29T10:00:00Z", "warning"),
-        TelemetryReading("thread_pool_depth", 35, "2026-01-29T10:00:00Z", "normal"),
-        TelemetryReading("gradient_entropy", 3.2, "2026-01-29T10:00:00Z", "normal"),
-        TelemetryReading("topology_coverage", 65, "2026-01-29T10:00:00Z", "warning"),
-        TelemetryReading("system_coherence", 0.82, "2026-01-29T10:00:00Z", "normal"),
-    ]
+def _format_eta(seconds: Optional[float]) -> str:
+    """Format a projected time-to-threshold for Markdown output."""
+    if seconds is None:
+        return "-"
+    if seconds <= 0:
+        return "now"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+class NdjsonReadingReader:
+    """Lazily parse newline-delimited JSON readings from a text stream.
+
+    Each line is an object with ``metric_key`` (or ``metric``), ``value`` and
+    optional ``timestamp``/``status`` fields. Malformed lines are counted in
+    ``skipped`` instead of aborting a long-running ingest.
+    """
+    
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.lines = 0
+        self.skipped = 0
+    
+    def __iter__(self) -> Iterator[TelemetryReading]:
+        for line in self.stream:
+            self.lines += 1
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                yield TelemetryReading(
+                    _record_metric_key(record),
+                    float(record["value"]),
+                    str(record.get("timestamp", "")),
+                    record.get("status", ""),
+                )
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self.skipped += 1
+
+
+def iter_reading_batches(readings: Iterable[TelemetryReading],
+                         batch_size: int = 10_000) -> Iterator[List[TelemetryReading]]:
+    """Group a reading stream into lists of at most ``batch_size`` readings."""
+    iterator = iter(readings)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _add_exact(partials: List[float], value: float) -> None:
+    """Add ``value`` to a list of non-overlapping float partials (Shewchuk).
+    
+    ``math.fsum(partials)`` is then the correctly rounded total regardless of
+    addition order, which keeps sharded and serial means bit-identical.
+    """
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+class StreamingReport:
+    """Bounded-memory report accumulator for unbounded reading streams.
+    
+    Instead of one row per reading, each metric keeps a fixed-size summary
+    (count, last/min/max/mean value, per-status counts, worst status), so
+    memory is bounded by the size of ``METRICS`` rather than the input.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.summary = {"normal": 0, "warning": 0, "critical": 0}
+        self.layer_status = {layer.value: "normal" for layer in ArchitectureLayer}
+        self.metric_stats: Dict[str, dict] = {}
+    
+    def update(self, readings: List[TelemetryReading]) -> None:
+        """Fold a batch of readings into the running summary."""
+        self.total += len(readings)
+        statuses = _evaluate_readings(readings)
+        with stage("report.aggregate"):
+            self._fold(readings, statuses)
+    
+    def _fold(self, readings: List[TelemetryReading], statuses: List[str]) -> None:
+        metric_ids, values = _reading_columns(readings)
+        for metric_id, value, status in zip(metric_ids, values, statuses):
+            if status == "unknown":
+                continue
+            
+            self.summary[status] += 1
+            metric_key = METRIC_KEYS[metric_id]
+            stats = self.metric_stats.get(metric_key)
+            if stats is None:
+                stats = self.metric_stats[metric_key] = {
+                    "count": 0, "sum": [], "min": value, "max": value,
+                    "last": value, "worst": "normal",
+                    "status_counts": {"normal": 0, "warning": 0, "critical": 0},
+                }
+            stats["count"] += 1
+            _add_exact(stats["sum"], value)
+            stats["last"] = value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+            stats["status_counts"][status] += 1
+            stats["worst"] = _worse_status(stats["worst"], status)
+            
+            # Update layer status (worst status wins)
+            layer_key = _METRICS_BY_ID[metric_id].layer.value
+            self.layer_status[layer_key] = _worse_status(self.layer_status[layer_key], status)
+    
+    def merge(self, other: "StreamingReport") -> "StreamingReport":
+        """Fold ``other`` (a later shard of the stream) into this summary."""
+        self.total += other.total
+        for status, count in other.summary.items():
+            self.summary[status] += count
+        for layer_key, status in other.layer_status.items():
+            self.layer_status[layer_key] = _worse_status(self.layer_status[layer_key], status)
+        for metric_key, theirs in other.metric_stats.items():
+            ours = self.metric_stats.get(metric_key)
+            if ours is None:
+                self.metric_stats[metric_key] = {
+                    **theirs, "sum": list(theirs["sum"]), "status_counts": dict(theirs["status_counts"]),
+                }
+                continue
+            ours["count"] += theirs["count"]
+            for partial in theirs["sum"]:
+                _add_exact(ours["sum"], partial)
+            ours["last"] = theirs["last"]
+            ours["min"] = min(ours["min"], theirs["min"])
+            ours["max"] = max(ours["max"], theirs["max"])
+            ours["worst"] = _worse_status(ours["worst"], theirs["worst"])
+            for status, count in theirs["status_counts"].items():
+                ours["status_counts"][status] += count
+        return self
     
-    report = generate_telemetry_report(sample_readings)
-    markdown = format_report_markdown(report)
+    def consume(self, readings: Iterable[TelemetryReading], batch_size: int = 10_000) -> "StreamingReport":
+        """Consume a reading stream batch by batch (or a ``ReadingBatchReader``)."""
+        batches = readings if isinstance(readings, ReadingBatchReader) else iter_reading_batches(readings, batch_size)
+        for batch in batches:
+            self.update(batch)
+        return self
     
-    print(markdown)
-    print("\n---\n")
-    print("JSON Report:")
-    print(json.dumps(report, indent=2))
+    def to_report(self) -> dict:
+        """Render the summary in the ``generate_telemetry_report`` layout."""
+        report = {
+            "summary": {"total_metrics": self.total, **self.summary},
+            "by_layer": {key: {"metrics": [], "status": status} for key, status in self.layer_status.items()},
+            "by_autognosis_level": {
+                "0_emission": [],
+                "1_patterns": [],
+                "2_self_image": [],
+                "3_optimization": [],
+            },
+            "recommendations": [],
+        }
+        
+        # Metrics are reported in METRICS order so output is stable across runs
+        for metric_key in METRIC_KEYS:
+            stats = self.metric_stats.get(metric_key)
+            if stats is None:
+                continue
+            
+            metric = METRICS[metric_key]
+            layer_key = metric.layer.value
+            status = stats["worst"]
+            report["by_layer"][layer_key]["metrics"].append({
+                "name": metric.name,
+                "value": stats["last"],
+                "unit": metric.unit,
+                "status": status,
+                "t_codes": metric.t_codes,
+                "count": stats["count"],
+                "min": stats["min"],
+                "max": stats["max"],
+                "mean": math.fsum(stats["sum"]) / stats["count"],
+                "status_counts": dict(stats["status_counts"]),
+            })
+            
+            level_key = f"{metric.autognosis_level.value}_{metric.autognosis_level.name.lower()}"
+            report["by_autognosis_level"][level_key].append({
+                "name": metric.name,
+                "value": stats["last"],
+                "status": status,
+            })
+            
+            if status in ["warning", "critical"]:
+                report["recommendations"].append({
+                    "metric": metric.name,
+                    "status": status,
+                    "layer": layer_key,
+                    "triad": metric.triad.value,
+                    "suggested_guides": map_to_grove_guides(metric.layer),
+                    "t_codes": metric.t_codes,
+                    "occurrences": stats["status_counts"]["warning"] + stats["status_counts"]["critical"],
+                })
+        
+        return report
+
+
+def generate_streaming_report(stream: IO, batch_size: int = 10_000, format: str = "ndjson") -> dict:
+    """Generate a telemetry report from a text or binary reading stream in bounded memory.
+    
+    ``format`` is one of ``ReadingBatchReader.FORMATS``.
+    """
+    reader = ReadingBatchReader(stream, format, batch_size)
+    report = StreamingReport().consume(reader, batch_size).to_report()
+    report["stream"] = {"lines": reader.lines, "skipped": reader.skipped}
+    return report
+
+
+def _report_shard(readings: List[TelemetryReading], aggregate_recommendations: bool, top_k: int) -> ReportState:
+    return ReportState(aggregate_recommendations, top_k).add(readings)
+
+
+def _stream_file_shard(path: str, start: int, end: int, batch_size: int, format: str = "ndjson"):
+    """Summarize the lines that begin within bytes ``[start, end)``."""
+    def lines(f):
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                return
+            yield line
+    
+    with open(path, "rb") as f:
+        if start:
+            # Skip the line straddling the boundary; the previous shard owns it
+            f.seek(start - 1)
+            f.readline()
+        reader = ReadingBatchReader(lines(f), format, batch_size)
+        summary = StreamingReport().consume(reader)
+    return summary, reader.lines, reader.skipped
+
+
+# Formats whose lines parse independently, so a file can be split anywhere between lines
+SHARDABLE_FORMATS = ("ndjson", "line")
+
+
+def _shard_bounds(size: int, shards: int) -> List[tuple]:
+    step = -(-size // shards)
+    return [(offset, min(offset + step, size)) for offset in range(0, size, step)] or [(0, 0)]
+
+
+def generate_sharded_report(readings: List[TelemetryReading], workers: Optional[int] = None,
+                            aggregate_recommendations: bool = False, top_k: int = 50) -> dict:
+    """Generate ``generate_telemetry_report`` output across a process pool.
+    
+    Readings are split into contiguous shards whose partial states are merged
+    in order, so the result is identical to a serial run.
+    """
+    workers = workers or os.cpu_count() or 1
+    step = max(1, -(-len(readings) // workers))
+    shards = [readings[i:i + step] for i in range(0, len(readings), step)]
+    state = ReportState(aggregate_recommendations, top_k)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        count = len(shards)
+        for partial in pool.map(_report_shard, shards, [aggregate_recommendations] * count, [top_k] * count):
+            state.merge(partial)
+    return state.to_report()
+
+
+def generate_sharded_file_report(path: str, workers: Optional[int] = None, batch_size: int = 10_000,
+                                 format: str = "ndjson") -> dict:
+    """Generate ``generate_streaming_report`` output for a reading file across cores.
+    
+    The file is split into byte ranges aligned to line boundaries; each worker
+    streams its range into a bounded ``StreamingReport`` and the partial
+    summaries are merged in file order. ``format`` is one of
+    ``SHARDABLE_FORMATS``: a CSV header is only seen by the first shard.
+    """
+    if format not in SHARDABLE_FORMATS:
+        raise ValueError(f"Cannot shard '{format}' input (expected one of {', '.join(SHARDABLE_FORMATS)})")
+    workers = workers or os.cpu_count() or 1
+    bounds = _shard_bounds(os.path.getsize(path), workers)
+    summary, lines, skipped = StreamingReport(), 0, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_stream_file_shard, path, start, end, batch_size, format) for start, end in bounds]
+        for future in futures:
+            partial, shard_lines, shard_skipped = future.result()
+            summary.merge(partial)
+            lines += shard_lines
+            skipped += shard_skipped
+    report = summary.to_report()
+    report["stream"] = {"lines": lines, "skipped": skipped}
+    return report
+
+
+# Sliding windows for aggregated evaluation (label -> span in seconds)
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+WINDOW_STATS = ("count", "mean", "min", "p50", "p95", "max")
+# Expected readings per second per metric; each window holds span * rate samples
+DEFAULT_WINDOW_RATE = 4.0
+MIN_WINDOW_CAPACITY = 4096  # the former fixed capacity
+
+
+def parse_timestamp(timestamp) -> float:
+    """Convert an ISO 8601 timestamp (or epoch number) to epoch seconds."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return float(timestamp)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class RollingWindow:
+    """Time-bounded ring buffer over one metric's samples.
+    
+    Samples older than ``span`` seconds (relative to the newest sample) or
+    beyond ``capacity`` entries are evicted. A running sum and monotonic
+    min/max deques keep updates O(1) amortized; percentiles are computed from
+    the bounded buffer on demand. When capacity evicts samples that are still
+    inside the span, ``truncated`` is set until they would have expired.
+    """
+    
+    __slots__ = ("span", "capacity", "samples", "total", "seq", "latest", "_maxq", "_minq", "_evicted_epoch")
+    
+    def __init__(self, span: float, capacity: int = 4096):
+        self.span = span
+        self.capacity = capacity
+        self.samples = deque()  # (seq, epoch, value)
+        self.total = 0.0
+        self.seq = 0
+        self.latest = float("-inf")
+        self._maxq = deque()  # (seq, value), values decreasing
+        self._minq = deque()  # (seq, value), values increasing
+        self._evicted_epoch = float("-inf")  # newest sample evicted for capacity
+    
+    @property
+    def truncated(self) -> bool:
+        """Whether capacity evicted samples that are still inside the span."""
+        return self._evicted_epoch > self.latest - self.span
+    
+    def add(self, epoch: float, value: float) -> None:
+        """Append a sample; out-of-order samples are clamped to the newest time."""
+        self.latest = epoch = max(epoch, self.latest)
+        if len(self.samples) >= self.capacity:
+            self._evicted_epoch = self.samples[0][1]
+            self._evict_oldest()
+        
+        self.seq += 1
+        self.samples.append((self.seq, epoch, value))
+        self.total += value
+        while self._maxq and self._maxq[-1][1] <= value:
+            self._maxq.pop()
+        self._maxq.append((self.seq, value))
+        while self._minq and self._minq[-1][1] >= value:
+            self._minq.pop()
+        self._minq.append((self.seq, value))
+        self.expire(epoch)
+    
+    def expire(self, now: float) -> None:
+        """Drop samples that fell out of the window as of ``now``."""
+        cutoff = now - self.span
+        while self.samples and self.samples[0][1] <= cutoff:
+            self._evict_oldest()
+    
+    def _evict_oldest(self) -> None:
+        seq, _, value = self.samples.popleft()
+        self.total -= value
+        if self._maxq and self._maxq[0][0] == seq:
+            self._maxq.popleft()
+        if self._minq and self._minq[0][0] == seq:
+            self._minq.popleft()
+    
+    def stats(self) -> dict:
+        """Return count, mean, min, p50, p95 and max over the current window.
+        
+        ``truncated`` marks statistics that cover less than the full span.
+        """
+        count = len(self.samples)
+        if not count:
+            return {"count": 0, "mean": None, "min": None, "p50": None, "p95": None, "max": None,
+                    "truncated": False}
+        
+        ordered = sorted(sample[2] for sample in self.samples)
+        return {
+            "count": count,
+            "mean": self.total / count,
+            "min": self._minq[0][1],
+            "p50": ordered[min(count - 1, int(0.50 * count))],
+            "p95": ordered[min(count - 1, int(0.95 * count))],
+            "max": self._maxq[0][1],
+            "truncated": self.truncated,
+        }
+
+
+class WindowedAggregator:
+    """Per-metric rolling windows over reading timestamps.
+    
+    Threshold evaluation can then run on a window statistic (e.g. the 5m p95)
+    instead of the latest raw value, so single spikes do not flip layer status.
+    
+    Each window holds ``span * rate`` samples (``rate`` being the expected
+    readings per second per metric), or ``capacity`` samples when given, so
+    longer windows get proportionally larger buffers. Above that rate a
+    window's statistics are flagged ``truncated``. Readings without a
+    parseable timestamp cannot be placed in a window; they are skipped and
+    counted in ``untimed``.
+    """
+    
+    def __init__(self, windows: Optional[Dict[str, float]] = None, capacity: Optional[int] = None,
+                 rate: float = DEFAULT_WINDOW_RATE):
+        self.windows = dict(windows or WINDOWS)
+        self.capacities = {
+            label: capacity or max(MIN_WINDOW_CAPACITY, math.ceil(span * rate))
+            for label, span in self.windows.items()
+        }
+        self.buffers: Dict[str, Dict[str, RollingWindow]] = {}
+        self.untimed = 0
+        self._last_timestamp = None
+        self._last_epoch = math.nan
+    
+    def add(self, reading: TelemetryReading) -> None:
+        """Add a reading to every window of its metric."""
+        if reading.metric_key not in METRICS:
+            return
+        
+        # Dumps usually repeat the same timestamp for a whole scrape
+        if reading.timestamp != self._last_timestamp:
+            self._last_epoch = _parse_epoch(reading.timestamp)
+            self._last_timestamp = reading.timestamp
+        if self._last_epoch != self._last_epoch:
+            self.untimed += 1
+            return
+        
+        buffers = self.buffers.get(reading.metric_key)
+        if buffers is None:
+            buffers = self.buffers[reading.metric_key] = {
+                label: RollingWindow(span, self.capacities[label]) for label, span in self.windows.items()
+            }
+        for window in buffers.values():
+            window.add(self._last_epoch, reading.value)
+    
+    def add_batch(self, batch: ReadingBatch) -> None:
+        """Add a ``ReadingBatch``, skipping readings without a timestamp."""
+        for metric_id, value, epoch in zip(batch.metric_ids, batch.values, batch.epochs):
+            if metric_id < 0:
+                continue
+            if epoch != epoch:
+                self.untimed += 1
+                continue
+            metric_key = METRIC_KEYS[metric_id]
+            buffers = self.buffers.get(metric_key)
+            if buffers is None:
+                buffers = self.buffers[metric_key] = {
+                    label: RollingWindow(span, self.capacities[label]) for label, span in self.windows.items()
+                }
+            for window in buffers.values():
+                window.add(epoch, value)
+    
+    def consume(self, readings: Iterable[TelemetryReading]) -> "WindowedAggregator":
+        """Add every reading from an iterable (or every batch from a ``ReadingBatchReader``)."""
+        if isinstance(readings, ReadingBatchReader):
+            for batch in readings:
+                self.add_batch(batch)
+            return self
+        for reading in readings:
+            self.add(reading)
+        return self
+    
+    def stats(self, metric_key: str, window: str) -> dict:
+        """Window statistics for one metric."""
+        if window not in self.windows:
+            raise ValueError(f"Unknown window '{window}' (expected one of {', '.join(self.windows)})")
+        if metric_key not in self.buffers:
+            return RollingWindow(self.windows[window]).stats()
+        return self.buffers[metric_key][window].stats()
+    
+    def windowed_readings(self, window: str, stat: str = "p95") -> List[TelemetryReading]:
+        """One synthetic reading per metric whose value is the chosen window statistic."""
+        if stat not in WINDOW_STATS or stat == "count":
+            raise ValueError(f"Cannot evaluate thresholds on '{stat}'")
+        
+        readings = []
+        for metric_key in METRIC_KEYS:
+            if metric_key not in self.buffers:
+                continue
+            buffer = self.buffers[metric_key][window]
+            value = self.stats(metric_key, window)[stat]
+            if value is None:
+                continue
+            timestamp = datetime.fromtimestamp(buffer.latest, timezone.utc).isoformat().replace("+00:00", "Z")
+            readings.append(TelemetryReading(metric_key, value, timestamp, evaluate_metric(metric_key, value)))
+        return readings
+
+
+def generate_windowed_report(aggregator: WindowedAggregator, window: str = "5m", stat: str = "p95") -> dict:
+    """Generate a telemetry report evaluated on a window statistic."""
+    report = generate_telemetry_report(aggregator.windowed_readings(window, stat))
+    stats = {METRICS[key].name: aggregator.stats(key, window) for key in METRIC_KEYS if key in aggregator.buffers}
+    report["window"] = {
+        "window": window,
+        "stat": stat,
+        "capacity": aggregator.capacities[window],
+        "truncated": [name for name, entry in stats.items() if entry["truncated"]],
+        "untimed": aggregator.untimed,
+        "stats": stats,
+    }
+    return report
+
+
+def generate_synthetic_columns(count: int, seed: int = 0):
+    """Generate seeded columnar readings spread across all threshold bands."""
+    rng = random.Random(seed)
+    keys, values = [], []
+    for _ in range(count):
+        key = rng.choice(METRIC_KEYS)
+        thresholds = METRICS[key].thresholds
+        low = min(thresholds.values())
+        high = max(thresholds.values())
+        keys.append(key)
+        values.append(rng.uniform(low * 0.5, high * 1.5))
+    return keys, values
+
+
+def benchmark_evaluation(count: int = 200_000, seed: int = 0) -> dict:
+    """Compare per-reading ``evaluate_metric`` with ``evaluate_metrics_batch``."""
+    if np is None:
+        raise RuntimeError("benchmark_evaluation requires NumPy")
+    
+    keys, values = generate_synthetic_columns(count, seed)
+    
+    start = time.perf_counter()
+    scalar = [evaluate_metric(k, v) for k, v in zip(keys, values)]
+    scalar_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    ids = encode_metric_keys(keys)
+    value_array = np.asarray(values, dtype=np.float64)
+    encode_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    codes = evaluate_metrics_batch(ids, value_array)
+    batch_seconds = time.perf_counter() - start
+    
+    if [STATUS_NAMES[c] for c in codes.tolist()] != scalar:
+        raise AssertionError("batch and per-reading evaluation disagree")
+    
+    return {
+        "readings": count,
+        "per_reading_seconds": scalar_seconds,
+        "batch_encode_seconds": encode_seconds,
+        "batch_evaluate_seconds": batch_seconds,
+        "per_reading_rate": count / scalar_seconds,
+        "batch_rate": count / batch_seconds,
+        "speedup": scalar_seconds / batch_seconds,
+        "speedup_with_encoding": scalar_seconds / (batch_seconds + encode_seconds),
+    }
+
+
+def _same_float(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)
+
+
+def verify_ndjson_parser(lines: List, batch_size: int = 1_000) -> dict:
+    """Differentially check ``ReadingBatchReader`` against ``NdjsonReadingReader``.
+    
+    Both parse the same NDJSON ``lines``; any difference in the accepted
+    readings (metric id, value, epoch) or the skipped count is an error.
+    """
+    expected_reader = NdjsonReadingReader(lines)
+    expected = [(METRIC_IDS.get(r.metric_key, -1), r.value, _parse_epoch(r.timestamp)) for r in expected_reader]
+    reader = ReadingBatchReader(lines, "ndjson", batch_size)
+    actual = [(r.metric_id, r.value, r.epoch) for batch in reader for r in batch]
+    
+    if len(actual) != len(expected) or reader.skipped != expected_reader.skipped:
+        raise AssertionError(f"NDJSON readers disagree: {len(actual)} readings/{reader.skipped} skipped, "
+                             f"expected {len(expected)}/{expected_reader.skipped}")
+    for index, (ours, theirs) in enumerate(zip(actual, expected)):
+        if ours[0] != theirs[0] or not all(map(_same_float, ours[1:], theirs[1:])):
+            raise AssertionError(f"NDJSON readers disagree on reading {index}: {ours} != {theirs}")
+    return {"lines": len(lines), "readings": len(actual), "skipped": reader.skipped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map telemetry to b9/p9/j9 layers")
+    parser.add_argument("--ndjson", metavar="PATH",
+                        help="Stream newline-delimited JSON readings from PATH ('-' for stdin)")
+    parser.add_argument("--input-format", default="ndjson", choices=ReadingBatchReader.FORMATS,
+                        help="Format of the --ndjson input: ndjson, csv or line protocol (default: ndjson)")
+    parser.add_argument("--batch-size", type=int, default=10_000,
+                        help="Readings evaluated per batch in streaming mode (default: 10000)")
+    parser.add_argument("--aggregate-recommendations", action="store_true",
+                        help="Aggregate recommendations by (metric, status) instead of one per reading; "
+                             "ignored with --ndjson, whose reports already give one per metric")
+    parser.add_argument("--top-k", type=int, default=50,
+                        help="Recommendations kept in aggregated mode (default: 50; ignored with --ndjson)")
+    parser.add_argument("--workers", type=int,
+                        help="With --ndjson PATH in ndjson or line format, shard the file across N worker processes "
+                             "(not with --window)")
+    parser.add_argument("--window", choices=sorted(WINDOWS),
+                        help="With --ndjson, evaluate thresholds on a sliding-window statistic")
+    parser.add_argument("--window-rate", type=float, default=DEFAULT_WINDOW_RATE,
+                        help="Expected readings/s per metric; sizes each window's sample buffer "
+                             f"(default: {DEFAULT_WINDOW_RATE:g})")
+    parser.add_argument("--stat", default="p95", choices=[s for s in WINDOW_STATS if s != "count"],
+                        help="Window statistic used with --window (default: p95)")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Benchmark batch vs per-reading evaluation over N synthetic readings")
+    parser.add_argument("--verify-parser", metavar="PATH",
+                        help="Check the fast NDJSON parser against the json.loads reader on PATH")
+    parser.add_argument("--self-telemetry", action="store_true",
+                        help="Time the tool's own stages and report them in a separate section")
+    parser.add_argument("--memory-sample", type=int, default=0, metavar="N",
+                        help="With --self-telemetry, trace allocations on every Nth call of each stage")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="With --self-telemetry, write a cProfile per stage and collapsed stacks to DIR")
+    args = parser.parse_args()
+    if args.self_telemetry and self_telemetry is None:
+        parser.error("--self-telemetry needs self-telemetry.py next to this script")
+    if args.workers is not None:
+        if not args.ndjson or args.ndjson == "-":
+            parser.error("--workers needs --ndjson PATH (a file, not stdin)")
+        if args.window:
+            parser.error("--workers cannot be combined with --window")
+        if args.input_format not in SHARDABLE_FORMATS:
+            parser.error(f"--workers supports --input-format {' or '.join(SHARDABLE_FORMATS)}, "
+                         f"not {args.input_format}")
+
+    if args.self_telemetry:
+        self_telemetry.enable(memory_sample_every=args.memory_sample, profile=bool(args.profile_dir),
+                              flame_interval=0.001 if args.profile_dir else None)
+    try:
+        if args.benchmark:
+            print(json.dumps(benchmark_evaluation(args.benchmark), indent=2))
+            return
+
+        if args.verify_parser:
+            with open(args.verify_parser, "rb") as f:
+                print(json.dumps(verify_ndjson_parser(f.readlines()), indent=2))
+            return
+
+        if args.workers:
+            report = generate_sharded_file_report(args.ndjson, args.workers, args.batch_size, args.input_format)
+            print(format_report_markdown(report))
+            print("\n---\n")
+            print("JSON Report:")
+            print(json.dumps(report, indent=2))
+            return
+
+        if args.ndjson:
+            stream = sys.stdin.buffer if args.ndjson == "-" else open(args.ndjson, "rb")
+            try:
+                if args.window:
+                    reader = ReadingBatchReader(stream, args.input_format, args.batch_size)
+                    report = generate_windowed_report(WindowedAggregator(rate=args.window_rate).consume(reader), args.window, args.stat)
+                else:
+                    report = generate_streaming_report(stream, args.batch_size, args.input_format)
+            finally:
+                if stream is not sys.stdin.buffer:
+                    stream.close()
+            print(format_report_markdown(report))
+            print("\n---\n")
+            print("JSON Report:")
+            print(json.dumps(report, indent=2))
+            return
+
+        # Example usage with sample readings
+        sample_readings = [
+            TelemetryReading("connection_latency", 45, "2026-01-29T10:00:00Z", "normal"),
+            TelemetryReading("edge_throughput", 25, "2026-01-29T10:00:00Z", "normal"),
+            TelemetryReading("membrane_utilization", 85, "2026-01-29T10:00:00Z", "warning"),
+            TelemetryReading("thread_pool_depth", 35, "2026-01-29T10:00:00Z", "normal"),
+            TelemetryReading("gradient_entropy", 3.2, "2026-01-29T10:00:00Z", "normal"),
+            TelemetryReading("topology_coverage", 65, "2026-01-29T10:00:00Z", "warning"),
+            TelemetryReading("system_coherence", 0.82, "2026-01-29T10:00:00Z", "normal"),
+        ]
+
+        report = generate_telemetry_report(sample_readings, args.aggregate_recommendations, args.top_k)
+        markdown = format_report_markdown(report)
+
+        print(markdown)
+        print("\n---\n")
+        print("JSON Report:")
+        print(json.dumps(report, indent=2))
+    finally:
+        telemetry = self_telemetry.disable() if self_telemetry is not None else None
+        if telemetry is not None and args.profile_dir:
+            for path in telemetry.dump_profiles(args.profile_dir):
+                print(f"Wrote {path}", file=sys.stderr)
 
 
 if __name__ == "__main__":
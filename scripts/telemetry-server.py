@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Telemetry Ingestion Server for Unicorn Dynamics
+
+Persistent asyncio server that accepts readings over TCP and UDP in a compact
+line protocol::
+
+    metric_key value epoch
+
+Readings land in a bounded ingest buffer. TCP producers are paced by
+backpressure when it is full, UDP datagrams are dropped and counted.
+Buffered readings are evaluated in batches on a timer or when a size
+threshold is reached, and fed to the incremental engine for status
+transitions. A bundled load generator measures sustained throughput.
+
+TCP clients can also send ``?stats``, ``?report`` or ``?forecast`` lines to
+query state.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import script_loader  # noqa: F401  (makes sibling scripts importable)
+from telemetry_engine import IncrementalEngine
+from telemetry_export import SnapshotCache, start_http
+from telemetry_forecast import HoltForecaster
+from telemetry_mapper import (
+    LOWER_IS_WORSE,
+    METRIC_IDS,
+    METRIC_KEYS,
+    STATUS_NAMES,
+    TelemetryReading,
+    evaluate_metrics_batch,
+)
+
+# Per-metric direction for picking each batch's worst value
+_WORST_IS_MIN = np.array([key in LOWER_IS_WORSE for key in METRIC_KEYS])
+
+
+def parse_lines(lines: List[bytes]) -> Tuple[List[int], List[float], List[float], int]:
+    """Parse ``metric_key value epoch`` lines into columns; returns the error count too.
+
+    NaN or infinite values and epochs count as errors: one would stick in the
+    forecaster's state for that metric.
+    """
+    ids, values, epochs = [], [], []
+    errors = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            key, value, epoch = line.split()
+            metric_id = METRIC_IDS[key.decode()]
+            value, epoch = float(value), float(epoch)
+        except (ValueError, KeyError, UnicodeDecodeError):
+            errors += 1
+            continue
+        if not (math.isfinite(value) and math.isfinite(epoch)):
+            errors += 1
+            continue
+        ids.append(metric_id)
+        values.append(value)
+        epochs.append(epoch)
+    return ids, values, epochs, errors
+
+
+class IngestBuffer:
+    """Bounded columnar buffer between producers and the batch evaluator."""
+
+    def __init__(self, capacity: int, batch_size: int):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.ids: List[int] = []
+        self.values: List[float] = []
+        self.epochs: List[float] = []
+        self.ready = asyncio.Event()
+        self._space = asyncio.Condition()
+        self.backpressure_waits = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _extend(self, ids, values, epochs) -> None:
+        self.ids.extend(ids)
+        self.values.extend(values)
+        self.epochs.extend(epochs)
+        if len(self.ids) >= self.batch_size:
+            self.ready.set()
+
+    async def put(self, ids, values, epochs) -> None:
+        """Add readings, waiting for the evaluator to drain space if full."""
+        async with self._space:
+            if len(self.ids) + len(ids) > self.capacity and self.ids:
+                self.backpressure_waits += 1
+                self.ready.set()
+                await self._space.wait_for(lambda: len(self.ids) + len(ids) <= self.capacity or not self.ids)
+            self._extend(ids, values, epochs)
+
+    def offer(self, ids, values, epochs) -> bool:
+        """Add readings without waiting; drop and count them if full."""
+        if len(self.ids) + len(ids) > self.capacity:
+            self.dropped += len(ids)
+            return False
+        self._extend(ids, values, epochs)
+        return True
+
+    async def drain(self):
+        """Take every buffered reading as NumPy columns."""
+        async with self._space:
+            ids = np.array(self.ids, dtype=np.int32)
+            values = np.array(self.values, dtype=np.float64)
+            epochs = np.array(self.epochs, dtype=np.float64)
+            self.ids, self.values, self.epochs = [], [], []
+            self.ready.clear()
+            self._space.notify_all()
+        return ids, values, epochs
+
+
+class TelemetryServer:
+    """Line-protocol ingestion with batched evaluation."""
+
+    def __init__(self, capacity: int = 200_000, batch_size: int = 20_000,
+                 flush_interval: float = 0.25, hysteresis: float = 0.05, quiet: bool = False):
+        self.buffer = IngestBuffer(capacity, batch_size)
+        self.flush_interval = flush_interval
+        self.engine = IncrementalEngine(hysteresis)
+        self.forecaster = HoltForecaster()
+        self.quiet = quiet
+        self.counters = {
+            "received": 0, "parse_errors": 0, "evaluated": 0, "batches": 0,
+            "normal": 0, "warning": 0, "critical": 0,
+        }
+        self.started = time.monotonic()
+
+    # -- evaluation -----------------------------------------------------------
+
+    async def evaluate_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.buffer.ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if len(self.buffer):
+                self.evaluate_batch(*await self.buffer.drain())
+
+    def evaluate_batch(self, ids: np.ndarray, values: np.ndarray, epochs: np.ndarray) -> None:
+        """Evaluate one batch and feed each metric's worst value to the engine."""
+        codes = evaluate_metrics_batch(ids, values)
+        counts = np.bincount(codes[codes >= 0], minlength=3)
+        for code in range(3):
+            self.counters[STATUS_NAMES[code]] += int(counts[code])
+        self.counters["evaluated"] += len(ids)
+        self.counters["batches"] += 1
+
+        # Escalations inside a batch are never missed; recovery needs the whole batch healthy.
+        # The forecaster sees one batch-mean point per metric to stay O(metrics) per batch.
+        worst_readings = []
+        for metric_id in np.unique(ids).tolist():
+            mask = ids == metric_id
+            metric_values = values[mask]
+            metric_epochs = epochs[mask]
+            index = int(metric_values.argmin() if _WORST_IS_MIN[metric_id] else metric_values.argmax())
+            worst_readings.append(TelemetryReading(
+                METRIC_KEYS[metric_id], float(metric_values[index]), str(metric_epochs[index]), "",
+            ))
+            self.forecaster.update(metric_id, float(metric_values.mean()), float(metric_epochs.max()))
+        for event in self.engine.ingest(worst_readings):
+            if not self.quiet:
+                print(json.dumps(asdict(event)), flush=True)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            **self.counters,
+            "dropped": self.buffer.dropped,
+            "backpressure_waits": self.buffer.backpressure_waits,
+            "queue_depth": len(self.buffer),
+            "layer_status": dict(self.engine.layer_status),
+            "generation": self.engine.generation,
+            "uptime_seconds": elapsed,
+            "ingest_rate": self.counters["received"] / elapsed if elapsed else 0.0,
+        }
+
+    # -- transports -----------------------------------------------------------
+
+    def _ingest_lines(self, lines: List[bytes]):
+        ids, values, epochs, errors = parse_lines(lines)
+        self.counters["received"] += len(ids)
+        self.counters["parse_errors"] += errors
+        return ids, values, epochs
+
+    async def handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        remainder = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                lines = (remainder + chunk).split(b"\n")
+                remainder = lines.pop()
+
+                queries = [line for line in lines if line.startswith(b"?")]
+                if queries:
+                    lines = [line for line in lines if not line.startswith(b"?")]
+                ids, values, epochs = self._ingest_lines(lines)
+                if ids:
+                    await self.buffer.put(ids, values, epochs)
+                for query in queries:
+                    await self._answer(query.strip(), writer)
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, query: bytes, writer: asyncio.StreamWriter) -> None:
+        if query == b"?report":
+            # Make sure everything received so far is reflected
+            if len(self.buffer):
+                self.evaluate_batch(*await self.buffer.drain())
+            payload = self.engine.snapshot()["json"]
+        elif query == b"?forecast":
+            payload = json.dumps(self.forecaster.predictions())
+        else:
+            if query == b"?flush" and len(self.buffer):
+                self.evaluate_batch(*await self.buffer.drain())
+            payload = json.dumps(self.stats())
+        writer.write(payload.encode() + b"\n")
+        await writer.drain()
+
+    class _UdpProtocol(asyncio.DatagramProtocol):
+        def __init__(self, server: "TelemetryServer"):
+            self.server = server
+
+        def datagram_received(self, data, addr):
+            ids, values, epochs = self.server._ingest_lines(data.split(b"\n"))
+            if ids:
+                self.server.buffer.offer(ids, values, epochs)
+
+    async def serve(self, host: str, port: int, udp_port: Optional[int], http_port: Optional[int] = None) -> None:
+        tcp = await asyncio.start_server(self.handle_tcp, host, port, limit=1 << 20)
+        if udp_port is not None:
+            await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: self._UdpProtocol(self), local_addr=(host, udp_port)
+            )
+        if http_port is not None:
+            await start_http(SnapshotCache(self.engine), host, http_port)
+            print(f"Export endpoint on http://{host}:{http_port}", file=sys.stderr)
+        print(f"Listening on tcp://{host}:{port}" + (f" udp://{host}:{udp_port}" if udp_port is not None else ""),
+              file=sys.stderr)
+        evaluator = asyncio.create_task(self.evaluate_loop())
+        try:
+            async with tcp:
+                await tcp.serve_forever()
+        finally:
+            evaluator.cancel()
+
+
+# -- load generator -------------------------------------------------------------
+
+def synthetic_lines(count: int, seed: int = 0) -> List[bytes]:
+    """Pre-encoded line-protocol readings cycling through every metric."""
+    import random
+    rng = random.Random(seed)
+    now = time.time()
+    lines = []
+    for i in range(count):
+        key = METRIC_KEYS[i % len(METRIC_KEYS)]
+        lines.append(f"{key} {rng.uniform(0, 120):.3f} {now + i * 1e-3:.3f}\n".encode())
+    return lines
+
+
+async def _produce(host: str, port: int, payload: bytes, repeats: int) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(repeats):
+        writer.write(payload)
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _query(host: str, port: int, query: bytes) -> dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(query + b"\n")
+    await writer.drain()
+    line = await reader.readline()
+    writer.close()
+    return json.loads(line)
+
+
+async def run_load(host: str, port: int, producers: int, readings: int, chunk: int = 5_000) -> dict:
+    """Send ``readings`` from ``producers`` concurrent TCP connections and measure."""
+    payload = b"".join(synthetic_lines(chunk))
+    repeats = max(1, readings // (producers * chunk))
+    before = await _query(host, port, b"?flush")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_produce(host, port, payload, repeats) for _ in range(producers)))
+    sent_seconds = time.perf_counter() - start
+    sent = producers * repeats * chunk
+
+    # Producers may finish before the server has read their sockets dry
+    deadline = time.perf_counter() + 30
+    while True:
+        after = await _query(host, port, b"?flush")
+        if after["received"] - before["received"] >= sent or time.perf_counter() > deadline:
+            break
+        await asyncio.sleep(0.01)
+    total_seconds = time.perf_counter() - start
+
+    evaluated = after["evaluated"] - before["evaluated"]
+    return {
+        "producers": producers,
+        "sent": sent,
+        "evaluated": evaluated,
+        "send_seconds": sent_seconds,
+        "total_seconds": total_seconds,
+        "readings_per_second": evaluated / total_seconds,
+        "dropped": after["dropped"] - before["dropped"],
+        "backpressure_waits": after["backpressure_waits"] - before["backpressure_waits"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line-protocol telemetry ingestion server")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run the ingestion server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8094)
+    serve.add_argument("--udp-port", type=int, help="Also accept UDP datagrams on this port")
+    serve.add_argument("--http-port", type=int, help="Serve cached status snapshots over HTTP on this port")
+    serve.add_argument("--capacity", type=int, default=200_000, help="Ingest buffer size in readings")
+    serve.add_argument("--batch-size", type=int, default=20_000, help="Evaluate once this many readings queue")
+    serve.add_argument("--flush-interval", type=float, default=0.25, help="Evaluate at least this often (s)")
+    serve.add_argument("--hysteresis", type=float, default=0.05)
+    serve.add_argument("--quiet", action="store_true", help="Do not print transition events")
+
+    load = sub.add_parser("loadgen", help="Generate load against a running server")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=8094)
+    load.add_argument("--producers", type=int, default=8)
+    load.add_argument("--readings", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = TelemetryServer(args.capacity, args.batch_size, args.flush_interval, args.hysteresis, args.quiet)
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.udp_port, args.http_port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(json.dumps(asyncio.run(run_load(args.host, args.port, args.producers, args.readings)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
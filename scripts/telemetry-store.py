@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Telemetry History Store for Unicorn Dynamics
+
+Append-only, memory-mapped columnar storage for long telemetry histories.
+Readings are written as immutable segments of fixed-width columns (epoch
+timestamp, float64 value, metric id) and read back zero-copy through
+``mmap``/NumPy. Every raw segment is accompanied by 1-minute and 1-hour
+rollup segments so long-range reports never touch raw samples.
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+import script_loader  # noqa: F401  (makes telemetry_mapper importable)
+from telemetry_mapper import (
+    LOWER_IS_WORSE,
+    METRIC_IDS,
+    METRIC_KEYS,
+    METRICS,
+    NdjsonReadingReader,
+    TelemetryReading,
+    evaluate_metric,
+    format_report_markdown,
+    generate_telemetry_report,
+    iter_reading_batches,
+    parse_timestamp,
+)
+
+# Segment header: magic, version, kind, resolution (s), row count, t_min, t_max
+HEADER = struct.Struct("<4sHHIQdd")
+HEADER_SIZE = 64
+MAGIC = b"UDTS"
+VERSION = 1
+
+KIND_RAW = 0
+KIND_ROLLUP = 1
+
+# Rollup resolutions (label -> bucket width in seconds)
+ROLLUPS = {"1m": 60, "1h": 3600}
+
+# Column layouts; 8-byte columns first so every column stays aligned
+RAW_COLUMNS = [("timestamp", "<f8"), ("value", "<f8"), ("metric_id", "<i2")]
+ROLLUP_COLUMNS = [
+    ("bucket", "<f8"), ("min", "<f8"), ("max", "<f8"),
+    ("sum", "<f8"), ("count", "<i8"), ("metric_id", "<i2"),
+]
+
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class SegmentInfo:
+    file: str
+    kind: int
+    resolution: int
+    count: int
+    t_min: float
+    t_max: float
+
+
+def write_segment(path: str, kind: int, resolution: int, columns: Dict[str, np.ndarray]) -> SegmentInfo:
+    """Write one immutable segment and return its index entry."""
+    layout = RAW_COLUMNS if kind == KIND_RAW else ROLLUP_COLUMNS
+    time_column = columns["timestamp" if kind == KIND_RAW else "bucket"]
+    count = len(time_column)
+    t_min = float(time_column[0]) if count else 0.0
+    t_max = float(time_column[-1]) if count else 0.0
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind, resolution, count, t_min, t_max).ljust(HEADER_SIZE, b"\0"))
+        for name, dtype in layout:
+            f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+    os.replace(tmp_path, path)
+    return SegmentInfo(os.path.basename(path), kind, resolution, count, t_min, t_max)
+
+
+class Segment:
+    """Zero-copy, read-only view over a segment file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.kind, self.resolution, self.count, self.t_min, self.t_max = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} telemetry segment")
+
+        self.columns: Dict[str, np.ndarray] = {}
+        offset = HEADER_SIZE
+        for name, dtype in RAW_COLUMNS if self.kind == KIND_RAW else ROLLUP_COLUMNS:
+            column = np.frombuffer(self._mmap, dtype=dtype, count=self.count, offset=offset)
+            self.columns[name] = column
+            offset += column.nbytes
+
+    def time_slice(self, start: float, end: float) -> slice:
+        """Row range with ``start <= time < end`` (segments are time-sorted)."""
+        times = self.columns["timestamp" if self.kind == KIND_RAW else "bucket"]
+        return slice(int(np.searchsorted(times, start, "left")), int(np.searchsorted(times, end, "left")))
+
+    def close(self) -> None:
+        self.columns.clear()
+        self._mmap.close()
+
+
+def compute_rollup(epochs: np.ndarray, values: np.ndarray, metric_ids: np.ndarray,
+                   resolution: int) -> Dict[str, np.ndarray]:
+    """Aggregate raw columns into per-(bucket, metric) min/max/sum/count rows."""
+    buckets = np.floor(epochs / resolution) * resolution
+    keys = buckets.astype(np.int64) * len(METRIC_KEYS) + metric_ids
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+    mins = np.full(len(unique_keys), np.inf)
+    maxs = np.full(len(unique_keys), -np.inf)
+    np.minimum.at(mins, inverse, values)
+    np.maximum.at(maxs, inverse, values)
+    return {
+        "bucket": (unique_keys // len(METRIC_KEYS)).astype(np.float64),
+        "metric_id": (unique_keys % len(METRIC_KEYS)).astype(np.int16),
+        "min": mins,
+        "max": maxs,
+        "sum": np.bincount(inverse, weights=values, minlength=len(unique_keys)),
+        "count": np.bincount(inverse, minlength=len(unique_keys)).astype(np.int64),
+    }
+
+
+class TelemetryStore:
+    """Append-only segment store with a time-range index per segment.
+
+    Appends are buffered in memory and sealed into a raw segment (plus its
+    rollups) every ``segment_rows`` readings or on ``flush()``.
+    """
+
+    def __init__(self, root: str, segment_rows: int = 1_000_000):
+        self.root = root
+        self.segment_rows = segment_rows
+        os.makedirs(root, exist_ok=True)
+        self.segments: List[SegmentInfo] = self._load_manifest()
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self._pending_rows = 0
+        self.untimed = 0  # readings dropped for lack of a finite timestamp
+        self.nonfinite = 0  # readings dropped for a NaN or infinite value
+        self._open: Dict[str, Segment] = {}
+
+    # -- writing --------------------------------------------------------------
+
+    def append(self, metric_ids, epochs, values) -> None:
+        """Append columnar readings.
+
+        Unknown metric ids are dropped. Rows whose epoch or value is NaN or
+        infinite would break the segment time index and the rollup buckets, so
+        they are dropped too and counted in ``untimed`` and ``nonfinite``.
+        """
+        metric_ids = np.asarray(metric_ids, dtype=np.int16)
+        epochs = np.asarray(epochs, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        known = (metric_ids >= 0) & (metric_ids < len(METRIC_KEYS))
+        timed = np.isfinite(epochs)
+        finite = np.isfinite(values)
+        self.untimed += int(np.count_nonzero(~timed))
+        self.nonfinite += int(np.count_nonzero(timed & ~finite))
+        keep = known & timed & finite
+        if not keep.all():
+            metric_ids, epochs, values = metric_ids[keep], epochs[keep], values[keep]
+
+        self._pending.append({"metric_id": metric_ids, "timestamp": epochs, "value": values})
+        self._pending_rows += len(metric_ids)
+        if self._pending_rows >= self.segment_rows:
+            self.flush()
+
+    def append_readings(self, readings: Iterable[TelemetryReading]) -> None:
+        """Append ``TelemetryReading`` objects in batches.
+
+        Readings without a parseable timestamp cannot be placed in a segment;
+        ``append`` drops them and counts them in ``untimed``.
+        """
+        for batch in iter_reading_batches(readings, 100_000):
+            metric_ids, epochs, values = [], [], []
+            for reading in batch:
+                try:
+                    epoch = parse_timestamp(reading.timestamp)
+                except ValueError:
+                    epoch = math.nan
+                metric_ids.append(METRIC_IDS.get(reading.metric_key, -1))
+                epochs.append(epoch)
+                values.append(reading.value)
+            self.append(metric_ids, epochs, values)
+
+    def flush(self) -> Optional[SegmentInfo]:
+        """Seal buffered readings into a raw segment and its rollups."""
+        if not self._pending_rows:
+            return None
+
+        columns = {name: np.concatenate([chunk[name] for chunk in self._pending]) for name in self._pending[0]}
+        self._pending, self._pending_rows = [], 0
+        order = np.argsort(columns["timestamp"], kind="stable")
+        columns = {name: column[order] for name, column in columns.items()}
+
+        sequence = len([s for s in self.segments if s.kind == KIND_RAW])
+        stem = f"{sequence:08d}-{int(columns['timestamp'][0])}"
+        raw = write_segment(os.path.join(self.root, f"raw-{stem}.seg"), KIND_RAW, 0, columns)
+        new_segments = [raw]
+        for label, resolution in ROLLUPS.items():
+            rollup = compute_rollup(columns["timestamp"], columns["value"], columns["metric_id"], resolution)
+            path = os.path.join(self.root, f"rollup-{label}-{stem}.seg")
+            new_segments.append(write_segment(path, KIND_ROLLUP, resolution, rollup))
+
+        self.segments.extend(new_segments)
+        self._save_manifest()
+        return raw
+
+    # -- reading --------------------------------------------------------------
+
+    def _segment(self, info: SegmentInfo) -> Segment:
+        segment = self._open.get(info.file)
+        if segment is None:
+            segment = self._open[info.file] = Segment(os.path.join(self.root, info.file))
+        return segment
+
+    def _overlapping(self, kind: int, resolution: int, start: float, end: float) -> List[SegmentInfo]:
+        return [
+            s for s in self.segments
+            if s.kind == kind and s.resolution == resolution and s.count
+            and s.t_max >= start and s.t_min < end
+        ]
+
+    def read_raw(self, start: float, end: float, metric_key: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Raw columns with ``start <= timestamp < end``, optionally for one metric."""
+        parts = []
+        for info in self._overlapping(KIND_RAW, 0, start, end):
+            segment = self._segment(info)
+            rows = segment.time_slice(start, end)
+            part = {name: column[rows] for name, column in segment.columns.items()}
+            if metric_key is not None:
+                mask = part["metric_id"] == METRIC_IDS[metric_key]
+                part = {name: column[mask] for name, column in part.items()}
+            parts.append(part)
+        return _concat(parts, RAW_COLUMNS)
+
+    def read_rollup(self, start: float, end: float, resolution: str = "1m") -> Dict[str, np.ndarray]:
+        """Rollup rows whose bucket starts in ``[start, end)``, merged across segments."""
+        width = ROLLUPS[resolution]
+        parts = []
+        for info in self._overlapping(KIND_ROLLUP, width, start, end):
+            segment = self._segment(info)
+            rows = segment.time_slice(start, end)
+            parts.append({name: column[rows] for name, column in segment.columns.items()})
+        merged = _concat(parts, ROLLUP_COLUMNS)
+        if len(parts) <= 1:
+            return merged
+
+        # The same bucket can straddle two raw segments; combine those rows
+        keys = merged["bucket"].astype(np.int64) * len(METRIC_KEYS) + merged["metric_id"]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        mins = np.full(len(unique_keys), np.inf)
+        maxs = np.full(len(unique_keys), -np.inf)
+        np.minimum.at(mins, inverse, merged["min"])
+        np.maximum.at(maxs, inverse, merged["max"])
+        return {
+            "bucket": (unique_keys // len(METRIC_KEYS)).astype(np.float64),
+            "metric_id": (unique_keys % len(METRIC_KEYS)).astype(np.int16),
+            "min": mins,
+            "max": maxs,
+            "sum": np.bincount(inverse, weights=merged["sum"], minlength=len(unique_keys)),
+            "count": np.bincount(inverse, weights=merged["count"], minlength=len(unique_keys)).astype(np.int64),
+        }
+
+    def summarize(self, start: float, end: float, resolution: Optional[str] = None) -> Dict[str, dict]:
+        """Per-metric count/min/max/mean over a range, computed from rollups only.
+
+        Ranges longer than a day use 1-hour rollups, shorter ones 1-minute.
+        """
+        if resolution is None:
+            resolution = "1h" if end - start > 86_400 else "1m"
+        rows = self.read_rollup(start, end, resolution)
+
+        summary = {}
+        for metric_id, metric_key in enumerate(METRIC_KEYS):
+            mask = rows["metric_id"] == metric_id
+            if not mask.any():
+                continue
+            count = int(rows["count"][mask].sum())
+            summary[metric_key] = {
+                "count": count,
+                "min": float(rows["min"][mask].min()),
+                "max": float(rows["max"][mask].max()),
+                "mean": float(rows["sum"][mask].sum() / count),
+                "resolution": resolution,
+            }
+        return summary
+
+    def report(self, start: float, end: float, stat: str = "worst",
+               resolution: Optional[str] = None) -> dict:
+        """Generate a telemetry report for a time range from rollups.
+
+        ``stat`` selects the value evaluated per metric: ``min``, ``max``,
+        ``mean`` or ``worst`` (max, or min for lower-is-worse metrics).
+        """
+        summary = self.summarize(start, end, resolution)
+        readings = []
+        for metric_key, stats in summary.items():
+            if stat == "worst":
+                value = stats["min"] if metric_key in LOWER_IS_WORSE else stats["max"]
+            else:
+                value = stats[stat]
+            readings.append(TelemetryReading(metric_key, value, str(end), evaluate_metric(metric_key, value)))
+
+        report = generate_telemetry_report(readings)
+        report["range"] = {"start": start, "end": end, "stat": stat, "metrics": {
+            METRICS[key].name: stats for key, stats in summary.items()
+        }}
+        return report
+
+    def close(self) -> None:
+        self.flush()
+        for segment in self._open.values():
+            segment.close()
+        self._open.clear()
+
+    # -- manifest -------------------------------------------------------------
+
+    def _load_manifest(self) -> List[SegmentInfo]:
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [SegmentInfo(**entry) for entry in json.load(f)["segments"]]
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.root, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "segments": [vars(s) for s in self.segments]}, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def _concat(parts: List[Dict[str, np.ndarray]], layout) -> Dict[str, np.ndarray]:
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in layout}
+    return {name: np.concatenate([part[name] for part in parts]) for name, _ in layout}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar telemetry history store")
+    parser.add_argument("store", help="Store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Append NDJSON readings to the store")
+    ingest.add_argument("ndjson", help="NDJSON readings file ('-' for stdin)")
+
+    report = sub.add_parser("report", help="Report a time range from rollups")
+    report.add_argument("--start", required=True, help="Range start (ISO 8601 or epoch)")
+    report.add_argument("--end", required=True, help="Range end (ISO 8601 or epoch)")
+    report.add_argument("--stat", default="worst", choices=["worst", "min", "max", "mean"])
+    report.add_argument("--resolution", choices=sorted(ROLLUPS))
+    report.add_argument("--json", action="store_true", help="Print JSON instead of Markdown")
+
+    sub.add_parser("info", help="List segments and their time ranges")
+    args = parser.parse_args()
+
+    store = TelemetryStore(args.store)
+    if args.command == "ingest":
+        stream = sys.stdin if args.ndjson == "-" else open(args.ndjson, encoding="utf-8")
+        try:
+            reader = NdjsonReadingReader(stream)
+            store.append_readings(reader)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        store.close()
+        print(f"Ingested {reader.lines - reader.skipped - store.untimed - store.nonfinite} readings "
+              f"({reader.skipped} skipped, {store.untimed} without a timestamp, "
+              f"{store.nonfinite} with a non-finite value)")
+    elif args.command == "report":
+        result = store.report(parse_timestamp(args.start), parse_timestamp(args.end), args.stat, args.resolution)
+        print(json.dumps(result, indent=2) if args.json else format_report_markdown(result))
+    else:
+        for s in store.segments:
+            kind = "raw" if s.kind == KIND_RAW else f"rollup/{s.resolution}s"
+            print(f"{s.file}\t{kind}\t{s.count} rows\t{s.t_min:.0f}..{s.t_max:.0f}")
+
+
+if __name__ == "__main__":
+    main()
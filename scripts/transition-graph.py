@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+T-System Transition Graph for Unicorn Dynamics
+
+Models the nine transformations as a directed graph whose edges are the
+steps of the transformation sequences documented in
+``references/t-system.md`` (Discovery, Refinement and Full Integration).
+All-pairs transition costs are computed once with Floyd-Warshall.
+
+Each guide is an edge from the T-code it enters on to the one it exits on,
+weighted by the cost of walking its own T-codes. ``order_guides`` orders a
+set of guides so the T-code sequence follows the documented transitions at
+minimal total cost (Held-Karp for small sets, nearest-neighbour beyond),
+and is memoized so it can run on every agenda.
+"""
+
+import argparse
+import itertools
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SOURCE = os.path.join(SCRIPTS_DIR, os.pardir, "references", "t-system.md")
+
+T_CODES = [f"T{number}" for number in range(1, 10)]
+
+STEP_COST = 1
+EXACT_LIMIT = 8  # largest guide set ordered exactly
+
+
+def load_sequences(path: str = DEFAULT_SOURCE) -> Dict[str, List[str]]:
+    """Parse the "Transformation Sequences" section into named T-code lists.
+
+    A trailing ``(repeat)`` closes the sequence back onto its first code.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    section = text.split("### Transformation Sequences", 1)
+    if len(section) < 2:
+        raise ValueError(f"{path}: missing 'Transformation Sequences' section")
+
+    sequences, name = {}, None
+    for line in section[1].split("\n---", 1)[0].splitlines():
+        heading = re.match(r"\*\*(.+?)(?: \(.*\))?:\*\*", line.strip())
+        if heading:
+            name = heading.group(1)
+        elif "→" in line and name:
+            codes = re.findall(r"T[1-9]", line)
+            if "(repeat)" in line:
+                codes.append(codes[0])
+            sequences[name] = codes
+    if not sequences:
+        raise ValueError(f"{path}: no transformation sequences found")
+    return sequences
+
+
+class TransitionGraph:
+    """All-pairs transition costs between T-codes (indexes 0-8)."""
+
+    def __init__(self, sequences: Dict[str, List[str]]):
+        self.sequences = sequences
+        infinity = float("inf")
+        cost = [[0 if i == j else infinity for j in range(9)] for i in range(9)]
+        for codes in sequences.values():
+            for source, target in zip(codes, codes[1:]):
+                i, j = int(source[1:]) - 1, int(target[1:]) - 1
+                cost[i][j] = min(cost[i][j], STEP_COST)
+        for k in range(9):
+            for i in range(9):
+                for j in range(9):
+                    if cost[i][k] + cost[k][j] < cost[i][j]:
+                        cost[i][j] = cost[i][k] + cost[k][j]
+        self.cost = cost
+
+    def path_cost(self, codes: List[int]) -> float:
+        return sum(self.cost[i][j] for i, j in zip(codes, codes[1:]))
+
+    @lru_cache(maxsize=None)
+    def guide_edge(self, t_mask: int) -> Tuple[Optional[int], Optional[int], float]:
+        """(entry code, exit code, internal cost) for a guide's T-code mask.
+
+        The guide's codes are walked in the cheapest order (earliest
+        permutation on ties). A guide without T-codes is a free edge.
+        """
+        codes = [bit for bit in range(9) if t_mask >> bit & 1]
+        if not codes:
+            return None, None, 0
+        best = min(itertools.permutations(codes), key=self.path_cost)
+        return best[0], best[-1], self.path_cost(list(best))
+
+    def link_cost(self, exit_code: Optional[int], entry_code: Optional[int]) -> float:
+        if exit_code is None or entry_code is None:
+            return 0
+        return self.cost[exit_code][entry_code]
+
+    @lru_cache(maxsize=4096)
+    def order(self, masks: Tuple[int, ...], start: Optional[int] = None) -> Tuple[Tuple[int, ...], float]:
+        """Order positions of ``masks`` for minimal transition cost from ``start``.
+
+        Returns (positions, cost). Ties keep the original order.
+        """
+        count = len(masks)
+        edges = [self.guide_edge(mask) for mask in masks]
+        internal = sum(edge[2] for edge in edges)
+        if count <= 1:
+            return tuple(range(count)), internal + (self.link_cost(start, edges[0][0]) if count else 0)
+
+        if count > EXACT_LIMIT:
+            remaining, current, path, total = list(range(count)), start, [], internal
+            while remaining:
+                step = min(remaining, key=lambda i: self.link_cost(current, edges[i][0]))
+                total += self.link_cost(current, edges[step][0])
+                remaining.remove(step)
+                path.append(step)
+                current = edges[step][1] if edges[step][1] is not None else current
+            return tuple(path), total
+
+        # Held-Karp over (visited set, last guide) -> (cost, path)
+        best: Dict[Tuple[int, int], Tuple[float, Tuple[int, ...]]] = {
+            (1 << i, i): (self.link_cost(start, edges[i][0]), (i,)) for i in range(count)
+        }
+        for size in range(2, count + 1):
+            for subset in itertools.combinations(range(count), size):
+                visited = sum(1 << i for i in subset)
+                for last in subset:
+                    previous = visited ^ (1 << last)
+                    best[(visited, last)] = min(
+                        (best[(previous, before)][0] + self.link_cost(edges[before][1], edges[last][0]),
+                         best[(previous, before)][1] + (last,))
+                        for before in subset if before != last
+                    )
+        full = (1 << count) - 1
+        cost, path = min(best[(full, last)] for last in range(count))
+        return path, cost + internal
+
+
+GRAPH = TransitionGraph(load_sequences())
+
+
+def order_guides(guides: List[Tuple[str, int]], start: Optional[int] = None,
+                 graph: TransitionGraph = GRAPH) -> List[str]:
+    """Order ``(key, t_mask)`` pairs along the transition graph from ``start`` (a T-code index)."""
+    positions, _ = graph.order(tuple(mask for _, mask in guides), start)
+    return [guides[position][0] for position in positions]
+
+
+def exit_code(t_mask: int, graph: TransitionGraph = GRAPH) -> Optional[int]:
+    """The T-code index a guide with ``t_mask`` leaves the sequence on."""
+    return graph.guide_edge(t_mask)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the T-system transition graph")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Reference with the transformation sequences")
+    args = parser.parse_args()
+
+    graph = TransitionGraph(load_sequences(args.source))
+    for name, codes in graph.sequences.items():
+        print(f"{name}: {' → '.join(codes)}")
+    print("")
+    print("Transition costs (row = from, column = to):")
+    print("     " + " ".join(f"{code:>3}" for code in T_CODES))
+    for code, row in zip(T_CODES, graph.cost):
+        print(f"{code:>3}  " + " ".join(f"{value:>3}" for value in row))
+
+
+if __name__ == "__main__":
+    main()